@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .suite import BENCHMARKS, ROOT, benchmark_params
+
+
+def _commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _numbers(data: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _numbers(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, data
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Строки сравнения числовых результатов двух прогонов (изменение в процентах).
+    """
+    old = dict(_numbers(previous.get("results", {})))
+    lines = []
+    for key, value in _numbers(current.get("results", {})):
+        if key in old and ".params." not in f".{key}":
+            before = old[key]
+            change = f"{(value - before) / before * 100:+.1f}%" if before else "-"
+            lines.append(f"{key}: {before:g} -> {value:g} ({change})")
+    return lines
+
+
+async def run(names: List[str], quick: bool, overrides: Dict[str, str]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in names:
+        params = benchmark_params(name, quick, overrides)
+        print(f"[{name}] {params}", file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix=f"tfa-bench-{name}-") as workdir:
+            try:
+                result = await BENCHMARKS[name](workdir, **params)
+            except Exception as e:
+                result = {"error": f"{type(e).__name__}: {e}"}
+        results[name] = {"params": params, **result}
+        print(f"[{name}] {json.dumps(result, ensure_ascii=False)}", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Бенчмарки мониторинга с фейковыми сервером здоровья, Telegram Bot API и Звоноботом"
+    )
+    parser.add_argument("names", nargs="*", help=f"Бенчмарки (по умолчанию все): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="Короткий прогон с меньшими нагрузками")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Параметр бенчмарков (например, targets=2000)")
+    parser.add_argument("--output", help="Файл результатов JSON (по умолчанию benchmarks/results/<время>.json)")
+    parser.add_argument("--compare", help="Файл результатов прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"неизвестные бенчмарки: {', '.join(unknown)}")
+    overrides = dict(item.split("=", 1) for item in args.set)
+    started_at = datetime.now()
+    results = asyncio.run(run(args.names or list(BENCHMARKS), args.quick, overrides))
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": args.quick,
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {output}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            previous = json.load(file)
+        print("\n".join(compare(previous, report)))
+
+
+if __name__ == "__main__":
+    main()
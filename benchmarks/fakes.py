@@ -0,0 +1,356 @@
+import json
+import time
+import random
+import asyncio
+import multiprocessing
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import aiohttp
+from aiohttp import web
+
+
+class FakeServer(ABC):
+    """
+    Локальный HTTP-сервер aiohttp, заменяющий внешний сервис в бенчмарках.
+
+    Сервер слушает 127.0.0.1 на свободном порту, адрес доступен в base_url
+    после start(). wait_for() ожидает условия, проверяемого после каждого
+    обработанного запроса.
+
+    Attributes:
+        host (str): Адрес для прослушивания
+        port (int): Порт (0 - выбирается свободный)
+        base_url (str): Базовый URL запущенного сервера
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self.base_url = ""
+        self._runner: Optional[web.AppRunner] = None
+        self._changed = asyncio.Condition()
+
+    @abstractmethod
+    def routes(self, app: web.Application) -> None:
+        """
+        Регистрация обработчиков сервера в приложении aiohttp.
+        """
+
+    async def start(self) -> str:
+        """
+        Запуск сервера.
+
+        Returns:
+            str: Базовый URL сервера
+        """
+        app = web.Application()
+        self.routes(app)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self.base_url = f"http://{self.host}:{self.port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def wait_for(self, predicate: Callable[[], bool], timeout: float) -> bool:
+        """
+        Ожидание, пока predicate() не станет истинным.
+
+        Returns:
+            bool: False, если время ожидания истекло
+        """
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(predicate), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+
+class FakeHealthServer(FakeServer):
+    """
+    Проверяемый сервис: GET /health/{имя} отвечает 200 или 503 с заданной задержкой и долей отказов.
+
+    Параметры меняются на лету: в процессе сервера - через configure(),
+    снаружи - запросом POST /control с JSON {"latency", "jitter", "failure_rate"}.
+    GET /stats возвращает счётчики запросов и время первого успешного ответа
+    и первого отказа после последнего изменения параметров (unix time).
+
+    Attributes:
+        latency (float): Задержка ответа в секундах
+        jitter (float): Случайная добавка к задержке в секундах (от 0 до jitter)
+        failure_rate (float): Доля ответов 503 (0 - все успешны, 1 - все с ошибкой)
+        requests (int): Количество обработанных запросов
+        failures (int): Количество ответов с ошибкой
+        first_request_at (Optional[float]): Время первого запроса (unix time)
+        first_success_at (Optional[float]): Время первого успешного ответа после configure() (unix time)
+        first_failure_at (Optional[float]): Время первого отказа после configure() (unix time)
+
+    Examples:
+        >>> server = FakeHealthServer(latency=0.005, failure_rate=0.01)
+        >>> url = await server.start()
+        >>> server.configure(failure_rate=1.0)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ) -> None:
+        super().__init__(host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.failures = 0
+        self.first_request_at: Optional[float] = None
+        self.first_success_at: Optional[float] = None
+        self.first_failure_at: Optional[float] = None
+        self._random = random.Random(seed)
+
+    def routes(self, app: web.Application) -> None:
+        app.router.add_get("/health/{name}", self._handle_health)
+        app.router.add_post("/control", self._handle_control)
+        app.router.add_get("/stats", self._handle_stats)
+
+    def configure(self, latency: Optional[float] = None, jitter: Optional[float] = None, failure_rate: Optional[float] = None) -> None:
+        """
+        Изменение параметров ответов; сбрасывает время первого успешного ответа и отказа.
+        """
+        if latency is not None:
+            self.latency = float(latency)
+        if jitter is not None:
+            self.jitter = float(jitter)
+        if failure_rate is not None:
+            self.failure_rate = float(failure_rate)
+        self.first_success_at = None
+        self.first_failure_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "first_request_at": self.first_request_at,
+            "first_success_at": self.first_success_at,
+            "first_failure_at": self.first_failure_at,
+        }
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        now = time.time()
+        self.requests += 1
+        if self.first_request_at is None:
+            self.first_request_at = now
+            await self._notify()
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.failures += 1
+            if self.first_failure_at is None:
+                self.first_failure_at = now
+            return web.Response(status=503, text="unavailable")
+        if self.first_success_at is None:
+            self.first_success_at = now
+        return web.Response(text="ok")
+
+    async def _handle_control(self, request: web.Request) -> web.Response:
+        self.configure(**await request.json())
+        return web.json_response(self.stats())
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+
+class FakeTelegramApi(FakeServer):
+    """
+    Bot API Telegram для TELEGRAM_API_SERVER: getMe, getUpdates (пустой long polling),
+    deleteWebhook, sendMessage и editMessageText; остальные методы отвечают true.
+
+    Отправленные и изменённые сообщения сохраняются в messages и edits
+    вместе со временем получения (unix time).
+
+    Attributes:
+        token (str): Токен бота
+        poll_timeout (float): Максимальная длительность ответа на getUpdates в секундах
+        messages (List[Dict[str, Any]]): Отправленные сообщения {"chat_id", "text", "at"}
+        edits (List[Dict[str, Any]]): Изменённые сообщения {"chat_id", "message_id", "text", "at"}
+    """
+
+    def __init__(self, token: str = "1:benchmark", poll_timeout: float = 1.0, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__(host, port)
+        self.token = token
+        self.poll_timeout = poll_timeout
+        self.messages: List[Dict[str, Any]] = []
+        self.edits: List[Dict[str, Any]] = []
+
+    @property
+    def api_server(self) -> str:
+        """
+        Значение TELEGRAM_API_SERVER для бота.
+        """
+        return self.base_url
+
+    def routes(self, app: web.Application) -> None:
+        app.router.add_post("/bot{token}/{method}", self._handle_method)
+
+    def _message(self, chat_id: Any, text: str, message_id: int) -> Dict[str, Any]:
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(chat_id), "type": "private"},
+            "text": text,
+        }
+
+    async def _handle_method(self, request: web.Request) -> web.Response:
+        now = time.time()
+        method = request.match_info["method"]
+        data = dict(await request.post())
+        if method == "getMe":
+            result: Any = {"id": 1, "is_bot": True, "first_name": "Benchmark", "username": "benchmark_bot"}
+        elif method == "getUpdates":
+            await asyncio.sleep(min(self.poll_timeout, float(data.get("timeout") or 0)))
+            result = []
+        elif method == "sendMessage":
+            message_id = len(self.messages) + 1
+            self.messages.append({"chat_id": data.get("chat_id"), "text": data.get("text", ""), "at": now})
+            result = self._message(data.get("chat_id"), data.get("text", ""), message_id)
+        elif method == "editMessageText":
+            self.edits.append({
+                "chat_id": data.get("chat_id"),
+                "message_id": data.get("message_id"),
+                "text": data.get("text", ""),
+                "at": now,
+            })
+            result = self._message(data.get("chat_id"), data.get("text", ""), int(data.get("message_id") or 0))
+        else:
+            result = True
+        await self._notify()
+        return web.json_response({"ok": True, "result": result})
+
+
+class FakeZvonobot(FakeServer):
+    """
+    API Звонобота для ZVONOBOT_BASE_URL: POST /apiCalls/create сохраняет звонок в calls.
+
+    Attributes:
+        calls (List[Dict[str, Any]]): Заказанные звонки {"payload", "at"} (время получения - unix time)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__(host, port)
+        self.calls: List[Dict[str, Any]] = []
+
+    def routes(self, app: web.Application) -> None:
+        app.router.add_post("/apiCalls/create", self._handle_create)
+
+    async def _handle_create(self, request: web.Request) -> web.Response:
+        now = time.time()
+        payload = await request.json()
+        self.calls.append({"payload": payload, "at": now})
+        await self._notify()
+        return web.json_response({"status": "success", "data": [{"id": len(self.calls)}]})
+
+
+FAKE_SERVERS = {
+    "health": FakeHealthServer,
+    "telegram": FakeTelegramApi,
+    "zvonobot": FakeZvonobot,
+}
+
+
+def _serve(kind: str, options: Dict[str, Any], ready: Any) -> None:
+    async def run() -> None:
+        server = FAKE_SERVERS[kind](**options)
+        ready.put(await server.start())
+        await asyncio.get_running_loop().create_future()
+
+    asyncio.run(run())
+
+
+class FakeServerProcess:
+    """
+    Запуск фейкового сервера в отдельном процессе, чтобы его нагрузка
+    не учитывалась в процессорном времени измеряемого процесса.
+
+    Управление сервером - через его HTTP-интерфейс (например, POST /control).
+
+    Examples:
+        >>> with FakeServerProcess("health", latency=0.002) as url:
+        ...     ...
+    """
+
+    def __init__(self, kind: str, **options: Any) -> None:
+        self.kind = kind
+        self.options = options
+        self.base_url = ""
+        self._process: Optional[multiprocessing.Process] = None
+
+    def start(self, timeout: float = 10.0) -> str:
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self._process = context.Process(target=_serve, args=(self.kind, self.options, ready), daemon=True)
+        self._process.start()
+        self.base_url = ready.get(timeout=timeout)
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(5)
+            self._process = None
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+async def control(base_url: str, path: str = "/stats", payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Запрос к управляющему интерфейсу фейкового сервера.
+
+    Args:
+        base_url (str): Базовый URL сервера
+        path (str): Путь ("/stats" или "/control")
+        payload (Optional[Dict[str, Any]]): JSON для POST-запроса (None - GET)
+
+    Returns:
+        Dict[str, Any]: Ответ сервера
+    """
+    async with aiohttp.ClientSession() as session:
+        if payload is None:
+            response = await session.get(f"{base_url}{path}")
+        else:
+            response = await session.post(f"{base_url}{path}", data=json.dumps(payload), headers={"Content-Type": "application/json"})
+        async with response:
+            return await response.json()
+
+
+def target_urls(base_url: str, count: int, prefix: str = "target") -> List[Tuple[str, str]]:
+    """
+    Имена и URL целей на фейковом сервере здоровья.
+    """
+    return [(f"{prefix}-{index}", f"{base_url}/health/{prefix}-{index}") for index in range(count)]
@@ -0,0 +1,510 @@
+import gc
+import os
+import sys
+import json
+import time
+import asyncio
+import inspect
+import tracemalloc
+import subprocess
+from statistics import mean
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+
+from .fakes import (
+    FakeHealthServer,
+    FakeServerProcess,
+    FakeTelegramApi,
+    FakeZvonobot,
+    control,
+    target_urls,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BenchmarkFunction = Callable[..., Awaitable[Dict[str, Any]]]
+
+BENCHMARKS: Dict[str, BenchmarkFunction] = {}
+
+QUICK_PARAMS: Dict[str, Dict[str, Any]] = {}
+
+
+def register_benchmark(name: str, quick: Optional[Dict[str, Any]] = None) -> Callable[[BenchmarkFunction], BenchmarkFunction]:
+    """
+    Регистрация бенчмарка.
+
+    Бенчмарк - корутина (workdir, **params) -> dict результатов; параметры
+    задаются именованными аргументами со значениями по умолчанию и
+    записываются в результат.
+
+    Args:
+        name (str): Имя бенчмарка
+        quick (Optional[Dict[str, Any]]): Параметры для быстрого прогона (--quick)
+    """
+    def decorator(func: BenchmarkFunction) -> BenchmarkFunction:
+        BENCHMARKS[name] = func
+        QUICK_PARAMS[name] = dict(quick or {})
+        return func
+    return decorator
+
+
+def benchmark_params(name: str, quick: bool = False, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Итоговые параметры бенчмарка: значения по умолчанию, быстрый прогон и явные значения.
+    """
+    signature = inspect.signature(BENCHMARKS[name])
+    params = {
+        key: parameter.default
+        for key, parameter in signature.parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
+    if quick:
+        params.update(QUICK_PARAMS[name])
+    for key, value in (overrides or {}).items():
+        if key in params:
+            params[key] = type(params[key])(value) if params[key] is not None else value
+    return params
+
+
+def distribution(values: Sequence[float], scale: float = 1.0, digits: int = 3) -> Dict[str, Optional[float]]:
+    """
+    Сводка выборки: минимум, медиана, p95, максимум и среднее (значения умножаются на scale).
+    """
+    if not values:
+        return {"count": 0, "min": None, "p50": None, "p95": None, "max": None, "mean": None}
+    ordered = sorted(value * scale for value in values)
+
+    def quantile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "min": round(ordered[0], digits),
+        "p50": round(quantile(0.5), digits),
+        "p95": round(quantile(0.95), digits),
+        "max": round(ordered[-1], digits),
+        "mean": round(mean(ordered), digits),
+    }
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class BenchmarkEnv:
+    """
+    Окружение бота для бенчмарка: файл настроек, файл целей и хранилище во временном каталоге.
+
+    Бот работает с фейковыми Telegram и Звоноботом; мониторинг API запускается
+    сам при старте (в хранилище заранее записан флаг активного мониторинга),
+    как после перезапуска контейнера.
+
+    Attributes:
+        workdir (str): Каталог файлов окружения
+        env_file (str): Путь к файлу настроек
+        targets_file (str): Путь к файлу целей
+    """
+
+    BASE_SETTINGS = {
+        "TELEGRAM_BOT_TOKEN": "1:benchmark",
+        "TELEGRAM_HANDLERS_PATH": "components/handlers",
+        "TELEGRAM_BOT_USERS_ID_ACCESS": "all",
+        "TELEGRAM_UPDATE_MODE": "polling",
+        "ALARM_MONITOR_MODE": "api",
+        "ALARM_API_URL": "",
+        "ALARM_USERS_ID_NOTIFICATION": "1001",
+        "ALARM_PHONES_FOR_CALL": "",
+        "ALARM_ESCALATION": "telegram:0",
+        "ALARM_NOTIFY_DEDUPE_TTL": "0",
+        "ALARM_API_REQUEST_TIMEOUT": "5",
+        "ENV_DUMP": "False",
+        "LOGGER_LOG_LEVEL": "CRITICAL",
+        "LOGGER_ENABLE_FILE_LOGGING": "False",
+        "STATE_ENABLED": "True",
+        "HISTORY_ENABLED": "True",
+        "METRICS_ENABLED": "False",
+        "WATCHDOG_ENABLED": "False",
+        "CLUSTER_MODE": "single",
+        "CONFIG_WATCH_INTERVAL": "0",
+        "ZVONOBOT_API_KEY": "",
+        "ZVONOBOT_DUTY_PHONE": "1",
+        "ZVONOBOT_RETRIES": "0",
+    }
+
+    def __init__(self, workdir: str) -> None:
+        self.workdir = workdir
+        self.env_file = os.path.join(workdir, "bench.env")
+        self.targets_file = os.path.join(workdir, "targets.json")
+        os.makedirs(workdir, exist_ok=True)
+
+    def write(self, targets: List[Dict[str, Any]], **settings: Any) -> str:
+        """
+        Запись файла целей и файла настроек.
+
+        Args:
+            targets (List[Dict[str, Any]]): Цели в формате ALARM_API_TARGETS_FILE
+            **settings (Any): Переменные окружения поверх BASE_SETTINGS
+
+        Returns:
+            str: Путь к файлу настроек
+        """
+        with open(self.targets_file, "w", encoding="utf-8") as file:
+            json.dump(targets, file)
+        values = {
+            **self.BASE_SETTINGS,
+            "ALARM_API_TARGETS_FILE": self.targets_file,
+            "STATE_PATH": os.path.join(self.workdir, "state.db"),
+            "HISTORY_PATH": os.path.join(self.workdir, "history"),
+            "LOGGER_LOG_DIR": os.path.join(self.workdir, "logs"),
+            **{key: str(value) for key, value in settings.items()},
+        }
+        with open(self.env_file, "w", encoding="utf-8") as file:
+            file.write("\n".join(f"{key}={value}" for key, value in values.items()) + "\n")
+        return self.env_file
+
+    async def seed_active(self) -> None:
+        """
+        Запись в хранилище флага активного мониторинга API.
+        """
+        from components.modules import StateStore
+
+        store = StateStore(os.path.join(self.workdir, "state.db"))
+        store.open()
+        store.set("api:active", True)
+        await store.close()
+
+    def process_env(self) -> Dict[str, str]:
+        """
+        Окружение процесса бота с ENV_FILE этого окружения.
+        """
+        return {**os.environ, "ENV_FILE": self.env_file, "PYTHONPATH": ROOT}
+
+
+class RunningApp:
+    """
+    Бот (App), запущенный в текущем процессе как задача asyncio; вход ждёт
+    запуска мониторинга и создания Dispatcher.
+
+    Examples:
+        >>> async with RunningApp(env) as app:
+        ...     router = app.routers[-1]
+    """
+
+    def __init__(self, env: BenchmarkEnv) -> None:
+        self.env = env
+        self.app: Any = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> Any:
+        os.environ["ENV_FILE"] = self.env.env_file
+        if ROOT not in sys.path:
+            sys.path.insert(0, ROOT)
+        from main import App
+
+        self.app = App()
+        self._task = asyncio.create_task(self.app.start())
+        while not (self.app.dp is not None and self.app.routers and getattr(self.app.routers[-1], "engine", None)):
+            if self._task.done():
+                self._task.result()
+                raise RuntimeError("бот остановился до запуска мониторинга")
+            await asyncio.sleep(0.01)
+        return self.app
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        try:
+            await self.app.dp.stop_polling()
+            await asyncio.wait_for(asyncio.shield(self._task), 10)
+        except (RuntimeError, asyncio.TimeoutError):
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self.app.logger.close()
+
+
+def _http_targets(base_url: str, count: int, interval: float) -> List[Dict[str, Any]]:
+    return [{"name": name, "url": url, "interval": interval} for name, url in target_urls(base_url, count)]
+
+
+async def _idle_telegram() -> FakeTelegramApi:
+    telegram = FakeTelegramApi()
+    await telegram.start()
+    return telegram
+
+
+@register_benchmark("probe_throughput", quick={"targets": 100, "duration": 3.0})
+async def probe_throughput(
+    workdir: str,
+    targets: int = 500,
+    interval: float = 1.0,
+    duration: float = 10.0,
+    warmup: float = 2.0,
+    latency: float = 0.002,
+    failure_rate: float = 0.01
+) -> Dict[str, Any]:
+    """
+    Пропускная способность проверок: бот проверяет targets HTTP-целей с интервалом
+    interval на сервере здоровья в отдельном процессе. Проверки за duration секунд
+    делятся на процессорное время процесса бота - сколько проверок выдерживает одно ядро.
+    Заодно замеряется опоздание запусков планировщика под этой нагрузкой.
+    """
+    telegram = await _idle_telegram()
+    env = BenchmarkEnv(workdir)
+    with FakeServerProcess("health", latency=latency, failure_rate=failure_rate) as health_url:
+        env.write(_http_targets(health_url, targets, interval), TELEGRAM_API_SERVER=telegram.api_server)
+        await env.seed_active()
+        async with RunningApp(env) as app:
+            await asyncio.sleep(warmup)
+            app.scheduler.lateness.reset()
+            before = await control(health_url)
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            await asyncio.sleep(duration)
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            after = await control(health_url)
+            p50, p95, p99 = app.scheduler.lateness.percentiles()
+    await telegram.stop()
+    probes = after["requests"] - before["requests"]
+    return {
+        "probes": probes,
+        "probes_per_second": round(probes / wall, 1),
+        "expected_per_second": round(targets / interval, 1),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_utilization": round(cpu / wall, 3),
+        "probes_per_cpu_second": round(probes / cpu, 1) if cpu else None,
+        "scheduler_lateness_ms": {"p50": p50, "p95": p95, "p99": p99},
+    }
+
+
+@register_benchmark("scheduler_jitter", quick={"jobs": 200, "duration": 2.0})
+async def scheduler_jitter(
+    workdir: str,
+    jobs: int = 1000,
+    interval: float = 1.0,
+    duration: float = 5.0,
+    work_us: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Точность планировщика: jobs периодических задач с интервалом interval,
+    каждая занимает процессор на work_us микросекунд. Результат - опоздание
+    запусков относительно расписания.
+    """
+    from components.modules import Scheduler
+
+    scheduler = Scheduler(start_jitter=1.0)
+    runs = 0
+
+    async def job() -> None:
+        nonlocal runs
+        runs += 1
+        if work_us:
+            deadline = time.perf_counter() + work_us / 1e6
+            while time.perf_counter() < deadline:
+                pass
+
+    for index in range(jobs):
+        scheduler.add(f"bench:{index}", interval, job)
+    await asyncio.sleep(interval)
+    scheduler.lateness.reset()
+    runs = 0
+    await asyncio.sleep(duration)
+    lateness = scheduler.lateness
+    skipped = sum(scheduler.get(f"bench:{index}").skipped for index in range(jobs))
+    p50, p95, p99 = lateness.percentiles()
+    await scheduler.close()
+    return {
+        "runs": runs,
+        "expected_runs": int(jobs * duration / interval),
+        "skipped": skipped,
+        "lateness_ms": {
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "p999": lateness.percentile(99.9),
+            "mean": round(lateness.mean, 3) if lateness.mean is not None else None,
+        },
+    }
+
+
+@register_benchmark("alarm_latency", quick={"rounds": 2})
+async def alarm_latency(
+    workdir: str,
+    rounds: int = 5,
+    interval: float = 0.5,
+    background_targets: int = 50
+) -> Dict[str, Any]:
+    """
+    Время от отказа до доставки уведомления: цель начинает отвечать 503,
+    замеряется время до sendMessage в фейковый Telegram и до заказа звонка
+    в фейковом Звоноботе, затем - до изменения сообщения на «восстановлен».
+
+    Время считается от первого ответа с ошибкой (from_failure - работа бота:
+    порог тревоги, эскалация, очередь уведомлений) и от момента отказа
+    (from_outage - с учётом ожидания следующей проверки). Остальные
+    background_targets целей создают фоновую нагрузку.
+    """
+    telegram = await _idle_telegram()
+    zvonobot = FakeZvonobot()
+    await zvonobot.start()
+    health = FakeHealthServer()
+    await health.start()
+    env = BenchmarkEnv(workdir)
+    with FakeServerProcess("health") as background_url:
+        # Тревога - при первом же отказе, без ожидания ALARM_TIMEOUT_FOR_MESSAGE
+        targets = [{"name": "alarm", "url": f"{health.base_url}/health/alarm", "interval": interval, "alarm_timeout": 0}]
+        targets += _http_targets(background_url, background_targets, interval)
+        env.write(
+            targets,
+            TELEGRAM_API_SERVER=telegram.api_server,
+            ZVONOBOT_BASE_URL=zvonobot.base_url,
+            ZVONOBOT_API_KEY="benchmark",
+            ALARM_PHONES_FOR_CALL="79990000000",
+            ALARM_ESCALATION="telegram:0,call:0",
+            ALARM_FAIL_THRESHOLD=1,
+            ALARM_RECOVER_THRESHOLD=1,
+            ALARM_NOTIFY_CHAT_RATE=100,
+        )
+        await env.seed_active()
+        samples: Dict[str, List[float]] = {
+            "message_from_failure": [],
+            "message_from_outage": [],
+            "call_from_failure": [],
+            "recovery_from_success": [],
+        }
+        missed = 0
+        async with RunningApp(env):
+            await health.wait_for(lambda: health.first_success_at is not None, 10 * interval)
+            for _ in range(rounds):
+                messages, calls, edits = len(telegram.messages), len(zvonobot.calls), len(telegram.edits)
+                outage_at = time.time()
+                health.configure(failure_rate=1.0)
+                delivered = await telegram.wait_for(lambda: len(telegram.messages) > messages, 10 * interval + 5)
+                called = await zvonobot.wait_for(lambda: len(zvonobot.calls) > calls, 5)
+                if delivered:
+                    samples["message_from_failure"].append(telegram.messages[messages]["at"] - health.first_failure_at)
+                    samples["message_from_outage"].append(telegram.messages[messages]["at"] - outage_at)
+                if called:
+                    samples["call_from_failure"].append(zvonobot.calls[calls]["at"] - health.first_failure_at)
+                health.configure(failure_rate=0.0)
+                recovered = await telegram.wait_for(lambda: len(telegram.edits) > edits, 10 * interval + 5)
+                if recovered:
+                    samples["recovery_from_success"].append(telegram.edits[edits]["at"] - health.first_success_at)
+                missed += not (delivered and called and recovered)
+                await asyncio.sleep(interval)
+    await health.stop()
+    await zvonobot.stop()
+    await telegram.stop()
+    return {
+        **{f"{name}_ms": distribution(values, scale=1000) for name, values in samples.items()},
+        "missed_rounds": missed,
+    }
+
+
+@register_benchmark("memory_per_target", quick={"targets": 200})
+async def memory_per_target(
+    workdir: str,
+    targets: int = 1000,
+    interval: float = 2.0
+) -> Dict[str, Any]:
+    """
+    Память на цель: к работающему боту с одной целью добавляются targets целей
+    (как при перезагрузке файла целей); после проверки каждой цели
+    сравнивается выделенная Python память (tracemalloc) и RSS процесса.
+    """
+    telegram = await _idle_telegram()
+    env = BenchmarkEnv(workdir)
+    with FakeServerProcess("health") as health_url:
+        env.write(_http_targets(health_url, 1, interval), TELEGRAM_API_SERVER=telegram.api_server)
+        await env.seed_active()
+        tracemalloc.start()
+        try:
+            async with RunningApp(env) as app:
+                router = app.routers[-1]
+                await asyncio.sleep(interval)
+                gc.collect()
+                traced_before, rss_before = tracemalloc.get_traced_memory()[0], _rss_bytes()
+                env.write(_http_targets(health_url, targets + 1, interval), TELEGRAM_API_SERVER=telegram.api_server)
+                router._apply_targets(router._load_targets(), first_check_within=interval)
+                await asyncio.sleep(2 * interval)
+                gc.collect()
+                traced_after, rss_after = tracemalloc.get_traced_memory()[0], _rss_bytes()
+                checked = sum(1 for state in router.target_states.values() if state.is_available is not None)
+        finally:
+            tracemalloc.stop()
+    await telegram.stop()
+    return {
+        "targets": targets,
+        "checked_targets": checked,
+        "python_bytes_per_target": round((traced_after - traced_before) / targets),
+        "rss_bytes_per_target": round((rss_after - rss_before) / targets) if rss_before is not None else None,
+    }
+
+
+@register_benchmark("startup_time", quick={"repeats": 1})
+async def startup_time(
+    workdir: str,
+    repeats: int = 3,
+    targets: int = 100,
+    timeout: float = 60.0
+) -> Dict[str, Any]:
+    """
+    Время запуска: от старта процесса `python main.py` (перезапуск контейнера
+    с активным мониторингом) до первой проверки цели. Отдельно замеряется
+    импорт main.
+    """
+    env = BenchmarkEnv(workdir)
+    telegram = await _idle_telegram()
+    to_first_probe: List[float] = []
+    for _ in range(repeats):
+        health = FakeHealthServer()
+        await health.start()
+        env.write(
+            _http_targets(health.base_url, targets, 10.0),
+            TELEGRAM_API_SERVER=telegram.api_server,
+            ALARM_SCHEDULER_JITTER=0,
+        )
+        await env.seed_active()
+        started_at = time.time()
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "main.py",
+            cwd=ROOT,
+            env=env.process_env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            if await health.wait_for(lambda: health.first_request_at is not None, timeout):
+                to_first_probe.append(health.first_request_at - started_at)
+        finally:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), 10)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+            await health.stop()
+    await telegram.stop()
+    imports: List[float] = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"],
+            cwd=ROOT,
+            env=env.process_env(),
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        imports.append(float(result.stdout.strip().splitlines()[-1]))
+    return {
+        "to_first_probe_ms": distribution(to_first_probe, scale=1000, digits=1),
+        "import_main_ms": distribution(imports, scale=1000, digits=1),
+    }
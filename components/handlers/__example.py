@@ -1,18 +1,14 @@
-from aiogram.filters import Command
-from aiogram.types import Message
 from components.handlers.base import BaseRouter
 
 # <-- Dataclass test -->
 # ps. this file is not used in the project
 
 class ExampleRouter(BaseRouter):
-    def __post_init__(self):
-        super().__post_init__()
-        self._register_handlers()
-        
     def _register_handlers(self):
+        from aiogram.filters import Command
+        from aiogram.types import Message
+
         @self.router.message(Command("start"))
         async def cmd_start(message: Message):
             self.logger.info(f"Получена команда /start от пользователя {message.from_user.id}")
             await message.answer("Привет! Я бот с автоматической инициализацией роутеров!")
-        
\ No newline at end of file
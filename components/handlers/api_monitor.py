@@ -1,114 +1,170 @@
-from aiogram import F
-from aiogram.filters import Command
-from aiogram.types import Message
 from components.handlers.base import BaseRouter
-from components.modules import ZvonoBot
+from components.modules import (
+    Alarm,
+    AlarmEvent,
+    AlarmManager,
+    AlarmPolicy,
+    AlarmState,
+    AppConfig,
+    HttpSession,
+    Incident,
+    LatencyTracker,
+    PROBE_TYPES,
+    ProbeEngine,
+    ProbeResult,
+    ProbeTarget,
+    ProbeTimer,
+    TargetState,
+    build_targets,
+    create_timing_trace_config,
+    parse_history_window
+)
 import asyncio
 import aiohttp
+import random
 from datetime import datetime
-from functools import wraps
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional, Set, Tuple
 
 class ApiMonitorRouter(BaseRouter):
+    MONITOR_NAME = "api"
+    TARGET_FIELDS = frozenset({
+        "api_urls",
+        "api_method",
+        "api_headers",
+        "api_body",
+        "api_targets_file",
+        "api_expect",
+        "tls_min_days",
+        "monitor_timeout",
+        "api_request_timeout",
+    })
+    ALARM_FIELDS = frozenset({
+        "timeout_for_message",
+        "alarm_fail_threshold",
+        "alarm_fail_window",
+        "alarm_recover_threshold",
+        "alarm_flap_threshold",
+        "alarm_flap_window",
+        "alarm_escalation",
+    })
+    SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+    UPTIME_PERIOD = "24h"
+    REPORT_PERIOD = "7d"
+    
     def __post_init__(self):
         super().__post_init__()
-        self._register_handlers()
         self.last_successful_check = datetime.now()
         self.monitoring_task = None
+        self.engine: Optional[ProbeEngine] = None
+        self.targets: List[ProbeTarget] = []
+        self.target_states: Dict[str, TargetState] = {}
+        self.alarms = AlarmManager(AlarmPolicy.from_config(self.config))
+        self.http = HttpSession.from_env(self.env, trace_configs=[create_timing_trace_config()])
+        self._check_api = self.logger.profile(self._check_api)
+        self._send_notification = self.logger.profile(self._send_notification)
+        self._init_metrics()
+        if self.cluster is not None:
+            self.cluster.subscribe(self._on_cluster_change)
         
-    def _get_env_value(self, key: str, expected_type: type = str) -> Any:
-        """
-        Безопасное получение значения из переменных окружения с преобразованием типа.
+    def _init_metrics(self):
+        self._probe_total = self.metrics.counter("probe_total", "Количество проверок цели", ["target"])
+        self._probe_failures = self.metrics.counter("probe_failures_total", "Количество неудачных проверок цели", ["target"])
+        self._probe_duration = self.metrics.histogram(
+            "probe_duration_seconds",
+            "Длительность фаз проверки цели",
+            ["target", "phase"]
+        )
+        self._probe_up = self.metrics.gauge("probe_up", "Результат последней проверки цели (1 - доступна)", ["target"])
+        self._last_success = self.metrics.gauge(
+            "probe_last_success_timestamp_seconds",
+            "Время последней успешной проверки цели (unix time)",
+            ["target"]
+        )
+        self._alarms_total = self.metrics.counter("alarms_total", "Количество отправленных тревог", ["target", "kind"])
+        self._monitoring_active = self.metrics.gauge("monitoring_active", "Запущен ли мониторинг", ["monitor"])
+        self._monitoring_active.labels("api").set(0)
+        self.metrics.gauge(
+            "probe_seconds_since_last_success",
+            "Время с последней успешной проверки цели в секундах",
+            ["target"]
+        ).set_function(self._collect_since_last_success)
+        self._cert_expiry = self.metrics.gauge(
+            "tls_cert_expiry_timestamp_seconds",
+            "Окончание срока действия TLS-сертификата цели (unix time)",
+            ["target"]
+        )
+        self.metrics.gauge(
+            "alarm_state_targets",
+            "Количество целей по состоянию тревоги",
+            ["state"]
+        ).set_function(lambda: [((state,), value) for state, value in self.alarms.counts().items()])
         
-        Args:
-            key (str): Ключ переменной окружения
-            expected_type (type): Ожидаемый тип данных (str, int, bool, list)
-            
-        Returns:
-            Any: Значение переменной окружения нужного типа или значение по умолчанию
-        """
-        try:
-            value = getattr(self.env, key, None)
-            
-            if value is None:
-                self.logger.warning(f"Переменная {key} не найдена, возвращается значение по умолчанию")
-                return [] if expected_type == list else expected_type()
-            
-            if expected_type == list and isinstance(value, str):
-                return [v.strip() for v in value.split(",")]
-            elif expected_type == list:
-                return value if isinstance(value, list) else []
-            elif expected_type == int and not isinstance(value, int):
-                return int(value)
-            elif expected_type == bool and not isinstance(value, bool):
-                return bool(value)
-            elif expected_type == str and not isinstance(value, str):
-                return str(value)
-                
-            return value
-            
-        except Exception as e:
-            self.logger.error(f"Ошибка при получении {key} из env: {e}")
-            return [] if expected_type == list else expected_type()
-            
-    def _check_access(self, func):
-        @wraps(func)
-        async def wrapper(message: Message, *args, **kwargs):
-            user_id = str(message.from_user.id)
-            allowed_users = self._get_env_value("TELEGRAM_BOT_USERS_ID_ACCESS", list)
-            
-            if "all" in allowed_users:
-                return await func(message, *args, **kwargs)
-                
-            if user_id in allowed_users:
-                return await func(message, *args, **kwargs)
-                
-            self.logger.warning(f"Попытка доступа к боту от неавторизованного пользователя {user_id}")
-            await message.answer("⛔️ У вас нет доступа к этому боту")
-        return wrapper
+    def _collect_since_last_success(self):
+        now = datetime.now()
+        for name, state in self.target_states.items():
+            yield (name,), (now - state.last_successful_check).total_seconds()
         
-    def _parse_headers(self, headers_str: str) -> Dict[str, str]:
+    def _load_targets(self) -> List[ProbeTarget]:
         """
-        Парсинг строки заголовков в словарь.
+        Формирование списка целей мониторинга из настроек.
+        
+        Цели берутся из JSON-файла ALARM_API_TARGETS_FILE и/или из ALARM_API_URL
+        (один URL или список через запятую). Для целей из ALARM_API_URL используются
+        общие ALARM_API_METHOD, ALARM_API_HEADERS и ALARM_API_BODY.
         
-        Args:
-            headers_str (str): Строка заголовков в формате key1:value1,key2:value2
-            
         Returns:
-            Dict[str, str]: Словарь заголовков
-        """
-        if not headers_str:
-            return {}
+            List[ProbeTarget]: Список целей
             
-        headers = {}
-        for header in headers_str.split(','):
-            if ':' in header:
-                key, value = header.split(':', 1)
-                headers[key.strip()] = value.strip()
-        return headers
+        Raises:
+            ValueError: Если у цели неподдерживаемая схема URL
+        """
+        config = self.config
+        defaults = {
+            "method": config.api_method,
+            "headers": dict(config.api_headers),
+            "body": config.api_body,
+            "interval": config.monitor_timeout,
+            "timeout": config.api_request_timeout,
+            "expect": dict(config.api_expect),
+            "cert_min_days": config.tls_min_days,
+        }
+        targets = build_targets(list(config.api_urls), config.api_targets_file, defaults)
+        for target in targets:
+            if target.kind != "http" and target.kind not in PROBE_TYPES:
+                raise ValueError(f"Неподдерживаемый тип проверки {target.kind!r} у цели {target.name}")
+        return targets
         
     def _register_handlers(self):
+        from aiogram.filters import Command, CommandObject
+        from aiogram.types import Message
+        
         @self.router.message(Command("start"))
         @self._check_access
         async def cmd_start(message: Message):
-            timeout = self._get_env_value("ALARM_TIMEOUT_FOR_MESSAGE", int)
-            monitor_timeout = self._get_env_value("ALARM_MONITOR_TIMEOUT", int)
-            api_url = self._get_env_value("ALARM_API_URL")
-            api_method = self._get_env_value("ALARM_API_METHOD")
-            notify_users = self._get_env_value("ALARM_USERS_ID_NOTIFICATION", list)
-            phones_for_call = self._get_env_value("ALARM_PHONES_FOR_CALL", list)
+            config = self.config
+            timeout = config.timeout_for_message
+            monitor_timeout = config.monitor_timeout
+            api_url = config.api_urls
+            api_method = config.api_method
+            targets_file = config.api_targets_file
+            notify_users = config.notify_users
+            phones_for_call = sorted(config.phones_for_call)
             
             help_text = (
                 "👋 Привет! Я бот для мониторинга API.\n\n"
                 "📝 Доступные команды:\n"
                 "/start_monitoring - Запустить мониторинг API\n"
                 "/stop_monitoring - Остановить мониторинг\n"
-                "/status - Показать текущий статус мониторинга\n\n"
+                "/status - Показать текущий статус мониторинга\n"
+                "/incidents [N] - Последние инциденты\n"
+                "/uptime [период] [цели] - Доступность целей за период (по умолчанию 24h)\n"
+                "/report [период] [цели] - Доступность, инциденты, MTTR и задержки за период (по умолчанию 7d)\n\n"
                 "⚙️ Настройки в .env:\n"
                 f"• Таймаут: {timeout} сек\n"
                 f"• Интервал проверки: {monitor_timeout} сек\n"
-                f"• API URL: {api_url}\n"
+                f"• API URL: {', '.join(api_url) if api_url else 'не указан'}\n"
                 f"• Метод: {api_method}\n"
+                f"• Файл целей: {targets_file or 'не указан'}\n"
                 f"• Получатели уведомлений: {'все' if 'all' in notify_users else ', '.join(notify_users)}\n"
                 f"• Телефоны для звонков: {', '.join(phones_for_call) if phones_for_call else 'не указаны'}\n\n"
                 "ℹ️ Для начала работы отправьте /start_monitoring"
@@ -119,25 +175,48 @@ class ApiMonitorRouter(BaseRouter):
         @self._check_access
         async def cmd_status(message: Message):
             if self.monitoring_task and not self.monitoring_task.done():
-                time_since_last = (datetime.now() - self.last_successful_check).total_seconds()
-                monitor_timeout = self._get_env_value("ALARM_MONITOR_TIMEOUT", int)
-                status_text = (
-                    "📊 Статус мониторинга API:\n\n"
-                    f"• Мониторинг: ✅ Активен\n"
-                    f"• Последняя успешная проверка: {self.last_successful_check.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                    f"• Прошло времени: {int(time_since_last)} сек\n"
-                    f"• Следующая проверка через: {max(0, monitor_timeout - time_since_last):.0f} сек"
-                )
+                await message.answer(self._format_status())
             else:
-                status_text = "📊 Статус мониторинга API:\n\n• Мониторинг: ❌ Неактивен"
-            await message.answer(status_text)
+                await message.answer("📊 Статус мониторинга API:\n\n• Мониторинг: ❌ Неактивен")
+                
+        @self.router.message(Command("incidents"))
+        @self._check_access
+        async def cmd_incidents(message: Message, command: CommandObject):
+            limit = int(command.args) if command.args and command.args.strip().isdigit() else 10
+            await message.answer(self._format_incidents(max(1, limit)))
+            
+        @self.router.message(Command("uptime"))
+        @self._check_access
+        async def cmd_uptime(message: Message, command: CommandObject):
+            await message.answer(self._format_history_command(command.args, self.UPTIME_PERIOD, detailed=False))
+            
+        @self.router.message(Command("report"))
+        @self._check_access
+        async def cmd_report(message: Message, command: CommandObject):
+            await message.answer(self._format_history_command(command.args, self.REPORT_PERIOD, detailed=True))
             
         @self.router.message(Command("start_monitoring"))
         @self._check_access
         async def cmd_start_monitoring(message: Message):
             if self.monitoring_task is None or self.monitoring_task.done():
-                self.monitoring_task = asyncio.create_task(self._monitor_api(message))
-                await message.answer("🔍 Мониторинг API запущен")
+                try:
+                    targets = self._load_targets()
+                except Exception as e:
+                    self.logger.error(f"Ошибка при загрузке целей мониторинга: {e}")
+                    await message.answer(f"❌ Ошибка при загрузке целей мониторинга: {e}")
+                    return
+                if not targets:
+                    await message.answer("⚠️ Не указано ни одной цели для мониторинга (ALARM_API_URL или ALARM_API_TARGETS_FILE)")
+                    return
+                self._remember_chat(message)
+                self._start_monitoring(targets)
+                if self.cluster is not None:
+                    await message.answer(
+                        f"🔍 Мониторинг API запущен (целей: {len(targets)}, "
+                        f"на этом экземпляре: {len(self.target_states)}, {self.cluster.describe()})"
+                    )
+                else:
+                    await message.answer(f"🔍 Мониторинг API запущен (целей: {len(targets)})")
             else:
                 await message.answer("⚠️ Мониторинг уже запущен")
                 
@@ -146,37 +225,445 @@ class ApiMonitorRouter(BaseRouter):
         async def cmd_stop_monitoring(message: Message):
             if self.monitoring_task and not self.monitoring_task.done():
                 self.monitoring_task.cancel()
+                self._save_monitor_state(active=False)
                 await message.answer("🛑 Мониторинг API остановлен")
             else:
                 await message.answer("⚠️ Мониторинг не был запущен")
                 
-    async def _check_api(self) -> bool:
+    def _start_monitoring(self, targets: List[ProbeTarget], saved: Dict[str, Dict[str, Any]] = None):
+        """
+        Запуск задачи мониторинга и сохранение его определения в хранилище.
+        В кластерном режиме проверяются только цели этого экземпляра.
+        
+        Args:
+            targets (List[ProbeTarget]): Список целей
+            saved (Dict[str, Dict[str, Any]]): Сохранённые цели {имя: {"definition", "state"}}
+        """
+        latency_window = self.config.latency_window
+        self.targets = targets
+        owned = self._owned_targets(targets)
+        self.target_states = {}
+        self.alarms = AlarmManager(AlarmPolicy.from_config(self.config))
+        for target in owned:
+            state = TargetState(target=target, latency=LatencyTracker(window=latency_window))
+            saved_state = ((saved or {}).get(target.name) or {}).get("state") or {}
+            state.restore(saved_state)
+            self.target_states[target.name] = state
+            self._add_alarm(state, saved_state.get("alarm"))
+            self.incidents.restore(saved_state.get("incident"))
+        self._close_stale_incidents(self.alarms)
+        self._save_monitor_state(active=True, saved=saved)
+        self.env.watch_file(self.config.api_targets_file)
+        self.monitoring_task = asyncio.create_task(self._monitor_api(owned))
+        
+    def _owned_targets(self, targets: List[ProbeTarget]) -> List[ProbeTarget]:
+        """
+        Цели, которые проверяет этот экземпляр: все без кластера, все у лидера
+        и ни одной у резервного экземпляра, своя часть кольца в режиме shard.
+        """
+        if self.cluster is None:
+            return targets
+        return [target for target in targets if self.cluster.owns(target.name)]
+        
+    async def _on_cluster_change(self):
+        """
+        Перераспределение целей при смене лидера или состава кластера. Первые
+        проверки полученных целей распределяются по интервалу продления аренды,
+        чтобы перехват укладывался в один интервал проверки.
+        """
+        if self.engine is None or self.monitoring_task is None or self.monitoring_task.done():
+            return
+        self._apply_targets(self.targets, first_check_within=self.cluster.renew_interval)
+        
+    def _save_monitor_state(self, active: bool, saved: Dict[str, Dict[str, Any]] = None):
+        """
+        Сохранение активности мониторинга, чата уведомлений и определений целей.
+        
+        Args:
+            active (bool): Активен ли мониторинг
+            saved (Dict[str, Dict[str, Any]]): Уже сохранённые цели {имя: {"definition", "state"}}, неизменённые не перезаписываются
+        """
+        if self.store is None:
+            return
+        self.store.set(f"{self.MONITOR_NAME}:active", active)
+        self.store.set(f"{self.MONITOR_NAME}:chat_id", self.notification_chat_id)
+        if not active:
+            return
+        changed = {}
+        for name, state in self.target_states.items():
+            definition = state.target.to_dict()
+            if saved is not None and name in saved and saved[name].get("definition") == definition:
+                continue
+            changed[name] = (definition, self._state_dict(state))
+        self.store.replace_targets(
+            self.MONITOR_NAME,
+            changed,
+            keep=self.target_states.keys(),
+            existing=saved.keys() if saved is not None else None
+        )
+            
+    async def apply_config(self, old: AppConfig, changed: Set[str]):
+        """
+        Применение новых настроек к работающему мониторингу: добавляются и удаляются
+        только изменившиеся цели, состояние остальных целей и их расписание не трогаются.
+        """
+        await super().apply_config(old, changed)
+        if changed & self.ALARM_FIELDS:
+            self.alarms.policy = AlarmPolicy.from_config(self.config)
+            for state in self.target_states.values():
+                self.alarms.add(state.target.name, self._alarm_policy(state.target))
+        if self.engine is None or self.monitoring_task is None or self.monitoring_task.done():
+            return
+        if "api_concurrency" in changed:
+            self.engine.set_concurrency(self.config.api_concurrency)
+        self.env.watch_file(self.config.api_targets_file)
+        targets_file_changed = self.config.api_targets_file and f"file:{self.config.api_targets_file}" in changed
+        if not (changed & self.TARGET_FIELDS or targets_file_changed):
+            return
+        try:
+            targets = self._load_targets()
+        except Exception as e:
+            self.logger.error(f"Новые цели мониторинга не применены: {e}")
+            return
+        if not targets:
+            self.logger.warning("После перезагрузки настроек не осталось целей, мониторинг продолжается со старыми")
+            return
+        self._apply_targets(targets)
+        
+    def _apply_targets(self, targets: List[ProbeTarget], first_check_within: Optional[float] = None):
+        """
+        Замена набора целей работающего мониторинга по разнице с текущим.
+        
+        Args:
+            targets (List[ProbeTarget]): Все цели мониторинга (в кластере - до отбора своих)
+            first_check_within (Optional[float]): Срок первой проверки добавленных целей в секундах
+                (None - со случайным смещением в пределах интервала цели)
+        """
+        owned = self._owned_targets(targets)
+        new_targets = {target.name: target for target in owned}
+        removed = [name for name in self.target_states if name not in new_targets]
+        for name in removed:
+            self.engine.remove(name)
+            self.alarms.remove(name)
+            self._close_incident(name, notify=False)
+            del self.target_states[name]
+            self._forget_target_metrics(name)
+        added = updated = 0
+        for target in owned:
+            state = self.target_states.get(target.name)
+            if state is None:
+                state = self.target_states[target.name] = TargetState(
+                    target=target,
+                    latency=LatencyTracker(window=self.config.latency_window)
+                )
+                self._add_alarm(state)
+                delay = None if first_check_within is None else random.uniform(0, min(first_check_within, target.interval))
+                self.engine.add(target, delay=delay)
+                added += 1
+            elif state.target != target:
+                state.target = target
+                self.alarms.add(target.name, self._alarm_policy(target))
+                self.engine.update(target)
+                updated += 1
+        self.targets = targets
+        self._save_monitor_state(active=True)
+        self.logger.info(f"Цели мониторинга обновлены: добавлено {added}, изменено {updated}, удалено {len(removed)}")
+        
+    def _alarm_policy(self, target: ProbeTarget) -> AlarmPolicy:
+        """
+        Правила тревоги цели: общие правила и время недоступности цели до тревоги.
+        """
+        return self.alarms.policy.replace(for_seconds=self._alarm_timeout(target))
+        
+    def _add_alarm(self, state: TargetState, saved: Optional[Dict[str, Any]] = None) -> Alarm:
+        """
+        Создание тревоги цели, при наличии - из сохранённого состояния.
+        """
+        alarm = self.alarms.restore(state.target.name, saved, self._alarm_policy(state.target))
+        if not saved:
+            alarm.last_ok = state.last_successful_check.timestamp()
+        return alarm
+        
+    def _state_dict(self, state: TargetState) -> Dict[str, Any]:
+        """
+        Сохраняемое состояние цели вместе с состоянием тревоги.
+        """
+        data = state.to_dict()
+        alarm = self.alarms.get(state.target.name)
+        if alarm is not None:
+            data["alarm"] = alarm.to_dict()
+        incident = self.incidents.get(state.target.name)
+        if incident is not None:
+            data["incident"] = incident.to_dict()
+        return data
+        
+    def _forget_target_metrics(self, name: str):
+        for family in (self._probe_total, self._probe_failures, self._probe_up, self._last_success, self._cert_expiry):
+            family.remove(name)
+        for phase in LatencyTracker.PHASES:
+            self._probe_duration.remove(name, phase)
+        for kind in ("unavailable", "latency"):
+            self._alarms_total.remove(name, kind)
+            
+    async def resume(self):
+        """
+        Возобновление мониторинга, активного до перезапуска, с сохранённым состоянием целей.
+        
+        Цели берутся из текущих настроек; если их не удалось загрузить,
+        используются сохранённые определения. В кластерном режиме мониторинг
+        запускается при старте каждого экземпляра, если его не остановили
+        командой /stop_monitoring: какие цели проверять, решает кластер.
+        """
+        active = self.store.get(f"{self.MONITOR_NAME}:active") if self.store is not None else None
+        if not (active or (active is None and self.cluster is not None)):
+            return
+        saved = {}
+        if self.store is not None:
+            self.notification_chat_id = self.store.get(f"{self.MONITOR_NAME}:chat_id")
+            saved = self.store.load_targets(self.MONITOR_NAME)
+        try:
+            targets = self._load_targets()
+        except Exception as e:
+            self.logger.error(f"Ошибка при загрузке целей мониторинга, используются сохранённые: {e}")
+            targets = [ProbeTarget.from_dict(item["definition"]) for item in saved.values() if item["definition"]]
+        if not targets:
+            return
+        self._start_monitoring(targets, saved)
+        self.logger.info(f"Мониторинг API возобновлён после перезапуска (целей: {len(targets)})")
+        
+    async def close(self):
+        if self.monitoring_task and not self.monitoring_task.done():
+            self.monitoring_task.cancel()
+            try:
+                await self.monitoring_task
+            except asyncio.CancelledError:
+                pass
+        await self.http.close()
+        await super().close()
+                
+    def _format_status(self, limit: int = 20) -> str:
+        """
+        Формирование текста статуса мониторинга по всем целям.
+        
+        Args:
+            limit (int): Максимальное количество целей в подробном списке
+            
+        Returns:
+            str: Текст статуса
+        """
+        now = datetime.now()
+        states = list(self.target_states.values())
+        if len(states) == 1 and self.cluster is None:
+            state = states[0]
+            time_since_last = (now - state.last_successful_check).total_seconds()
+            return (
+                "📊 Статус мониторинга API:\n\n"
+                f"• Мониторинг: ✅ Активен\n"
+                f"• Тревога: {self._format_alarm(self.alarms.get(state.target.name))}\n"
+                f"• Последняя успешная проверка: {state.last_successful_check.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"• Прошло времени: {int(time_since_last)} сек\n"
+                f"• Следующая проверка через: {max(0, state.target.interval - time_since_last):.0f} сек\n"
+                f"• Задержка: {self._format_percentiles(state)}"
+            )
+            
+        unavailable = [state for state in states if state.is_available is False]
+        slow = [state for state in states if state.is_available and self._latency_exceeded(state) is not None]
+        alarm_counts = self.alarms.counts()
+        lines = [
+            "📊 Статус мониторинга API:\n",
+            "• Мониторинг: ✅ Активен",
+            *([f"• Кластер: {self.cluster.describe()}, целей всего: {len(self.targets)}"] if self.cluster is not None else []),
+            f"• Целей: {len(states)}",
+            f"• Доступно: {sum(1 for state in states if state.is_available)}",
+            f"• Недоступно: {len(unavailable)}",
+            f"• Медленно отвечают: {len(slow)}",
+            f"• Тревог: {alarm_counts[AlarmState.FIRING] + alarm_counts[AlarmState.RECOVERING]}, "
+            f"подозрений: {alarm_counts[AlarmState.SUSPECT]}, нестабильных: {len(self.alarms.flapping())}",
+        ]
+        for state in unavailable[:limit]:
+            time_since_last = (now - state.last_successful_check).total_seconds()
+            lines.append(
+                f"  ❌ {state.target.name} - {int(time_since_last)} сек без успешной проверки "
+                f"({self._format_alarm(self.alarms.get(state.target.name))})"
+            )
+        if len(unavailable) > limit:
+            lines.append(f"  ... и ещё {len(unavailable) - limit}")
+        for state in slow[:limit]:
+            lines.append(f"  🐢 {state.target.name} - {self._format_percentiles(state)}")
+        if len(slow) > limit:
+            lines.append(f"  ... и ещё {len(slow) - limit}")
+        return "\n".join(lines)
+        
+    def _parse_history_args(self, args: Optional[str], default_period: str) -> Tuple[float, float, str, Optional[List[str]]]:
         """
-        Проверка доступности API.
+        Разбор аргументов /uptime и /report: период (длительность или диапазон дат), затем имена целей.
         
         Returns:
-            bool: True если API доступен, False в противном случае
+            Tuple[float, float, str, Optional[List[str]]]: Начало и конец периода, его подпись, имена целей (None - все)
+            
+        Raises:
+            ValueError: Если период не разобран
         """
+        args = (args or "").strip()
+        if args:
+            # Диапазон дат может содержать пробелы, поэтому сначала разбирается вся строка
+            try:
+                start, end = parse_history_window(args)
+                return start, end, args, None
+            except ValueError:
+                pass
+        period, _, rest = args.partition(" ")
         try:
-            api_url = self._get_env_value("ALARM_API_URL")
-            api_method = self._get_env_value("ALARM_API_METHOD")
-            headers = self._parse_headers(self._get_env_value("ALARM_API_HEADERS"))
-            body = self._get_env_value("ALARM_API_BODY")
+            start, end = parse_history_window(period)
+        except ValueError:
+            if period[:1].isdigit():
+                raise
+            period, rest = default_period, args
+            start, end = parse_history_window(period)
+        names = rest.replace(",", " ").split()
+        if not names and self.targets:
+            names = [target.name for target in self.targets]
+        return start, end, period, names or None
+        
+    def _format_history_command(self, args: Optional[str], default_period: str, detailed: bool, limit: int = 20) -> str:
+        """
+        Текст команд /uptime и /report по истории проверок.
+        
+        Сводка берётся из свёрток истории (ProbeHistory.summarize), поэтому
+        время ответа не зависит от длины периода.
+        
+        Args:
+            args (Optional[str]): Аргументы команды
+            default_period (str): Период по умолчанию
+            detailed (bool): Добавлять ли инциденты, MTTR и задержки по каждой цели
+            limit (int): Максимальное количество целей в списке
             
-            async with aiohttp.ClientSession() as session:
-                if api_method.upper() == "GET":
-                    async with session.get(api_url, headers=headers) as response:
-                        return response.status == 200
-                elif api_method.upper() == "POST":
-                    async with session.post(api_url, headers=headers, data=body) as response:
-                        return response.status == 200
-                else:
-                    self.logger.error(f"Неподдерживаемый метод API: {api_method}")
-                    return False
+        Returns:
+            str: Текст ответа
+        """
+        if self.history is None:
+            return "⚠️ История проверок выключена (HISTORY_ENABLED)"
+        try:
+            start, end, period, names = self._parse_history_args(args, default_period)
+        except ValueError as e:
+            return f"⚠️ Неверный период: {e}"
+        summaries = self.history.summarize(start, end, names, latency=detailed)
+        title = "📈 Отчёт" if detailed else "📈 Доступность"
+        header = f"{title} API за {period} ({self._format_time(start)} - {self._format_time(end)}):\n"
+        measured = {name: summary for name, summary in summaries.items() if summary.count}
+        if not measured:
+            return f"{header}\nНет данных о проверках за этот период"
+        count = sum(summary.count for summary in measured.values())
+        failures = sum(summary.failures for summary in measured.values())
+        incidents = sum(summary.incidents for summary in summaries.values())
+        downtime = sum(summary.downtime for summary in summaries.values())
+        lines = [
+            header,
+            f"• Целей: {len(measured)}, проверок: {count}",
+            f"• Доступность: {100.0 * (count - failures) / count:.3f}%, "
+            f"худшая: {min(summary.availability for summary in measured.values()):.3f}%",
+            f"• Инцидентов: {incidents}"
+            + (f", MTTR: {self._format_duration(downtime / incidents)}" if incidents else ""),
+        ]
+        open_incidents = [incident for incident in self.incidents.active() if incident.key in measured]
+        if open_incidents:
+            lines.append(f"• Сейчас открыто инцидентов: {len(open_incidents)}")
+        lines.append("")
+        ordered = sorted(measured.items(), key=lambda item: (item[1].availability, item[0]))
+        for name, summary in ordered[:limit]:
+            mark = "✅" if not summary.failures else "⚠️"
+            line = f"{mark} {name} - {summary.availability:.3f}%"
+            if summary.failures:
+                line += f" (неудачных проверок: {summary.failures} из {summary.count})"
+            if detailed:
+                line += f"\n    инцидентов: {summary.incidents}"
+                if summary.mttr is not None:
+                    line += f", MTTR: {self._format_duration(summary.mttr)}"
+                p50, p95, p99 = summary.latency.percentiles()
+                if p50 is not None:
+                    # Перцентили оцениваются по верхним границам корзин и не могут превышать максимум
+                    p50, p95, p99 = (min(value, summary.latency_max) for value in (p50, p95, p99))
+                    line += (
+                        f"\n    задержка: p50 {p50:.0f} мс, p95 {p95:.0f} мс, p99 {p99:.0f} мс, "
+                        f"макс. {summary.latency_max:.0f} мс"
+                    )
+            lines.append(line)
+        if len(ordered) > limit:
+            lines.append(f"... и ещё {len(ordered) - limit}")
+        return "\n".join(lines)
+        
+    def _record_incident_history(self, incident: Incident):
+        if self.history is None:
+            return
+        try:
+            self.history.record_incident(incident.key, incident.duration(), incident.closed_at)
+        except Exception as e:
+            self.logger.error(f"Ошибка записи инцидента в историю проверок: {e}")
+        
+    def _format_alarm(self, alarm: Optional[Alarm]) -> str:
+        if alarm is None:
+            return "нет данных"
+        label = self.ALARM_STATE_LABELS[alarm.state]
+        if alarm.flapping:
+            label += ", нестабилен"
+        return label
+        
+    def _format_percentiles(self, state: TargetState) -> str:
+        p50, p95, p99 = state.latency.percentiles("total")
+        if p50 is None:
+            return "нет данных"
+        return f"p50 {p50:.0f} мс, p95 {p95:.0f} мс, p99 {p99:.0f} мс"
+                
+    async def _check_api(self, target: ProbeTarget) -> ProbeResult:
+        """
+        Проверка доступности цели с замером времени фаз. HTTP-цели проверяются
+        запросом через общий пул соединений, остальные - проверкой из PROBE_TYPES
+        по схеме URL (tcp://, tls://, dns://).
+        
+        Args:
+            target (ProbeTarget): Проверяемая цель
+            
+        Returns:
+            ProbeResult: Результат проверки (ok=True если API доступен)
+        """
+        timer = ProbeTimer()
+        try:
+            probe = PROBE_TYPES.get(target.kind)
+            if probe is not None:
+                result = await probe(target, timer)
+                if not result.ok:
+                    self.logger.warning(
+                        f"Проверка {target.name} не прошла: {result.error}",
+                        extra={"target": target.name, "error": result.error, "latency_ms": result.total}
+                    )
+                return result
+                
+            if target.method not in self.SUPPORTED_METHODS:
+                self.logger.error(f"Неподдерживаемый метод API: {target.method}", extra={"target": target.name})
+                return timer.result(ok=False, error=f"Неподдерживаемый метод {target.method}")
+                
+            session = await self.http.get()
+            timeout = aiohttp.ClientTimeout(total=target.timeout)
+            body = target.body if target.method != "GET" else None
+            async with session.request(
+                target.method,
+                target.url,
+                headers=target.headers,
+                data=body,
+                timeout=timeout,
+                trace_request_ctx=timer
+            ) as response:
+                # Тело читается потоком только до решения проверок ответа
+                mismatch = await target.matcher.check(response)
+                return timer.result(ok=mismatch is None, status=response.status, error=mismatch)
                     
         except Exception as e:
-            self.logger.error(f"Ошибка при проверке API: {e}")
-            return False
+            result = timer.result(ok=False, error=str(e) or type(e).__name__)
+            self.logger.error(
+                f"Ошибка при проверке API {target.name}: {e}",
+                extra={"target": target.name, "error": result.error, "latency_ms": result.total}
+            )
+            return result
             
     async def _make_alarm_calls(self, phones: List[str], api_info: str, timeout: int):
         """
@@ -192,31 +679,32 @@ class ApiMonitorRouter(BaseRouter):
                 self.logger.warning("Список телефонов для звонка пуст")
                 return
                 
-            api_key = self._get_env_value("ZVONOBOT_API_KEY")
+            config = self.config
+            api_key = config.zvonobot_api_key
             if not api_key:
                 self.logger.error("API-ключ Звонобота не указан в настройках")
                 return
                 
-            outgoing_phone = self._get_env_value("ZVONOBOT_OUTGOING_PHONE")
-            duty_phone = self._get_env_value("ZVONOBOT_DUTY_PHONE", int)
-            gender = self._get_env_value("ZVONOBOT_VOICE_GENDER", int)
+            outgoing_phone = config.zvonobot_outgoing_phone
+            duty_phone = config.zvonobot_duty_phone
+            gender = config.zvonobot_voice_gender
             
             # Получаем сообщение для звонка
-            message = self._get_env_value("ZVONOBOT_MESSAGE")
+            message = config.zvonobot_message
             if not message:
                 message = f"Внимание! API {api_info} недоступен более {timeout} секунд. Требуется проверка системы."
                 
-            # Создаем экземпляр Звонобота
-            zvonobot = ZvonoBot(api_key=api_key)
+            # Получаем общий асинхронный клиент Звонобота
+            zvonobot = self._get_zvonobot()
             
             # Выполняем звонки
-            result = zvonobot.make_bulk_call(
+            result = await self._timed_send("zvonobot", zvonobot.make_bulk_call(
                 phones=phones,
                 message=message,
                 outgoing_phone=outgoing_phone,
                 gender=gender,
                 duty_phone=duty_phone
-            )
+            ))
             
             self.logger.info(f"Отправлены звонки на номера: {', '.join(phones)}")
             self.logger.debug(f"Результат запроса к Звоноботу: {result}")
@@ -224,51 +712,257 @@ class ApiMonitorRouter(BaseRouter):
         except Exception as e:
             self.logger.error(f"Ошибка при отправке звонков: {e}")
                 
-    async def _send_notification(self, notification_message: Message):
+    async def _send_notification(self, state: TargetState):
         try:
-            api_url = self._get_env_value("ALARM_API_URL")
-            timeout = self._get_env_value("ALARM_TIMEOUT_FOR_MESSAGE", int)
+            target = state.target
+            timeout = self._alarm_timeout(target)
             
             notification_text = (
                 f"⚠️ ВНИМАНИЕ!\n\n"
-                f"API {api_url} недоступен "
-                f"более {timeout} секунд!\n"
-                f"Последняя успешная проверка была: {self.last_successful_check.strftime('%Y-%m-%d %H:%M:%S')}"
+                f"API {target.name} недоступен "
+                f"более {timeout:.0f} секунд!\n"
+                f"Последняя успешная проверка была: {state.last_successful_check.strftime('%Y-%m-%d %H:%M:%S')}"
             )
             
-            # Отправляем уведомление в Telegram
-            await notification_message.answer(notification_text)
-            self.logger.warning(f"Отправлено уведомление о недоступности API {api_url}")
+            # Отправляем уведомление в Telegram, при восстановлении оно будет изменено
+            incident = self.incidents.get(target.name)
+            if incident is not None:
+                await self._send_incident_message(incident, notification_text)
+            else:
+                await self._send_message(notification_text)
+            self.logger.warning(f"Отправлено уведомление о недоступности API {target.name}", extra=self._alarm_fields(state))
             
-            # Получаем список телефонов для звонка
-            phones = self._get_env_value("ALARM_PHONES_FOR_CALL", list)
+        except Exception as e:
+            self.logger.error(f"Ошибка при отправке уведомления: {e}")
             
-            # Отправляем звонки
-            await self._make_alarm_calls(phones, api_url, timeout)
+    async def _send_flapping_notification(self, state: TargetState, alarm: Alarm):
+        try:
+            policy = alarm.policy
+            notification_text = (
+                f"🔁 ВНИМАНИЕ!\n\n"
+                f"API {state.target.name} нестабилен: тревога переключалась {policy.flap_threshold} раз "
+                f"за {policy.flap_window:.0f} секунд.\n"
+                f"Уведомления приостановлены, пока состояние не будет стабильным {policy.flap_window:.0f} секунд."
+            )
+            await self._send_message(notification_text)
+            self.logger.warning(f"API {state.target.name} нестабилен, уведомления приостановлены", extra=self._alarm_fields(state))
+        except Exception as e:
+            self.logger.error(f"Ошибка при отправке уведомления: {e}")
             
+    async def _handle_alarm_event(self, event: AlarmEvent):
+        """
+        Реакция на событие тревоги: уведомление, звонок или запись в лог.
+        """
+        state = self.target_states.get(event.key)
+        if state is None:
+            return
+        name = state.target.name
+        if event.kind == AlarmEvent.FIRING:
+            self._alarms_total.labels(name, "unavailable").inc()
+            self._open_incident(state, event.alarm)
+            self.logger.warning(f"Тревога: API {name} недоступен", extra=self._alarm_fields(state))
+        elif event.kind == AlarmEvent.RESOLVED:
+            incident = self._close_incident(name)
+            fields = self._alarm_fields(state)
+            if incident is not None:
+                fields.update(alarm_id=incident.id, duration_s=round(incident.duration()), failures=incident.failures)
+                self._record_incident_history(incident)
+            self.logger.info(f"Тревога снята: API {name} снова доступен", extra=fields)
+        elif event.kind == AlarmEvent.FLAPPING:
+            await self._send_flapping_notification(state, event.alarm)
+        elif event.action == "telegram":
+            await self._send_notification(state)
+        else:
+            # Звонки выполняются в фоне, чтобы не задерживать мониторинг
+            timeout = int((datetime.now() - state.last_successful_check).total_seconds())
+            self._spawn(self._make_alarm_calls(self._alarm_phones(event.action), name, timeout))
+            
+    def _open_incident(self, state: TargetState, alarm: Alarm) -> Incident:
+        """
+        Открытие инцидента цели при срабатывании тревоги.
+        """
+        result = state.last_result
+        return self.incidents.open(
+            f"{self.MONITOR_NAME}:{state.target.name}:{int(alarm.fired_at or 0)}",
+            state.target.name,
+            f"API {state.target.name}",
+            "unavailable",
+            failures=alarm.fails,
+            error=(result.error or f"HTTP {result.status}") if result else None,
+            now=alarm.fired_at
+        )
+        
+    def _recovery_text(self, incident: Incident) -> str:
+        return (
+            f"✅ ВОССТАНОВЛЕНО\n\n"
+            f"API {incident.key} снова доступен.\n"
+            f"Был недоступен: {self._format_duration(incident.duration())} "
+            f"({self._format_time(incident.opened_at)} - {self._format_time(incident.closed_at)})\n"
+            f"Неудачных проверок: {incident.failures}\n"
+            f"Последняя ошибка: {incident.error or 'нет данных'}"
+        )
+        
+    def _alarm_fields(self, state: TargetState) -> Dict[str, Any]:
+        """
+        Поля тревоги цели для структурированных логов.
+        """
+        alarm = self.alarms.get(state.target.name)
+        result = state.last_result
+        return {
+            "target": state.target.name,
+            "alarm_id": f"{self.MONITOR_NAME}:{state.target.name}:{int(alarm.fired_at or 0)}" if alarm else None,
+            "alarm_state": alarm.state if alarm else None,
+            "alarm_kind": "unavailable",
+            "status": result.status if result else None,
+            "error": result.error if result else None,
+            "failures": state.failures,
+        }
+        
+    def _alarm_timeout(self, target: ProbeTarget) -> float:
+        """
+        Время недоступности цели (в секундах), после которого отправляется тревога.
+        """
+        if target.alarm_timeout is not None:
+            return target.alarm_timeout
+        return self.config.timeout_for_message
+            
+    def _latency_exceeded(self, state: TargetState):
+        """
+        Проверка превышения порога перцентиля задержки за окно.
+        
+        Args:
+            state (TargetState): Состояние цели
+            
+        Returns:
+            Optional[Tuple[float, float, float]]: (перцентиль, значение в мс, порог в мс) при превышении, иначе None
+        """
+        target = state.target
+        config = self.config
+        threshold = target.latency_threshold_ms
+        if threshold is None:
+            threshold = config.latency_threshold_ms
+        if threshold <= 0:
+            return None
+        percentile = target.latency_percentile
+        if percentile is None:
+            percentile = config.latency_percentile
+        min_samples = config.latency_min_samples
+        snapshot = state.latency.snapshot("total")
+        if snapshot.total < min_samples:
+            return None
+        value = snapshot.percentile(percentile)
+        if value is None or value <= threshold:
+            return None
+        return percentile, value, threshold
+        
+    async def _send_latency_notification(self, state: TargetState, exceeded):
+        try:
+            percentile, value, threshold = exceeded
+            notification_text = (
+                f"🐢 ВНИМАНИЕ!\n\n"
+                f"API {state.target.name} отвечает медленно: "
+                f"p{percentile:g} = {value:.0f} мс (порог {threshold:.0f} мс)\n"
+                f"Задержка: {self._format_percentiles(state)}"
+            )
+            await self._send_message(notification_text)
+            self.logger.warning(
+                f"Отправлено уведомление о высокой задержке API {state.target.name}: p{percentile:g} = {value:.0f} мс",
+                extra={
+                    "target": state.target.name,
+                    "alarm_kind": "latency",
+                    "percentile": percentile,
+                    "latency_ms": value,
+                    "threshold_ms": threshold,
+                }
+            )
         except Exception as e:
             self.logger.error(f"Ошибка при отправке уведомления: {e}")
             
-    async def _monitor_api(self, notification_message: Message):
-        while True:
-            try:
-                current_time = datetime.now()
-                time_diff = (current_time - self.last_successful_check).total_seconds()
-                timeout = self._get_env_value("ALARM_TIMEOUT_FOR_MESSAGE", int)
-                monitor_timeout = self._get_env_value("ALARM_MONITOR_TIMEOUT", int)
+    def _record_metrics(self, target: ProbeTarget, result: ProbeResult):
+        self._probe_total.labels(target.name).inc()
+        self._probe_up.labels(target.name).set(1 if result.ok else 0)
+        if result.cert_expires_at is not None:
+            self._cert_expiry.labels(target.name).set(result.cert_expires_at)
+        if result.ok:
+            self._last_success.labels(target.name).set_to_current_time()
+            for phase, value in result.timings().items():
+                if value is not None:
+                    self._probe_duration.labels(target.name, phase).observe(value / 1000)
+        else:
+            self._probe_failures.labels(target.name).inc()
+            
+    async def _handle_result(self, target: ProbeTarget, result: ProbeResult):
+        """
+        Обработка результата проверки цели: обновление состояния и отправка тревоги.
+        
+        Args:
+            target (ProbeTarget): Проверенная цель
+            result (ProbeResult): Результат проверки
+        """
+        state = self.target_states.get(target.name)
+        if state is None:
+            # Цель удалена при перезагрузке настроек во время проверки
+            return
+        current_time = datetime.now()
+        state.last_check = current_time
+        state.last_result = result
+        state.is_available = result.ok
+        self._record_metrics(target, result)
+        
+        if result.ok:
+            state.failures = 0
+            state.last_successful_check = current_time
+            self.last_successful_check = current_time
+            state.latency.record(result.timings())
+            
+            exceeded = self._latency_exceeded(state)
+            if exceeded is not None and (
+                state.last_latency_alarm is None
+                or (current_time - state.last_latency_alarm).total_seconds() > self._alarm_timeout(target)
+            ):
+                state.last_latency_alarm = current_time
+                self._alarms_total.labels(target.name, "latency").inc()
+                await self._send_latency_notification(state, exceeded)
+        else:
+            state.failures += 1
+            self.incidents.record_failure(target.name, result.error or f"HTTP {result.status}")
+            if result.status is not None:
+                # Ошибки запроса уже записаны в лог в _check_api
+                self.logger.warning(
+                    f"Проверка API {target.name} не прошла: {result.error or f'статус {result.status}'}",
+                    extra={"target": target.name, "status": result.status, "error": result.error, "latency_ms": result.total, "failures": state.failures}
+                )
                 
-                is_api_available = await self._check_api()
+        if self.history is not None:
+            try:
+                self.history.record(target.name, result.ok, result.status, result.total, current_time.timestamp())
+            except Exception as e:
+                self.logger.error(f"Ошибка записи истории проверок: {e}")
                 
-                if is_api_available:
-                    self.last_successful_check = current_time
-                elif time_diff > timeout:
-                    await self._send_notification(notification_message)
-                    self.last_successful_check = current_time
-                    
-                await asyncio.sleep(monitor_timeout)
+        for event in self.alarms.observe(target.name, result.ok, current_time.timestamp()):
+            await self._handle_alarm_event(event)
                 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Ошибка в мониторинге API: {e}")
-                await asyncio.sleep(monitor_timeout) 
\ No newline at end of file
+        if self.store is not None:
+            self.store.save_target(self.MONITOR_NAME, target.name, state=self._state_dict(state))
+            
+    async def _monitor_api(self, targets: List[ProbeTarget]):
+        engine = self.engine = ProbeEngine(
+            probe=self._check_api,
+            on_result=self._handle_result,
+            concurrency=self.config.api_concurrency,
+            logger=self.logger,
+            scheduler=self.scheduler,
+            name=self.MONITOR_NAME
+        )
+        self.logger.info(f"Запуск мониторинга {len(targets)} целей (параллельно не более {engine.concurrency})")
+        for family in (self._probe_total, self._probe_failures, self._probe_duration, self._probe_up, self._last_success, self._cert_expiry, self._alarms_total):
+            family.clear()
+        self._monitoring_active.labels("api").set(1)
+        try:
+            await engine.run(targets)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Ошибка в мониторинге API: {e}")
+        finally:
+            self._monitoring_active.labels("api").set(0)
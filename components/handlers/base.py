@@ -1,11 +1,329 @@
-from aiogram import Router
-from components.modules import EnvReader, Logger
-from dataclasses import dataclass
+from components.modules import EnvReader, Logger, AppConfig, AlarmManager, AlarmState, AsyncZvonoBot, ClusterCoordinator, Incident, IncidentLog, MetricsRegistry, ProbeHistory, StateStore, Scheduler, NotificationDispatcher
+from dataclasses import dataclass, field
+from functools import wraps
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Coroutine, Dict, List, Optional, Set, Type
+import asyncio
+import time
+
+if TYPE_CHECKING:
+    from aiogram import Bot, Router
+    from aiogram.types import Message
+
+# Реестр роутеров: модуль -> классы роутеров, объявленные в нём (заполняется при импорте модуля)
+ROUTERS: Dict[str, List[Type["BaseRouter"]]] = {}
 
 @dataclass
 class BaseRouter:
     env: EnvReader
     logger: Logger
+    metrics: MetricsRegistry = field(default_factory=MetricsRegistry)
+    bot: Optional["Bot"] = None
+    store: Optional[StateStore] = None
+    scheduler: Scheduler = field(default_factory=Scheduler)
+    notifier: Optional[NotificationDispatcher] = None
+    config: Optional[AppConfig] = None
+    cluster: Optional[ClusterCoordinator] = None
+    history: Optional[ProbeHistory] = None
+    
+    ZVONOBOT_CLIENT_FIELDS = frozenset({
+        "zvonobot_api_key",
+        "zvonobot_base_url",
+        "zvonobot_connect_timeout",
+        "zvonobot_read_timeout",
+        "zvonobot_retries",
+        "zvonobot_backoff_base",
+        "zvonobot_backoff_max",
+    })
+    ALARM_STATE_LABELS = {
+        AlarmState.OK: "✅ нет",
+        AlarmState.SUSPECT: "⚠️ подозрение",
+        AlarmState.FIRING: "🚨 тревога",
+        AlarmState.RECOVERING: "🔄 восстановление",
+    }
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        ROUTERS.setdefault(cls.__module__, []).append(cls)
+        
     def __post_init__(self):
-        self.router = Router() 
\ No newline at end of file
+        if self.config is None:
+            self.config = AppConfig.from_env(self.env)
+        self._router: Optional["Router"] = None
+        self.notification_chat_id: Optional[int] = None
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._zvonobot: Optional[AsyncZvonoBot] = None
+        self.incidents = IncidentLog(capacity=self.config.incident_history)
+        self._incident_sends: Dict[str, asyncio.Task] = {}
+        if self.notifier is None:
+            self.notifier = NotificationDispatcher.from_env(self.env, bot=self.bot, metrics=self.metrics, logger=self.logger, store=self.store)
+        self._notification_duration = self.metrics.histogram(
+            "notification_send_duration_seconds",
+            "Длительность отправки уведомлений",
+            ["channel"]
+        )
+        
+    @property
+    def router(self) -> "Router":
+        """
+        Router aiogram; создаётся при первом обращении, чтобы мониторинг
+        запускался, не дожидаясь загрузки aiogram.
+        """
+        if self._router is None:
+            from aiogram import Router
+            
+            self._router = Router()
+        return self._router
+        
+    def attach(self, dispatcher: Any):
+        """
+        Регистрация обработчиков команд и подключение роутера к Dispatcher.
+        """
+        self._register_handlers()
+        dispatcher.include_router(self.router)
+        
+    def _register_handlers(self):
+        """
+        Регистрация обработчиков в self.router (вызывается из attach, когда aiogram уже загружен).
+        """
+        pass
+        
+    def _check_access(self, func):
+        """
+        Декоратор обработчика: пропускает только пользователей из TELEGRAM_BOT_USERS_ID_ACCESS.
+        """
+        @wraps(func)
+        async def wrapper(message: "Message", *args, **kwargs):
+            if self.config.is_allowed(message.from_user.id):
+                self._remember_recipient(message)
+                return await func(message, *args, **kwargs)
+                
+            self.logger.warning(f"Попытка доступа к боту от неавторизованного пользователя {message.from_user.id}")
+            await message.answer("⛔️ У вас нет доступа к этому боту")
+        return wrapper
+        
+    def _spawn(self, coro: Coroutine) -> asyncio.Task:
+        """
+        Запуск корутины в фоне, чтобы медленные внешние вызовы не задерживали
+        мониторинг и обработку сообщений. Ссылка на задачу хранится до её завершения.
+        """
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+        
+    async def _timed_send(self, channel: str, coro: Coroutine) -> Any:
+        """
+        Выполнение отправки уведомления с замером длительности в метрике notification_send_duration_seconds.
+        """
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self._notification_duration.labels(channel).observe(time.perf_counter() - start)
+        
+    def _remember_chat(self, message: "Message"):
+        """
+        Запоминает чат, в который отправляются уведомления, и бота для отправки.
+        """
+        self.notification_chat_id = message.chat.id
+        if self.bot is None:
+            self.bot = message.bot
+            
+    def _remember_recipient(self, message: "Message"):
+        """
+        Запоминает личный чат пользователя с доступом как получателя уведомлений при 'all'.
+        """
+        if message.chat.type == "private":
+            self.notifier.remember(message.chat.id)
+            
+    def _notification_recipients(self) -> List[str]:
+        """
+        Получатели уведомлений: ALARM_USERS_ID_NOTIFICATION ('all' - все, кто писал боту)
+        и чат, из которого был запущен мониторинг.
+        """
+        return self.notifier.resolve(list(self.config.notify_users), extra=(self.notification_chat_id,))
+            
+    def _ready_recipients(self, text: str) -> List[str]:
+        """
+        Получатели уведомления; если их нет или бот не задан и не ожидается, пишет предупреждение в лог.
+        """
+        if self.notifier.bot is None and self.bot is not None:
+            self.notifier.bot = self.bot
+        recipients = self._notification_recipients()
+        if not self.notifier.ready or not recipients:
+            self.logger.warning(f"Получатели уведомлений не заданы, уведомление не отправлено: {text}")
+            return []
+        return recipients
+            
+    async def _send_message(self, text: str):
+        """
+        Рассылка уведомления всем получателям в фоне, чтобы мониторинг не ждал
+        отправки сотням чатов с учётом ограничений Telegram.
+        """
+        recipients = self._ready_recipients(text)
+        if recipients:
+            self._spawn(self._timed_send("telegram", self.notifier.send(recipients, text)))
+            
+    async def _send_incident_message(self, incident: Incident, text: str):
+        """
+        Рассылка уведомления об инциденте в фоне с запоминанием отправленных
+        сообщений, чтобы при восстановлении изменить их вместо отправки новых.
+        """
+        recipients = self._ready_recipients(text)
+        if recipients:
+            self._incident_sends[incident.id] = self._spawn(self._deliver_incident_message(incident, recipients, text))
+            
+    async def _deliver_incident_message(self, incident: Incident, recipients: List[str], text: str):
+        sent = await self._timed_send("telegram", self.notifier.send(recipients, text))
+        incident.messages.update({
+            chat_id: message.message_id
+            for chat_id, message in sent.items()
+            if message is not None
+        })
+        
+    async def _send_recovery(self, incident: Incident, text: str):
+        """
+        Сообщение о восстановлении: уведомления инцидента изменяются на месте,
+        в чаты, где изменить не удалось, отправляется новое сообщение. Если
+        о тревоге не уведомляли (эскалация не дошла до Telegram), ничего не отправляется.
+        """
+        pending = self._incident_sends.pop(incident.id, None)
+        if pending is not None:
+            await asyncio.gather(pending, return_exceptions=True)
+        if not incident.messages:
+            return
+        edited = await self._timed_send("telegram", self.notifier.edit(incident.messages, text))
+        failed = [chat_id for chat_id in incident.messages if not edited.get(chat_id)]
+        if failed:
+            await self._timed_send("telegram", self.notifier.send(failed, text))
+            
+    def _close_incident(self, key: str, notify: bool = True) -> Optional[Incident]:
+        """
+        Закрытие инцидента цели; при notify уведомления о нём изменяются в фоне на сообщение о восстановлении.
+        """
+        incident = self.incidents.close(key)
+        if incident is None:
+            return None
+        if notify:
+            self._spawn(self._send_recovery(incident, self._recovery_text(incident)))
+        else:
+            self._incident_sends.pop(incident.id, None)
+        return incident
+        
+    def _close_stale_incidents(self, alarms: AlarmManager):
+        """
+        Закрытие открытых инцидентов, тревога которых уже не активна (например, после сброса состояния).
+        """
+        for incident in self.incidents.active():
+            alarm = alarms.get(incident.key)
+            if alarm is None or not alarm.active:
+                self._close_incident(incident.key, notify=False)
+                
+    def _recovery_text(self, incident: Incident) -> str:
+        """
+        Текст сообщения о восстановлении, которым заменяется уведомление о тревоге.
+        """
+        return (
+            f"✅ ВОССТАНОВЛЕНО\n\n"
+            f"{incident.title}: тревога снята.\n"
+            f"Тревога длилась: {self._format_duration(incident.duration())} "
+            f"({self._format_time(incident.opened_at)} - {self._format_time(incident.closed_at)})\n"
+            f"Неудачных проверок: {incident.failures}"
+        )
+        
+    @staticmethod
+    def _format_duration(seconds: float) -> str:
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        if hours:
+            return f"{hours} ч {minutes} мин"
+        if minutes:
+            return f"{minutes} мин {seconds} сек"
+        return f"{seconds} сек"
+        
+    @staticmethod
+    def _format_time(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        
+    def _format_incidents(self, limit: int = 10) -> str:
+        """
+        Текст последних инцидентов для команды /incidents.
+        """
+        incidents = self.incidents.recent(limit)
+        if not incidents:
+            return "📋 Инцидентов не было"
+        now = time.time()
+        lines = ["📋 Последние инциденты:\n"]
+        for incident in incidents:
+            if incident.is_open:
+                lines.append(
+                    f"🔴 {incident.title} - с {self._format_time(incident.opened_at)}, "
+                    f"идёт {self._format_duration(incident.duration(now))}, "
+                    f"неудачных проверок: {incident.failures}"
+                )
+            else:
+                lines.append(
+                    f"✅ {incident.title} - {self._format_time(incident.opened_at)} - "
+                    f"{self._format_time(incident.closed_at)} ({self._format_duration(incident.duration())}), "
+                    f"неудачных проверок: {incident.failures}"
+                )
+        return "\n".join(lines)
+        
+    def _alarm_phones(self, action: str) -> List[str]:
+        """
+        Телефоны для ступени эскалации: call - ALARM_PHONES_FOR_CALL, duty - ALARM_DUTY_PHONES.
+        """
+        phones = self.config.duty_phones if action == "duty" else self.config.phones_for_call
+        return sorted(phones)
+        
+    def _get_zvonobot(self) -> AsyncZvonoBot:
+        """
+        Получение общего асинхронного клиента Звонобота по снимку настроек
+        (пересоздаётся при изменении полей ZVONOBOT_CLIENT_FIELDS).
+        """
+        if self._zvonobot is None:
+            config = self.config
+            self._zvonobot = AsyncZvonoBot(
+                api_key=config.zvonobot_api_key,
+                base_url=config.zvonobot_base_url,
+                connect_timeout=config.zvonobot_connect_timeout,
+                read_timeout=config.zvonobot_read_timeout,
+                retries=config.zvonobot_retries,
+                backoff_base=config.zvonobot_backoff_base,
+                backoff_max=config.zvonobot_backoff_max
+            )
+        return self._zvonobot
+        
+    async def apply_config(self, old: AppConfig, changed: Set[str]):
+        """
+        Применение нового снимка настроек (self.config уже заменён) без перезапуска задач.
+        
+        Args:
+            old (AppConfig): Предыдущий снимок
+            changed (Set[str]): Изменившиеся поля AppConfig и файлы ("file:<путь>")
+        """
+        if "incident_history" in changed:
+            self.incidents.resize(self.config.incident_history)
+        if self._zvonobot is not None and changed & self.ZVONOBOT_CLIENT_FIELDS:
+            self._spawn(self._zvonobot.close())
+            self._zvonobot = None
+        
+    async def resume(self):
+        """
+        Восстановление работы после перезапуска (например, запуск ранее активного мониторинга).
+        """
+        pass
+        
+    async def close(self):
+        """
+        Освобождение ресурсов роутера (фоновые задачи, сессии) при остановке бота.
+        """
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._zvonobot is not None:
+            await self._zvonobot.close()
+            self._zvonobot = None
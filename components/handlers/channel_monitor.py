@@ -1,96 +1,119 @@
-from aiogram import F
-from aiogram.filters import Command
-from aiogram.types import Message
 from components.handlers.base import BaseRouter
-from components.modules import ZvonoBot
+from components.modules import ANY_AUTHOR, Alarm, AlarmEvent, AlarmManager, AlarmPolicy, AlarmState, AppConfig, Incident, SilenceEntry, SilenceTracker
 import asyncio
+import time
 from datetime import datetime
-from functools import wraps
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+if TYPE_CHECKING:
+    from aiogram.types import Message
 
 class ChannelMonitorRouter(BaseRouter):
+    MONITOR_NAME = "channel"
+    CHAT_TYPES = {"channel", "group", "supergroup"}
+    TRACKER_FIELDS = frozenset({
+        "timeout_for_message",
+        "monitor_channel_ids",
+        "message_author_ids",
+        "channel_timeouts",
+    })
+    ALARM_FIELDS = frozenset({
+        "alarm_flap_threshold",
+        "alarm_flap_window",
+        "alarm_escalation",
+    })
+    
     def __post_init__(self):
         super().__post_init__()
-        self._register_handlers()
-        self.last_message_time = datetime.now()
+        self.tracker = self._build_tracker()
+        self.alarms = AlarmManager(self._alarm_policy())
         self.monitoring_task = None
+        self._send_notification = self.logger.profile(self._send_notification)
+        self._init_metrics()
+        
+    def _init_metrics(self):
+        self._alarms_total = self.metrics.counter("alarms_total", "Количество отправленных тревог", ["target", "kind"])
+        self._messages_total = self.metrics.counter("channel_messages_total", "Количество полученных сообщений из каналов")
+        self._monitoring_active = self.metrics.gauge("monitoring_active", "Запущен ли мониторинг", ["monitor"])
+        self._monitoring_active.labels("channel").set(0)
+        self.metrics.gauge(
+            "channel_seconds_since_last_message",
+            "Время с последнего сообщения в чате (от автора) в секундах",
+            ["chat", "author"]
+        ).set_function(self._silence_samples)
+        self.metrics.gauge(
+            "alarm_state_targets",
+            "Количество целей по состоянию тревоги",
+            ["state"]
+        ).set_function(lambda: [((state,), value) for state, value in self.alarms.counts().items()])
         
-    def _get_env_value(self, key: str, expected_type: type = str) -> Any:
+    def _silence_samples(self):
+        now = time.time()
+        return [((entry.chat_id, entry.author_id), now - entry.last_seen) for entry in self.tracker.entries()]
+        
+    def _build_tracker(self) -> SilenceTracker:
+        """
+        Создание индекса тишины по ALARM_MONITOR_CHANNEL_ID, ALARM_MESSAGE_AUTHOR_ID,
+        ALARM_TIMEOUT_FOR_MESSAGE и ALARM_CHANNEL_TIMEOUTS.
         """
-        Безопасное получение значения из переменных окружения с преобразованием типа.
+        config = self.config
+        return SilenceTracker(
+            default_timeout=config.timeout_for_message,
+            channels=config.monitor_channel_ids,
+            authors=config.message_author_ids,
+            timeouts=config.channel_timeouts
+        )
         
-        Args:
-            key (str): Ключ переменной окружения
-            expected_type (type): Ожидаемый тип данных (str, int, bool, list)
-            
-        Returns:
-            Any: Значение переменной окружения нужного типа или значение по умолчанию
+    def _alarm_policy(self) -> AlarmPolicy:
         """
-        try:
-            # Сначала пробуем получить значение через атрибут
-            value = getattr(self.env, key, None)
-            
-            # Если значение не найдено, возвращаем значение по умолчанию для типа
-            if value is None:
-                self.logger.warning(f"Переменная {key} не найдена, возвращается значение по умолчанию")
-                return [] if expected_type == list else expected_type()
-            
-            # Преобразуем в нужный тип, если необходимо
-            if expected_type == list and isinstance(value, str):
-                    return [v.strip() for v in value.split(",")]
-            elif expected_type == list:
-                return value if isinstance(value, list) else []
-            elif expected_type == int and not isinstance(value, int):
-                return int(value)
-            elif expected_type == bool and not isinstance(value, bool):
-                return bool(value)
-            elif expected_type == str and not isinstance(value, str):
-                return str(value)
-                
-            return value
-            
-        except Exception as e:
-            self.logger.error(f"Ошибка при получении {key} из env: {e}")
-            return [] if expected_type == list else expected_type()
-            
-    def _check_access(self, func):
-        @wraps(func)
-        async def wrapper(message: Message, *args, **kwargs):
-            user_id = str(message.from_user.id)
-            allowed_users = self._get_env_value("TELEGRAM_BOT_USERS_ID_ACCESS", list)
-            
-            if "all" in allowed_users:
-                return await func(message, *args, **kwargs)
-                
-            if user_id in allowed_users:
-                return await func(message, *args, **kwargs)
-                
-            self.logger.warning(f"Попытка доступа к боту от неавторизованного пользователя {user_id}")
-            await message.answer("⛔️ У вас нет доступа к этому боту")
-        return wrapper
+        Правила тревоги тишины: таймаут тишины уже отсеивает случайные паузы,
+        поэтому тревога срабатывает при первом истечении и снимается первым
+        сообщением. Нестабильность и эскалация берутся из общих настроек.
+        """
+        return AlarmPolicy.from_config(self.config, fail_threshold=1, fail_window=1, recover_threshold=1)
+        
+    def _state_dict(self, entry: SilenceEntry) -> Dict[str, Any]:
+        """
+        Сохраняемое состояние записи вместе с состоянием тревоги.
+        """
+        data = entry.to_dict()
+        alarm = self.alarms.get(entry.key)
+        if alarm is not None:
+            data["alarm"] = alarm.to_dict()
+        incident = self.incidents.get(entry.key)
+        if incident is not None:
+            data["incident"] = incident.to_dict()
+        return data
         
     def _register_handlers(self):
+        from aiogram import F
+        from aiogram.filters import Command, CommandObject
+        from aiogram.types import Message
+        
         @self.router.message(Command("start"))
         @self._check_access
         async def cmd_start(message: Message):
-            timeout = self._get_env_value("ALARM_TIMEOUT_FOR_MESSAGE", int)
-            monitor_timeout = self._get_env_value("ALARM_MONITOR_TIMEOUT", int)
-            channel_id = self._get_env_value("ALARM_MONITOR_CHANNEL_ID")
-            author_id = self._get_env_value("ALARM_MESSAGE_AUTHOR_ID")
-            notify_users = self._get_env_value("ALARM_USERS_ID_NOTIFICATION", list)
-            phones_for_call = self._get_env_value("ALARM_PHONES_FOR_CALL", list)
+            config = self.config
+            timeout = config.timeout_for_message
+            monitor_timeout = config.monitor_timeout
+            channels = self.tracker.channels
+            authors = self.tracker.authors
+            notify_users = config.notify_users
+            phones_for_call = sorted(config.phones_for_call)
             
             help_text = (
                 "👋 Привет! Я бот для мониторинга каналов.\n\n"
                 "📝 Доступные команды:\n"
                 "/start_monitoring - Запустить мониторинг каналов\n"
                 "/stop_monitoring - Остановить мониторинг\n"
-                "/status - Показать текущий статус мониторинга\n\n"
+                "/status - Показать текущий статус мониторинга\n"
+                "/incidents [N] - Последние инциденты\n\n"
                 "⚙️ Настройки в .env:\n"
                 f"• Таймаут: {timeout} сек\n"
                 f"• Интервал проверки: {monitor_timeout} сек\n"
-                f"• Мониторинг: {'всех каналов' if channel_id == 'auto' else f'канала {channel_id}'}\n"
-                f"• Автор сообщений: {'все' if author_id == 'all' else author_id}\n"
+                f"• Мониторинг: {'всех каналов' if channels is None else 'каналов ' + ', '.join(sorted(channels))}\n"
+                f"• Авторы сообщений: {'все' if authors is None else ', '.join(sorted(authors))}\n"
+                f"• Индивидуальные таймауты: {len(self.tracker.timeouts) or 'нет'}\n"
                 f"• Получатели уведомлений: {'все' if 'all' in notify_users else ', '.join(notify_users)}\n"
                 f"• Телефоны для звонков: {', '.join(phones_for_call) if phones_for_call else 'не указаны'}\n\n"
                 "ℹ️ Для начала работы отправьте /start_monitoring"
@@ -101,24 +124,22 @@ class ChannelMonitorRouter(BaseRouter):
         @self._check_access
         async def cmd_status(message: Message):
             if self.monitoring_task and not self.monitoring_task.done():
-                time_since_last = (datetime.now() - self.last_message_time).total_seconds()
-                monitor_timeout = self._get_env_value("ALARM_MONITOR_TIMEOUT", int)
-                status_text = (
-                    "📊 Статус мониторинга:\n\n"
-                    f"• Мониторинг: ✅ Активен\n"
-                    f"• Последнее сообщение: {self.last_message_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                    f"• Прошло времени: {int(time_since_last)} сек\n"
-                    f"• Следующая проверка через: {max(0, monitor_timeout - time_since_last):.0f} сек"
-                )
+                await message.answer(self._format_status())
             else:
-                status_text = "📊 Статус мониторинга:\n\n• Мониторинг: ❌ Неактивен"
-            await message.answer(status_text)
+                await message.answer("📊 Статус мониторинга:\n\n• Мониторинг: ❌ Неактивен")
+                
+        @self.router.message(Command("incidents"))
+        @self._check_access
+        async def cmd_incidents(message: Message, command: CommandObject):
+            limit = int(command.args) if command.args and command.args.strip().isdigit() else 10
+            await message.answer(self._format_incidents(max(1, limit)))
             
         @self.router.message(Command("start_monitoring"))
         @self._check_access
         async def cmd_start_monitoring(message: Message):
             if self.monitoring_task is None or self.monitoring_task.done():
-                self.monitoring_task = asyncio.create_task(self._monitor_channel(message))
+                self._remember_chat(message)
+                self._start_monitoring()
                 await message.answer("🔍 Мониторинг канала запущен")
             else:
                 await message.answer("⚠️ Мониторинг уже запущен")
@@ -128,33 +149,264 @@ class ChannelMonitorRouter(BaseRouter):
         async def cmd_stop_monitoring(message: Message):
             if self.monitoring_task and not self.monitoring_task.done():
                 self.monitoring_task.cancel()
+                self._save_monitor_state(active=False)
                 await message.answer("🛑 Мониторинг канала остановлен")
             else:
                 await message.answer("⚠️ Мониторинг не был запущен")
                 
-        @self.router.message(F.chat.type.in_({"channel", "group"}))
+        @self.router.message(F.chat.type.in_(self.CHAT_TYPES))
+        @self.router.channel_post(F.chat.type.in_(self.CHAT_TYPES))
         async def handle_channel_message(message: Message):
-            self.last_message_time = datetime.now()
+            self._on_message(message)
+            
+    def _on_message(self, message: "Message"):
+        """
+        Учёт сообщения в индексе тишины. Автор - пользователь, а для постов
+        каналов и анонимных администраторов - чат-отправитель.
+        """
+        if message.from_user is not None:
+            author_id = message.from_user.id
+        elif message.sender_chat is not None:
+            author_id = message.sender_chat.id
+        else:
+            author_id = None
+        entry = self.tracker.touch(message.chat.id, author_id, title=message.chat.title)
+        if entry is None:
+            return
+        self._messages_total.labels().inc()
+        alarm = self.alarms.get(entry.key)
+        if alarm is not None and (alarm.state != AlarmState.OK or alarm.flapping):
+            events = self.alarms.observe(entry.key, True)
+            if events:
+                self._spawn(self._handle_alarm_events(events))
+        if self.store is not None:
+            self.store.save_target(self.MONITOR_NAME, entry.key, state=self._state_dict(entry))
+            
+    def _describe(self, entry: SilenceEntry) -> str:
+        """
+        Описание записи для уведомлений и статуса.
+        """
+        return f"канале {self._label(entry)}"
+        
+    def _label(self, entry: SilenceEntry) -> str:
+        chat = f"{entry.title} ({entry.chat_id})" if entry.title else entry.chat_id
+        if entry.author_id == ANY_AUTHOR:
+            return chat
+        return f"{chat} от автора {entry.author_id}"
+        
+    def _format_status(self) -> str:
+        now = time.time()
+        monitor_timeout = self.config.monitor_timeout
+        lines = [
+            "📊 Статус мониторинга:\n",
+            "• Мониторинг: ✅ Активен",
+            f"• Отслеживается: {len(self.tracker)} (чат, автор)",
+            f"• Интервал проверки: {monitor_timeout} сек",
+        ]
+        alarm_counts = self.alarms.counts()
+        lines.append(
+            f"• Тревог: {alarm_counts[AlarmState.FIRING] + alarm_counts[AlarmState.RECOVERING]}, "
+            f"нестабильных: {len(self.alarms.flapping())}"
+        )
+        silent = self.tracker.most_silent(10)
+        if silent:
+            lines.append("\n🔇 Дольше всего без сообщений:")
+            for entry in silent:
+                alarm = self.alarms.get(entry.key)
+                label = self.ALARM_STATE_LABELS[alarm.state] if alarm is not None else self.ALARM_STATE_LABELS[AlarmState.OK]
+                lines.append(
+                    f"• {self._label(entry)}: {int(now - entry.last_seen)} сек, тревога {label} "
+                    f"(таймаут {int(entry.timeout)} сек, "
+                    f"последнее {datetime.fromtimestamp(entry.last_seen).strftime('%Y-%m-%d %H:%M:%S')})"
+                )
+        return "\n".join(lines)
+            
+    def _start_monitoring(self, delay: Optional[float] = None):
+        added = self.tracker.watch_configured()
+        if added:
+            self.logger.info(f"Добавлено {added} отслеживаемых пар (чат, автор) из настроек")
+        self._close_stale_incidents(self.alarms)
+        self._save_monitor_state(active=True)
+        self.monitoring_task = asyncio.create_task(self._monitor_channel(delay))
+        
+    def _save_monitor_state(self, active: bool):
+        if self.store is None:
+            return
+        self.store.set(f"{self.MONITOR_NAME}:active", active)
+        self.store.set(f"{self.MONITOR_NAME}:chat_id", self.notification_chat_id)
+        for entry in self.tracker.entries():
+            self.store.save_target(self.MONITOR_NAME, entry.key, state=self._state_dict(entry))
+        
+    async def apply_config(self, old: AppConfig, changed: Set[str]):
+        """
+        Применение новых настроек: индекс тишины пересобирается с сохранением
+        времени последних сообщений, интервал проверки меняется без перезапуска задачи.
+        """
+        await super().apply_config(old, changed)
+        if changed & self.TRACKER_FIELDS:
+            saved = {entry.key: entry.to_dict() for entry in self.tracker.entries()}
+            tracker = self._build_tracker()
+            tracker.restore(saved)
+            if self.monitoring_task is not None and not self.monitoring_task.done():
+                tracker.watch_configured()
+            self.tracker = tracker
+            for alarm in self.alarms.values():
+                chat_id, _, author_id = alarm.key.rpartition(":")
+                if tracker.get(chat_id, author_id) is None:
+                    self.alarms.remove(alarm.key)
+                    self._close_incident(alarm.key, notify=False)
+            if self.store is not None:
+                self.store.replace_targets(
+                    self.MONITOR_NAME,
+                    {entry.key: (None, self._state_dict(entry)) for entry in tracker.entries()}
+                )
+            self.logger.info(f"Индекс тишины обновлён: отслеживается {len(tracker)} пар (чат, автор)")
+        if changed & self.ALARM_FIELDS:
+            policy = self.alarms.policy = self._alarm_policy()
+            for alarm in self.alarms.values():
+                self.alarms.add(alarm.key, policy)
+        if "monitor_timeout" in changed:
+            self.scheduler.update(f"{self.MONITOR_NAME}:silence", interval=self.config.monitor_timeout)
             
-    async def _monitor_channel(self, notification_message: Message):
-        while True:
+    async def resume(self):
+        """
+        Восстановление индекса тишины и мониторинга каналов, активного до перезапуска.
+        """
+        if self.store is None:
+            return
+        saved = self.store.load_targets(self.MONITOR_NAME)
+        restored = self.tracker.restore({name: data["state"] for name, data in saved.items()})
+        for name, data in saved.items():
+            chat_id, _, author_id = name.rpartition(":")
+            if (data["state"] or {}).get("alarm") and self.tracker.get(chat_id, author_id) is not None:
+                self.alarms.restore(name, data["state"]["alarm"])
+                self.incidents.restore(data["state"].get("incident"))
+        if restored:
+            self.logger.info(f"Восстановлено {restored} отслеживаемых пар (чат, автор)")
+        if not self.store.get(f"{self.MONITOR_NAME}:active"):
+            return
+        self.notification_chat_id = self.store.get(f"{self.MONITOR_NAME}:chat_id")
+        # Первую проверку откладываем, чтобы успели прийти накопившиеся за простой сообщения
+        self._start_monitoring(delay=self.config.monitor_timeout)
+        self.logger.info("Мониторинг каналов возобновлён после перезапуска")
+        
+    async def close(self):
+        if self.monitoring_task and not self.monitoring_task.done():
+            self.monitoring_task.cancel()
             try:
-                current_time = datetime.now()
-                time_diff = (current_time - self.last_message_time).total_seconds()
-                timeout = self._get_env_value("ALARM_TIMEOUT_FOR_MESSAGE", int)
-                monitor_timeout = self._get_env_value("ALARM_MONITOR_TIMEOUT", int)
-                
-                if time_diff > timeout:
-                    await self._send_notification(notification_message)
-                    self.last_message_time = current_time
+                await self.monitoring_task
+            except asyncio.CancelledError:
+                pass
+        await super().close()
+            
+    async def _monitor_channel(self, delay: Optional[float] = None):
+        self._monitoring_active.labels("channel").set(1)
+        try:
+            await self._monitor_channel_loop(delay)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._monitoring_active.labels("channel").set(0)
+            
+    async def _monitor_channel_loop(self, delay: Optional[float] = None):
+        monitor_timeout = self.config.monitor_timeout
+        key = f"{self.MONITOR_NAME}:silence"
+        self.scheduler.add(key, monitor_timeout, self._check_silence, delay=delay or 0)
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            self.scheduler.remove(key)
+            
+    async def _check_silence(self):
+        try:
+            now = time.time()
+            for entry in self.tracker.expired(now):
+                self.incidents.record_failure(entry.key)
+                await self._handle_alarm_events(self.alarms.observe(entry.key, False, now))
+                if self.store is not None:
+                    self.store.save_target(self.MONITOR_NAME, entry.key, state=self._state_dict(entry))
+            await self._handle_alarm_events(self.alarms.due(now))
                     
-                await asyncio.sleep(monitor_timeout)
+        except Exception as e:
+            self.logger.error(f"Ошибка в мониторинге канала: {e}")
+            
+    async def _handle_alarm_events(self, events: List[AlarmEvent]):
+        """
+        Реакция на события тревоги: уведомление, звонок или запись в лог.
+        """
+        for event in events:
+            chat_id, _, author_id = event.key.rpartition(":")
+            entry = self.tracker.get(chat_id, author_id)
+            if entry is None:
+                continue
+            if event.kind == AlarmEvent.FIRING:
+                self._alarms_total.labels(entry.key, "silence").inc()
+                self._open_incident(entry, event.alarm)
+                self.logger.warning(f"Тревога: нет сообщений в {self._describe(entry)}", extra=self._alarm_fields(entry))
+            elif event.kind == AlarmEvent.RESOLVED:
+                incident = self._close_incident(entry.key)
+                fields = self._alarm_fields(entry)
+                if incident is not None:
+                    fields.update(alarm_id=incident.id, duration_s=round(incident.duration()), failures=incident.failures)
+                self.logger.info(f"Тревога снята: появились сообщения в {self._describe(entry)}", extra=fields)
+            elif event.kind == AlarmEvent.FLAPPING:
+                await self._send_flapping_notification(entry)
+            elif event.action == "telegram":
+                await self._send_notification(entry)
+            else:
+                # Звонки выполняются в фоне, чтобы не задерживать мониторинг
+                self._spawn(self._make_alarm_calls(self._alarm_phones(event.action), self._describe(entry), int(entry.timeout)))
                 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Ошибка в мониторинге канала: {e}")
-                await asyncio.sleep(monitor_timeout)
+    def _open_incident(self, entry: SilenceEntry, alarm: Alarm) -> Incident:
+        """
+        Открытие инцидента записи при срабатывании тревоги.
+        """
+        return self.incidents.open(
+            f"{self.MONITOR_NAME}:{entry.key}:{int(alarm.fired_at or 0)}",
+            entry.key,
+            f"Канал {self._label(entry)}",
+            "silence",
+            failures=alarm.fails,
+            now=alarm.fired_at
+        )
+        
+    def _recovery_text(self, incident: Incident) -> str:
+        return (
+            f"✅ ВОССТАНОВЛЕНО\n\n"
+            f"{incident.title}: снова появились сообщения.\n"
+            f"Тревога длилась: {self._format_duration(incident.duration())} "
+            f"({self._format_time(incident.opened_at)} - {self._format_time(incident.closed_at)})\n"
+            f"Истёкших таймаутов тишины: {incident.failures}"
+        )
+        
+    def _alarm_fields(self, entry: SilenceEntry) -> Dict[str, Any]:
+        """
+        Поля тревоги записи для структурированных логов.
+        """
+        alarm = self.alarms.get(entry.key)
+        return {
+            "target": entry.key,
+            "chat_id": entry.chat_id,
+            "author_id": entry.author_id,
+            "alarm_id": f"{self.MONITOR_NAME}:{entry.key}:{int(alarm.fired_at or 0)}" if alarm else None,
+            "alarm_state": alarm.state if alarm else None,
+            "alarm_kind": "silence",
+            "silence_seconds": round(time.time() - entry.last_seen),
+        }
+        
+    async def _send_flapping_notification(self, entry: SilenceEntry):
+        try:
+            policy = self.alarms.policy
+            notification_text = (
+                f"🔁 ВНИМАНИЕ!\n\n"
+                f"Сообщения в {self._describe(entry)} приходят нестабильно: тревога переключалась "
+                f"{policy.flap_threshold} раз за {policy.flap_window:.0f} секунд.\n"
+                f"Уведомления приостановлены, пока состояние не будет стабильным {policy.flap_window:.0f} секунд."
+            )
+            await self._send_message(notification_text)
+            self.logger.warning(f"Нестабильные сообщения в {self._describe(entry)}, уведомления приостановлены", extra=self._alarm_fields(entry))
+        except Exception as e:
+            self.logger.error(f"Ошибка при отправке уведомления: {e}")
     
     async def _make_alarm_calls(self, phones: List[str], channel_info: str, timeout: int):
         """
@@ -170,31 +422,32 @@ class ChannelMonitorRouter(BaseRouter):
                 self.logger.warning("Список телефонов для звонка пуст")
                 return
                 
-            api_key = self._get_env_value("ZVONOBOT_API_KEY")
+            config = self.config
+            api_key = config.zvonobot_api_key
             if not api_key:
                 self.logger.error("API-ключ Звонобота не указан в настройках")
                 return
                 
-            outgoing_phone = self._get_env_value("ZVONOBOT_OUTGOING_PHONE")
-            duty_phone = self._get_env_value("ZVONOBOT_DUTY_PHONE", int)
-            gender = self._get_env_value("ZVONOBOT_VOICE_GENDER", int)
+            outgoing_phone = config.zvonobot_outgoing_phone
+            duty_phone = config.zvonobot_duty_phone
+            gender = config.zvonobot_voice_gender
             
             # Получаем сообщение для звонка
-            message = self._get_env_value("ZVONOBOT_MESSAGE")
+            message = config.zvonobot_message
             if not message:
                 message = f"Внимание! В {channel_info} не было новых сообщений более {timeout} секунд. Требуется проверка системы."
                 
-            # Создаем экземпляр Звонобота
-            zvonobot = ZvonoBot(api_key=api_key)
+            # Получаем общий асинхронный клиент Звонобота
+            zvonobot = self._get_zvonobot()
             
             # Выполняем звонки
-            result = zvonobot.make_bulk_call(
+            result = await self._timed_send("zvonobot", zvonobot.make_bulk_call(
                 phones=phones,
                 message=message,
                 outgoing_phone=outgoing_phone,
                 gender=gender,
                 duty_phone=duty_phone
-            )
+            ))
             
             self.logger.info(f"Отправлены звонки на номера: {', '.join(phones)}")
             self.logger.debug(f"Результат запроса к Звоноботу: {result}")
@@ -202,28 +455,25 @@ class ChannelMonitorRouter(BaseRouter):
         except Exception as e:
             self.logger.error(f"Ошибка при отправке звонков: {e}")
                 
-    async def _send_notification(self, notification_message: Message):
+    async def _send_notification(self, entry: SilenceEntry):
         try:
-            channel_id = self._get_env_value("ALARM_MONITOR_CHANNEL_ID")
-            timeout = self._get_env_value("ALARM_TIMEOUT_FOR_MESSAGE", int)
-            channel_info = "всех каналах" if channel_id == "auto" else f"канале {channel_id}"
+            channel_info = self._describe(entry)
+            timeout = int(entry.timeout)
             
             notification_text = (
                 f"⚠️ ВНИМАНИЕ!\n\n"
                 f"В {channel_info} не было новых сообщений "
                 f"более {timeout} секунд!\n"
-                f"Последнее сообщение было: {self.last_message_time.strftime('%Y-%m-%d %H:%M:%S')}"
+                f"Последнее сообщение было: {datetime.fromtimestamp(entry.last_seen).strftime('%Y-%m-%d %H:%M:%S')}"
             )
             
-            # Отправляем уведомление в Telegram
-            await notification_message.answer(notification_text)
-            self.logger.warning(f"Отправлено уведомление о отсутствии сообщений в {channel_info}")
-            
-            # Получаем список телефонов для звонка
-            phones = self._get_env_value("ALARM_PHONES_FOR_CALL", list)
-            
-            # Отправляем звонки
-            await self._make_alarm_calls(phones, channel_info, timeout)
+            # Отправляем уведомление в Telegram, при восстановлении оно будет изменено
+            incident = self.incidents.get(entry.key)
+            if incident is not None:
+                await self._send_incident_message(incident, notification_text)
+            else:
+                await self._send_message(notification_text)
+            self.logger.warning(f"Отправлено уведомление о отсутствии сообщений в {channel_info}", extra=self._alarm_fields(entry))
             
         except Exception as e:
             self.logger.error(f"Ошибка при отправке уведомления: {e}") 
\ No newline at end of file
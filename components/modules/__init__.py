@@ -1,27 +1,100 @@
-import os
 import warnings
 import importlib
-from typing import List
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple
+)
+
+# Явный реестр модулей пакета: модуль -> экспортируемые имена.
+# Модуль импортируется при первом обращении к любому из своих имён
+# (from components.modules import X), поэтому запуск не тратит время
+# на модули, которые не нужны текущему режиму. Новый модуль нужно
+# добавить сюда, иначе его имена не будут доступны из пакета.
+MODULES: Dict[str, Tuple[str, ...]] = {
+    "alarm": ("AlarmState", "ESCALATION_ACTIONS", "parse_escalation", "AlarmPolicy", "AlarmEvent", "Alarm", "AlarmManager"),
+    "applogger": ("JsonFormatter", "BoundedQueueHandler", "BoundedQueueListener", "Logger"),
+    "cluster": ("LeaseBackend", "LEASE_BACKENDS", "register_lease_backend", "FileLeaseBackend", "SqliteLeaseBackend", "HashRing", "ClusterCoordinator"),
+    "config": ("AppConfig",),
+    "envreader": ("EnvReader",),
+    "histogram": ("LatencyHistogram", "percentiles_from_counts", "WindowedHistogram", "LatencyTracker"),
+    "history": (
+        "HISTORY_LATENCY_RANGE",
+        "SeriesColumn",
+        "HISTORY_PERIOD_UNITS",
+        "history_histogram",
+        "parse_history_period",
+        "parse_history_window",
+        "SeriesSegment",
+        "SegmentedSeries",
+        "RollupSegment",
+        "RollupSeries",
+        "HistorySummary",
+        "ProbeHistory",
+    ),
+    "httppool": ("HttpSession",),
+    "incidents": ("Incident", "IncidentLog"),
+    "matcher": ("parse_status_codes", "parse_json_expectations", "ResponseMatcher"),
+    "metrics": ("DEFAULT_BUCKETS", "CounterChild", "GaugeChild", "HistogramChild", "MetricFamily", "MetricsRegistry", "measure_loop_lag", "MetricsServer"),
+    "netprobes": ("ProbeError", "ProbeFunction", "PROBE_TYPES", "PROBE_DEFAULT_PORTS", "register_probe", "tcp_probe", "tls_probe", "dns_probe"),
+    "notifier": ("TokenBucket", "NotificationDispatcher"),
+    "probe": (
+        "ProbeTarget",
+        "ProbeResult",
+        "TargetState",
+        "create_timing_trace_config",
+        "ProbeTimer",
+        "parse_headers",
+        "load_targets_file",
+        "build_targets",
+        "ConcurrencyLimiter",
+        "ProbeEngine",
+    ),
+    "profiler": ("FunctionStats", "SamplingProfiler"),
+    "scheduler": ("ScheduledJob", "Scheduler"),
+    "silence": ("ANY_AUTHOR", "normalize_id", "SilenceEntry", "SilenceTracker", "parse_timeouts"),
+    "statestore": ("StateStore",),
+    "watchdog": ("LoopWatchdog",),
+    "webhook": ("WebhookServer",),
+    "zvonobot": ("ZvonoBot", "AsyncZvonoBot"),
+}
+
+_EXPORTS: Dict[str, str] = {name: module for module, names in MODULES.items() for name in names}
+
+__all__ = list(_EXPORTS)
+
+
+def _load(module_name: str) -> Any:
+    module = importlib.import_module(f".{module_name}", __name__)
+    globals().update({name: getattr(module, name) for name in MODULES[module_name]})
+    return module
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    _load(module_name)
+    return globals()[name]
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 def initialize_modules() -> List[str]:
+    """
+    Немедленный импорт всех модулей реестра (например, для проверки окружения).
+
+    Returns:
+        List[str]: Успешно импортированные модули
+    """
     modules = []
-    base_dir = os.path.dirname(__file__)
-    for root, dirs, files in os.walk(base_dir):
-        for file in files:
-            if file.endswith(".py") and file != '__init__.py':
-                relative_path = os.path.relpath(os.path.join(root, file), base_dir)
-                module_name = relative_path[:-3].replace(os.sep, ".")
-                try:
-                    module = importlib.import_module(f".{module_name}", __name__)
-                    globals().update({
-                        name: obj
-                        for name, obj in module.__dict__.items()
-                        if not name.startswith("_")
-                    })
-                    modules.append(module_name)
-                except ImportError as e:
-                    warnings.warn(f"Не удалось импортировать модуль {module_name}: {e}")
-                    continue
+    for module_name in MODULES:
+        try:
+            _load(module_name)
+            modules.append(module_name)
+        except ImportError as e:
+            warnings.warn(f"Не удалось импортировать модуль {module_name}: {e}")
     return modules
-
-initialize_modules()
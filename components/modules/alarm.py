@@ -0,0 +1,536 @@
+import time
+import heapq
+from collections import deque
+from itertools import count
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+
+class AlarmState:
+    """
+    Состояния тревоги.
+
+    OK - цель работает; SUSPECT - есть сбои, но порог тревоги не достигнут;
+    FIRING - тревога; RECOVERING - после тревоги пошли успешные проверки,
+    но их ещё недостаточно для снятия тревоги.
+    """
+
+    OK = "ok"
+    SUSPECT = "suspect"
+    FIRING = "firing"
+    RECOVERING = "recovering"
+
+    ALL = (OK, SUSPECT, FIRING, RECOVERING)
+    ACTIVE = frozenset({FIRING, RECOVERING})
+
+
+ESCALATION_ACTIONS = frozenset({"telegram", "call", "duty"})
+
+
+def parse_escalation(values: Any) -> Tuple[Tuple[float, str], ...]:
+    """
+    Разбор ступеней эскалации из переменной окружения.
+
+    Формат элементов: "действие:задержка_в_секундах", действия - telegram
+    (уведомление), call (звонок на ALARM_PHONES_FOR_CALL), duty (звонок
+    дежурному на ALARM_DUTY_PHONES).
+
+    Args:
+        values (Any): Строка или список строк
+
+    Returns:
+        Tuple[Tuple[float, str], ...]: Ступени (задержка, действие), упорядоченные по задержке
+
+    Raises:
+        ValueError: Если элемент имеет неверный формат
+
+    Examples:
+        >>> parse_escalation(["telegram:0", "call:120", "duty:600"])
+        ((0.0, 'telegram'), (120.0, 'call'), (600.0, 'duty'))
+    """
+    if values in (None, ""):
+        return ()
+    if not isinstance(values, list):
+        values = [values]
+    tiers = []
+    for value in values:
+        action, _, delay = str(value).strip().partition(":")
+        action = action.strip().lower()
+        if action not in ESCALATION_ACTIONS:
+            raise ValueError(f"Неизвестное действие эскалации: {value}")
+        try:
+            seconds = float(delay) if delay.strip() else 0.0
+        except ValueError:
+            raise ValueError(f"Неверная задержка эскалации: {value}")
+        if seconds < 0:
+            raise ValueError(f"Задержка эскалации не может быть отрицательной: {value}")
+        tiers.append((seconds, action))
+    return tuple(sorted(tiers, key=lambda tier: tier[0]))
+
+
+class AlarmPolicy:
+    """
+    Правила перехода между состояниями тревоги.
+
+    Attributes:
+        fail_threshold (int): Количество сбоев (N) среди последних fail_window проверок для тревоги
+        fail_window (int): Количество последних проверок (M), среди которых считаются сбои
+        recover_threshold (int): Количество успешных проверок подряд для снятия тревоги
+        for_seconds (float): Минимальное время с последней успешной проверки для тревоги
+        flap_threshold (int): Количество переключений тревоги за flap_window для признания нестабильности (0 - выключено)
+        flap_window (float): Окно обнаружения нестабильности в секундах
+        escalation (Tuple[Tuple[float, str], ...]): Ступени эскалации (задержка от начала тревоги, действие)
+    """
+
+    __slots__ = (
+        "fail_threshold",
+        "fail_window",
+        "recover_threshold",
+        "for_seconds",
+        "flap_threshold",
+        "flap_window",
+        "escalation",
+    )
+
+    def __init__(
+        self,
+        fail_threshold: int = 1,
+        fail_window: int = 1,
+        recover_threshold: int = 1,
+        for_seconds: float = 0,
+        flap_threshold: int = 0,
+        flap_window: float = 600,
+        escalation: Iterable[Tuple[float, str]] = ((0.0, "telegram"), (0.0, "call"))
+    ) -> None:
+        """
+        Создание правил.
+
+        Raises:
+            ValueError: Если параметры некорректны
+        """
+        self.fail_threshold = int(fail_threshold)
+        self.fail_window = int(fail_window)
+        self.recover_threshold = int(recover_threshold)
+        self.for_seconds = float(for_seconds)
+        self.flap_threshold = int(flap_threshold)
+        self.flap_window = float(flap_window)
+        self.escalation = tuple(escalation)
+        if not 1 <= self.fail_threshold <= self.fail_window:
+            raise ValueError("Порог сбоев должен быть от 1 до размера окна проверок")
+        if self.recover_threshold < 1:
+            raise ValueError("Порог восстановления должен быть не меньше 1")
+        if self.flap_threshold == 1 or self.flap_threshold < 0:
+            raise ValueError("Порог нестабильности должен быть 0 (выключено) или не меньше 2")
+
+    @classmethod
+    def from_config(cls, config: Any, **overrides: Any) -> "AlarmPolicy":
+        """
+        Создание правил по снимку настроек AppConfig.
+
+        Args:
+            config (Any): Снимок настроек
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+
+        Returns:
+            AlarmPolicy: Правила тревоги
+        """
+        settings = {
+            "fail_threshold": config.alarm_fail_threshold,
+            "fail_window": config.alarm_fail_window,
+            "recover_threshold": config.alarm_recover_threshold,
+            "flap_threshold": config.alarm_flap_threshold,
+            "flap_window": config.alarm_flap_window,
+            "escalation": config.alarm_escalation,
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    def replace(self, **changes: Any) -> "AlarmPolicy":
+        """
+        Новые правила с изменёнными полями.
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return AlarmPolicy(**values)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, AlarmPolicy):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+class AlarmEvent:
+    """
+    Событие тревоги, на которое монитор реагирует уведомлением или звонком.
+
+    Attributes:
+        kind (str): FIRING, RESOLVED, ESCALATION или FLAPPING
+        alarm (Alarm): Тревога
+        at (float): Время события (unix time)
+        action (Optional[str]): Действие ступени эскалации (telegram, call, duty)
+        tier (Optional[int]): Номер ступени эскалации
+    """
+
+    FIRING = "firing"
+    RESOLVED = "resolved"
+    ESCALATION = "escalation"
+    FLAPPING = "flapping"
+
+    __slots__ = ("kind", "alarm", "at", "action", "tier")
+
+    def __init__(self, kind: str, alarm: "Alarm", at: float, action: Optional[str] = None, tier: Optional[int] = None) -> None:
+        self.kind = kind
+        self.alarm = alarm
+        self.at = at
+        self.action = action
+        self.tier = tier
+
+    @property
+    def key(self) -> str:
+        return self.alarm.key
+
+    def __repr__(self) -> str:
+        suffix = f", action={self.action!r}" if self.action else ""
+        return f"AlarmEvent({self.kind!r}, key={self.key!r}{suffix})"
+
+
+class Alarm:
+    """
+    Конечный автомат тревоги одной цели: OK -> SUSPECT -> FIRING -> RECOVERING -> OK.
+
+    Результаты последних fail_window проверок хранятся битовой маской, поэтому
+    учёт одной проверки - несколько целочисленных операций без выделения памяти.
+    Тревога срабатывает один раз, когда среди последних M проверок не меньше N
+    сбоев и с последней успешной проверки прошло for_seconds, и снимается после
+    recover_threshold успешных проверок подряд (гистерезис). Сбой во время
+    восстановления возвращает тревогу без повторного уведомления.
+
+    Если тревога срабатывает и снимается flap_threshold раз за flap_window,
+    цель признаётся нестабильной: отправляется одно событие FLAPPING, а
+    дальнейшие переключения не уведомляют, пока переключений не будет
+    flap_window секунд. После этого отправляется текущее состояние.
+
+    Attributes:
+        key (str): Идентификатор цели
+        policy (AlarmPolicy): Правила тревоги
+        state (str): Текущее состояние (AlarmState)
+        fails (int): Количество сбоев среди последних fail_window проверок
+        ok_streak (int): Успешных проверок подряд
+        last_ok (float): Время последней успешной проверки (unix time)
+        fired_at (Optional[float]): Время начала текущей тревоги
+        resolved_at (Optional[float]): Время снятия последней тревоги
+        tier (int): Количество выполненных ступеней эскалации
+        flapping (bool): Цель нестабильна, уведомления приостановлены
+    """
+
+    __slots__ = (
+        "key",
+        "policy",
+        "state",
+        "history",
+        "fails",
+        "ok_streak",
+        "last_ok",
+        "fired_at",
+        "resolved_at",
+        "tier",
+        "flapping",
+        "transitions",
+        "generation",
+    )
+
+    def __init__(self, key: str, policy: AlarmPolicy, now: float) -> None:
+        self.key = key
+        self.policy = policy
+        self.state = AlarmState.OK
+        self.history = 0
+        self.fails = 0
+        self.ok_streak = 0
+        self.last_ok = now
+        self.fired_at: Optional[float] = None
+        self.resolved_at: Optional[float] = None
+        self.tier = 0
+        self.flapping = False
+        self.transitions: deque = deque(maxlen=max(policy.flap_threshold, 1))
+        self.generation = 0
+
+    @property
+    def active(self) -> bool:
+        """
+        Тревога сработала и ещё не снята.
+        """
+        return self.state in AlarmState.ACTIVE
+
+    def set_policy(self, policy: AlarmPolicy) -> None:
+        """
+        Замена правил с сохранением истории проверок.
+        """
+        if policy.flap_threshold != self.policy.flap_threshold:
+            self.transitions = deque(self.transitions, maxlen=max(policy.flap_threshold, 1))
+        if policy.fail_window < self.policy.fail_window:
+            self.history &= (1 << policy.fail_window) - 1
+            self.fails = self.history.bit_count()
+        self.policy = policy
+
+    def observe(self, ok: bool, now: float) -> Optional[str]:
+        """
+        Учёт результата проверки.
+
+        Args:
+            ok (bool): Проверка успешна
+            now (float): Время проверки (unix time)
+
+        Returns:
+            Optional[str]: Вид события (AlarmEvent.FIRING, RESOLVED или FLAPPING) или None
+        """
+        policy = self.policy
+        history = ((self.history << 1) | (not ok)) & ((1 << policy.fail_window) - 1)
+        self.history = history
+        self.fails = fails = history.bit_count()
+        if ok:
+            self.ok_streak += 1
+            self.last_ok = now
+        else:
+            self.ok_streak = 0
+
+        state = self.state
+        event = None
+        if state == AlarmState.OK or state == AlarmState.SUSPECT:
+            if fails == 0:
+                self.state = AlarmState.OK
+            elif fails >= policy.fail_threshold and now - self.last_ok >= policy.for_seconds:
+                event = self._fire(now)
+            else:
+                self.state = AlarmState.SUSPECT
+        elif ok:
+            if self.ok_streak >= policy.recover_threshold:
+                event = self._resolve(now)
+            else:
+                self.state = AlarmState.RECOVERING
+        elif state == AlarmState.RECOVERING:
+            self.state = AlarmState.FIRING
+
+        if self.flapping and event is None and now - self.transitions[-1] >= policy.flap_window:
+            # Переключений не было flap_window секунд - сообщаем текущее состояние
+            self.flapping = False
+            if self.active:
+                self.fired_at = now
+                self.tier = 0
+                event = AlarmEvent.FIRING
+            else:
+                event = AlarmEvent.RESOLVED
+            self.generation += 1
+        return event
+
+    def _fire(self, now: float) -> Optional[str]:
+        self.state = AlarmState.FIRING
+        self.fired_at = now
+        self.tier = 0
+        self.generation += 1
+        return self._transition(now, AlarmEvent.FIRING)
+
+    def _resolve(self, now: float) -> Optional[str]:
+        self.state = AlarmState.OK
+        self.resolved_at = now
+        self.history = 0
+        self.fails = 0
+        self.generation += 1
+        return self._transition(now, AlarmEvent.RESOLVED)
+
+    def _transition(self, now: float, event: str) -> Optional[str]:
+        threshold = self.policy.flap_threshold
+        if not threshold:
+            return event
+        transitions = self.transitions
+        transitions.append(now)
+        if self.flapping:
+            return None
+        if len(transitions) >= threshold and now - transitions[0] <= self.policy.flap_window:
+            self.flapping = True
+            return AlarmEvent.FLAPPING
+        return event
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Сериализация состояния для сохранения.
+        """
+        return {
+            "state": self.state,
+            "history": self.history,
+            "ok_streak": self.ok_streak,
+            "last_ok": self.last_ok,
+            "fired_at": self.fired_at,
+            "resolved_at": self.resolved_at,
+            "tier": self.tier,
+            "flapping": self.flapping,
+            "transitions": list(self.transitions),
+        }
+
+    def restore(self, data: Optional[Dict[str, Any]]) -> None:
+        """
+        Восстановление сохранённого состояния.
+        """
+        if not data:
+            return
+        state = data.get("state")
+        self.state = state if state in AlarmState.ALL else AlarmState.OK
+        self.history = int(data.get("history") or 0) & ((1 << self.policy.fail_window) - 1)
+        self.fails = self.history.bit_count()
+        self.ok_streak = int(data.get("ok_streak") or 0)
+        if data.get("last_ok"):
+            self.last_ok = float(data["last_ok"])
+        self.fired_at = data.get("fired_at")
+        self.resolved_at = data.get("resolved_at")
+        self.tier = int(data.get("tier") or 0)
+        self.transitions.extend(data.get("transitions") or ())
+        self.flapping = bool(data.get("flapping")) and bool(self.transitions)
+        self.generation += 1
+
+
+_NO_EVENTS: List[AlarmEvent] = []
+
+
+class AlarmManager:
+    """
+    Тревоги всех целей монитора и расписание их эскалации.
+
+    Учёт проверки - O(1) для цели. Сроки ступеней эскалации хранятся
+    в min-куче, поэтому проверка наступивших ступеней на каждом тике стоит
+    O(k log n) для k наступивших, а не перебор всех целей. Элементы кучи
+    снятых или перезапущенных тревог отбрасываются лениво по номеру поколения.
+
+    Attributes:
+        policy (AlarmPolicy): Правила по умолчанию для новых тревог
+
+    Examples:
+        >>> alarms = AlarmManager(AlarmPolicy(fail_threshold=3, fail_window=5))
+        >>> for event in alarms.observe("users", ok=False):
+        ...     print(event.kind, event.action)
+    """
+
+    def __init__(self, policy: Optional[AlarmPolicy] = None, clock=time.time) -> None:
+        """
+        Инициализация.
+
+        Args:
+            policy (Optional[AlarmPolicy]): Правила по умолчанию
+            clock (Callable[[], float]): Источник времени (unix time)
+        """
+        self.policy = policy or AlarmPolicy()
+        self._clock = clock
+        self._alarms: Dict[str, Alarm] = {}
+        self._heap: List[Tuple[float, int, Alarm, int, int]] = []
+        self._sequence = count()
+
+    def __len__(self) -> int:
+        return len(self._alarms)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._alarms
+
+    def get(self, key: str) -> Optional[Alarm]:
+        return self._alarms.get(key)
+
+    def values(self) -> List[Alarm]:
+        return list(self._alarms.values())
+
+    def add(self, key: str, policy: Optional[AlarmPolicy] = None, now: Optional[float] = None) -> Alarm:
+        """
+        Получение тревоги цели (создаётся при отсутствии). Если переданы
+        правила, они заменяют текущие без сброса истории.
+        """
+        alarm = self._alarms.get(key)
+        if alarm is None:
+            alarm = self._alarms[key] = Alarm(key, policy or self.policy, self._clock() if now is None else now)
+        elif policy is not None and policy != alarm.policy:
+            alarm.set_policy(policy)
+            self._schedule(alarm)
+        return alarm
+
+    def remove(self, key: str) -> None:
+        """
+        Удаление тревоги цели (элементы кучи отбрасываются лениво).
+        """
+        self._alarms.pop(key, None)
+
+    def restore(self, key: str, data: Optional[Dict[str, Any]], policy: Optional[AlarmPolicy] = None) -> Alarm:
+        """
+        Восстановление тревоги из сохранённого состояния с планированием невыполненных ступеней эскалации.
+        """
+        alarm = self.add(key, policy)
+        alarm.restore(data)
+        self._schedule(alarm)
+        return alarm
+
+    def _schedule(self, alarm: Alarm) -> None:
+        alarm.generation += 1
+        if not alarm.active or alarm.flapping or alarm.fired_at is None:
+            return
+        for tier in range(alarm.tier, len(alarm.policy.escalation)):
+            delay = alarm.policy.escalation[tier][0]
+            heapq.heappush(self._heap, (alarm.fired_at + delay, next(self._sequence), alarm, alarm.generation, tier))
+
+    def observe(self, key: str, ok: bool, now: Optional[float] = None) -> List[AlarmEvent]:
+        """
+        Учёт результата проверки цели.
+
+        Args:
+            key (str): Идентификатор цели
+            ok (bool): Проверка успешна
+            now (Optional[float]): Время проверки (по умолчанию - clock())
+
+        Returns:
+            List[AlarmEvent]: Событие перехода и наступившие ступени эскалации (обычно пусто)
+        """
+        now = self._clock() if now is None else now
+        alarm = self._alarms.get(key)
+        if alarm is None:
+            alarm = self.add(key, now=now)
+        kind = alarm.observe(ok, now)
+        if kind is None:
+            return self.due(now) if self._heap and self._heap[0][0] <= now else _NO_EVENTS
+        if kind == AlarmEvent.FIRING:
+            self._schedule(alarm)
+        return [AlarmEvent(kind, alarm, now)] + self.due(now)
+
+    def due(self, now: Optional[float] = None) -> List[AlarmEvent]:
+        """
+        Извлечение наступивших ступеней эскалации.
+
+        Args:
+            now (Optional[float]): Текущее время (по умолчанию - clock())
+
+        Returns:
+            List[AlarmEvent]: События ESCALATION в порядке сроков
+        """
+        now = self._clock() if now is None else now
+        heap = self._heap
+        events = []
+        while heap and heap[0][0] <= now:
+            _, _, alarm, generation, tier = heapq.heappop(heap)
+            if generation != alarm.generation or self._alarms.get(alarm.key) is not alarm or tier < alarm.tier:
+                continue
+            alarm.tier = tier + 1
+            events.append(AlarmEvent(AlarmEvent.ESCALATION, alarm, now, action=alarm.policy.escalation[tier][1], tier=tier))
+        return events
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Количество тревог по состояниям.
+        """
+        result = dict.fromkeys(AlarmState.ALL, 0)
+        for alarm in self._alarms.values():
+            result[alarm.state] += 1
+        return result
+
+    def flapping(self) -> List[Alarm]:
+        """
+        Нестабильные цели.
+        """
+        return [alarm for alarm in self._alarms.values() if alarm.flapping]
@@ -1,26 +1,182 @@
 import os
 import sys
+import json
 import uuid
 import time
 import asyncio
 import logging
+import queue
 import threading
 from functools import wraps
-from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+)
 from typing import (
     Optional,
     Union,
     List,
     Callable,
     Any,
+    Dict,
 )
 
-from rich.panel import Panel
 from rich.console import Console
-from rich.traceback import Traceback
 from rich.logging import RichHandler
 
+from .profiler import SamplingProfiler
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", "backslashreplace")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматтер JSON Lines: одна запись - один JSON-объект в строке.
+
+    Поля ts, level, logger, message всегда присутствуют, далее - общие поля
+    контекста (например, monitor_mode) и поля из extra вызова логгера
+    (target, latency_ms, status, alarm_id и т.д.), поэтому сборщику логов
+    не нужно разбирать текст регулярными выражениями. Переводы строк и
+    управляющие символы экранируются, байты декодируются с заменой
+    некорректных последовательностей. Если установлен orjson, используется
+    он, иначе - стандартный json.
+
+    Attributes:
+        context (Dict[str, Any]): Поля, добавляемые в каждую запись
+
+    Examples:
+        >>> logger.info("Проверка не прошла", extra={"target": "users", "status": 503})
+        {"ts":"2024-01-01T12:00:00.000+00:00","level":"INFO","logger":"TFALogger","message":"Проверка не прошла","target":"users","status":503}
+    """
+
+    def __init__(self, context: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__()
+        self.context = context if context is not None else {}
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(self.context)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return self.dumps(data)
+
+    @staticmethod
+    def dumps(data: Dict[str, Any]) -> str:
+        """
+        Сериализация записи в одну строку JSON.
+        """
+        if orjson is not None:
+            return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        return json.dumps(data, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler с ограниченной очередью и политикой переполнения.
+
+    Запись в очередь не выполняет ввод-вывод: сообщение форматируется сразу
+    (чтобы изменяемые аргументы не поменялись до записи), а запись в файл и
+    отрисовка Rich выполняются в потоке QueueListener. При переполнении
+    очереди запись отбрасывается или вытесняет самую старую, количество
+    потерянных записей сообщается в лог при следующей успешной записи.
+
+    Attributes:
+        overflow_policy (str): Политика переполнения ('drop_new', 'drop_oldest' или 'block')
+        dropped (int): Общее количество отброшенных записей
+    """
+
+    OVERFLOW_POLICIES = ("drop_new", "drop_oldest", "block")
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str = "drop_new") -> None:
+        super().__init__(log_queue)
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Неизвестная политика переполнения очереди логов: {overflow_policy}")
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Копия записи с уже подставленными аргументами. В отличие от базовой
+        реализации exc_info сохраняется, чтобы RichHandler отрисовал traceback.
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow_policy == "block":
+            self.queue.put(record)
+            return
+        if self._unreported:
+            self._report_dropped(record)
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow_policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+        self._unreported += 1
+
+    def _report_dropped(self, record: logging.LogRecord) -> None:
+        warning = logging.makeLogRecord({
+            "name": record.name,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Очередь логов переполнена, отброшено записей: {self._unreported}",
+        })
+        try:
+            self.queue.put_nowait(warning)
+            self._unreported = 0
+        except queue.Full:
+            pass
+
+
+class BoundedQueueListener(QueueListener):
+    """
+    QueueListener, ожидающий места в заполненной очереди при остановке.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
 
 class Logger:
     """
@@ -33,6 +189,9 @@ class Logger:
     - Автоматическая обработка исключений
     - Подсветка синтаксиса в консоли
     - Измерение времени выполнения
+    - Асинхронная запись через очередь и фоновый поток
+    - Выборочное профилирование с периодической таблицей времени по функциям
+    - Структурированный вывод в файл в формате JSON Lines
     
     Attributes:
         name (str): Имя логгера
@@ -43,6 +202,12 @@ class Logger:
         allowed_files (Union[str, List[str]]): Список файлов для трассировки
         code_snippet_lines (int): Количество строк контекста для отображения ошибок
         enable_file_logging (bool): Включение/выключение логирования в файл
+        log_format (str): Формат лог-файла ('text' или 'json')
+        context (Dict[str, Any]): Общие поля каждой записи в формате json
+        async_logging (bool): Запись в файл и консоль в фоновом потоке через очередь
+        queue_size (int): Максимальный размер очереди записей
+        overflow_policy (str): Политика переполнения очереди ('drop_new', 'drop_oldest' или 'block')
+        profiler (SamplingProfiler): Профилировщик для декоратора profile
         console (Console): Объект для форматированного вывода в консоль
         logger_name (str): Уникальное имя логгера
         logger (logging.Logger): Внутренний объект логгера
@@ -70,6 +235,13 @@ class Logger:
         allowed_files: Union[str, List[str]] = "all",
         code_snippet_lines: Optional[int] = 10,
         enable_file_logging: Optional[bool] = True,
+        log_format: Optional[str] = "text",
+        async_logging: Optional[bool] = False,
+        queue_size: Optional[int] = 10000,
+        overflow_policy: Optional[str] = "drop_new",
+        profile_sample_rate: Optional[float] = 0,
+        profile_flush_interval: Optional[float] = 300,
+        profile_top: Optional[int] = 20,
     ):
         """
         Инициализация логгера.
@@ -84,6 +256,15 @@ class Logger:
             allowed_files (Union[str, List[str]]): Список файлов для трассировки. По умолчанию "all".
             code_snippet_lines (Optional[int]): Количество строк контекста. По умолчанию 10.
             enable_file_logging (Optional[bool]): Включить логирование в файл. По умолчанию True.
+            log_format (Optional[str]): Формат лог-файла: 'text' - текст, 'json' - JSON Lines. По умолчанию "text".
+            async_logging (Optional[bool]): Писать логи в фоновом потоке через очередь. По умолчанию False.
+            queue_size (Optional[int]): Максимальный размер очереди записей. По умолчанию 10000.
+            overflow_policy (Optional[str]): Политика переполнения очереди: 'drop_new' - отбросить новую запись,
+                'drop_oldest' - вытеснить самую старую, 'block' - ждать места. По умолчанию "drop_new".
+            profile_sample_rate (Optional[float]): Доля вызовов profile с записью вложенных функций
+                (0 - профилирование выключено). По умолчанию 0.
+            profile_flush_interval (Optional[float]): Интервал записи таблицы профиля в секундах. По умолчанию 300.
+            profile_top (Optional[int]): Количество строк таблицы профиля. По умолчанию 20.
         """
         self.name = name
         self.log_level = log_level.upper()
@@ -93,6 +274,19 @@ class Logger:
         self.allowed_files = allowed_files if allowed_files == "all" or isinstance(allowed_files, list) else "all"
         self.code_snippet_lines = code_snippet_lines
         self.enable_file_logging = enable_file_logging
+        self.log_format = str(log_format).lower()
+        self.context: Dict[str, Any] = {}
+        self.async_logging = async_logging
+        self.queue_size = max(1, int(queue_size))
+        self.overflow_policy = str(overflow_policy).lower()
+        self.queue_handler: Optional[BoundedQueueHandler] = None
+        self.listener: Optional[BoundedQueueListener] = None
+        self.profiler = SamplingProfiler(
+            sample_rate=profile_sample_rate,
+            flush_interval=profile_flush_interval,
+            top=profile_top,
+            logger=self
+        )
 
         self.console = Console(width=120)
         self.logger_name = f"{self.name}-{uuid.uuid4()}" if add_uuid_to_name else self.name
@@ -120,12 +314,15 @@ class Logger:
         Создает и настраивает:
         - RotatingFileHandler для ротации лог-файлов
         - RichHandler для форматированного вывода в консоль
+        - BoundedQueueHandler и QueueListener перед ними в асинхронном режиме
         """
         self.logger = logging.getLogger(self.logger_name)
         self.logger.setLevel(logging.DEBUG)
+        handlers = []
         if self.enable_file_logging:
             os.makedirs(self.log_dir, exist_ok=True)
-            log_file = os.path.join(self.log_dir, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
+            extension = "jsonl" if self.log_format == "json" else "log"
+            log_file = os.path.join(self.log_dir, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.{extension}")
             file_handler = RotatingFileHandler(
                 filename=log_file,
                 mode="a",
@@ -134,18 +331,31 @@ class Logger:
                 encoding="utf-8"
             )
             file_handler.setLevel(self._get_log_level())
-            file_formatter = logging.Formatter(
-                "%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-                "%Y-%m-%d %H:%M:%S"
-            )
+            if self.log_format == "json":
+                file_formatter = JsonFormatter(self.context)
+            else:
+                file_formatter = logging.Formatter(
+                    "%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+                    "%Y-%m-%d %H:%M:%S"
+                )
             file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
 
         console_handler = RichHandler(console=self.console, rich_tracebacks=True, markup=True)
         console_handler.setLevel(self._get_log_level())
         console_formatter = logging.Formatter("%(message)s")
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+        if not self.async_logging:
+            for handler in handlers:
+                self.logger.addHandler(handler)
+            return
+        self.queue_handler = BoundedQueueHandler(queue.Queue(self.queue_size), self.overflow_policy)
+        self.queue_handler.setLevel(self._get_log_level())
+        self.listener = BoundedQueueListener(self.queue_handler.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self.logger.addHandler(self.queue_handler)
 
     def _get_log_level(self) -> int:
         """
@@ -158,8 +368,16 @@ class Logger:
 
     def close(self):
         """
-        Закрытие всех обработчиков логгера.
+        Закрытие всех обработчиков логгера. В асинхронном режиме сначала
+        дожидается записи всех записей из очереди.
         """
+        self.profiler.flush()
+        if self.listener is not None:
+            self.logger.removeHandler(self.queue_handler)
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
         while self.logger.handlers:
             handler = self.logger.handlers[0]
             handler.close()
@@ -201,6 +419,8 @@ class Logger:
             exc_traceback: Трейсбек исключения
         """
         try:
+            from rich.traceback import Traceback
+
             tb = Traceback.from_exception(exc_type, exc_value, exc_traceback)
             self.console.print(tb)
             self.logger.error("Неперехваченное исключение", exc_info=(exc_type, exc_value, exc_traceback))
@@ -259,9 +479,33 @@ class Logger:
         Args:
             text (str): Текст для вывода
         """
+        from rich.panel import Panel
+
         panel = Panel(text, title="Ошибка", border_style="bold red", expand=True)
         self.console.print(panel)
 
+    def profile(self, func: Callable, sample_rate: Optional[float] = None) -> Callable:
+        """
+        Декоратор для выборочного профилирования функции.
+        
+        В отличие от trace не читает локальные переменные и не обходит стек:
+        для каждого вызова замеряется время выполнения, а для доли вызовов
+        sample_rate - время вложенных функций. Таблица пишется в лог раз
+        в profile_flush_interval секунд. При нулевой доле функция
+        возвращается без обёртки.
+        
+        Args:
+            func (Callable): Функция для профилирования
+            sample_rate (Optional[float]): Доля вызовов в выборке (по умолчанию - profile_sample_rate)
+            
+        Returns:
+            Callable: Обернутая функция или исходная, если профилирование выключено
+        """
+        rate = self.profiler.sample_rate if sample_rate is None else float(sample_rate)
+        if rate <= 0:
+            return func
+        return self.profiler.wrap(func, rate)
+
     def trace(self, func: Callable) -> Callable:
         """
         Декоратор для трассировки выполнения функции.
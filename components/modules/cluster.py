@@ -0,0 +1,487 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from .metrics import MetricsRegistry
+
+
+class LeaseBackend(ABC):
+    """
+    Общее хранилище аренд, через которое экземпляры бота договариваются о ролях.
+
+    Аренда - запись {имя: (владелец, время окончания)}. Захватить её можно,
+    если она свободна, истекла или уже принадлежит этому владельцу (продление).
+    Методы синхронные и вызываются из отдельного потока.
+    """
+
+    DEFAULT_PATH = ""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or self.DEFAULT_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @abstractmethod
+    def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Захват или продление аренды на ttl секунд.
+
+        Returns:
+            bool: True, если аренда принадлежит owner
+        """
+
+    @abstractmethod
+    def release(self, name: str, owner: str) -> None:
+        """
+        Освобождение аренды, если она принадлежит owner.
+        """
+
+    @abstractmethod
+    def holders(self, prefix: str) -> Dict[str, str]:
+        """
+        Действующие аренды с именем, начинающимся с prefix.
+
+        Returns:
+            Dict[str, str]: {имя аренды: владелец}
+        """
+
+    def close(self) -> None:
+        pass
+
+
+LEASE_BACKENDS: Dict[str, Callable[[Optional[str]], LeaseBackend]] = {}
+
+
+def register_lease_backend(kind: str) -> Callable[[type], type]:
+    """
+    Регистрация хранилища аренд для CLUSTER_BACKEND.
+
+    Args:
+        kind (str): Название хранилища
+
+    Examples:
+        >>> @register_lease_backend("redis")
+        ... class RedisLeaseBackend(LeaseBackend):
+        ...     ...
+    """
+    def decorator(cls: type) -> type:
+        LEASE_BACKENDS[kind] = cls
+        return cls
+    return decorator
+
+
+@register_lease_backend("file")
+class FileLeaseBackend(LeaseBackend):
+    """
+    Аренды в JSON-файле на общем томе. Чтение и запись выполняются под
+    блокировкой flock, поэтому подходит для контейнеров на одном хосте.
+    """
+
+    DEFAULT_PATH = "components/state/cluster.lease"
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        if fcntl is None:
+            raise RuntimeError("файловая аренда недоступна: нет модуля fcntl")
+        super().__init__(path)
+
+    def _update(self, func: Callable[[Dict[str, Any], float], Tuple[Any, bool]]) -> Any:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            with os.fdopen(fd, "r+", encoding="utf-8", closefd=False) as file:
+                try:
+                    records = json.loads(file.read() or "{}")
+                except ValueError:
+                    records = {}
+                result, changed = func(records, time.time())
+                if changed:
+                    file.seek(0)
+                    file.truncate()
+                    json.dump(records, file)
+                    file.flush()
+            return result
+        finally:
+            # Закрытие файла снимает блокировку
+            os.close(fd)
+
+    def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        def update(records: Dict[str, Any], now: float) -> Tuple[bool, bool]:
+            record = records.get(name)
+            if record and record.get("owner") != owner and record.get("expires_at", 0) >= now:
+                return False, False
+            records[name] = {"owner": owner, "expires_at": now + ttl}
+            return True, True
+        return self._update(update)
+
+    def release(self, name: str, owner: str) -> None:
+        def update(records: Dict[str, Any], now: float) -> Tuple[None, bool]:
+            record = records.get(name)
+            if record and record.get("owner") == owner:
+                del records[name]
+                return None, True
+            return None, False
+        self._update(update)
+
+    def holders(self, prefix: str) -> Dict[str, str]:
+        def update(records: Dict[str, Any], now: float) -> Tuple[Dict[str, str], bool]:
+            return {
+                name: record["owner"]
+                for name, record in records.items()
+                if name.startswith(prefix) and record.get("expires_at", 0) >= now
+            }, False
+        return self._update(update)
+
+
+@register_lease_backend("sqlite")
+class SqliteLeaseBackend(LeaseBackend):
+    """
+    Аренды в таблице SQLite. Захват - один атомарный UPSERT с условием,
+    поэтому два экземпляра не могут захватить одну аренду одновременно.
+    """
+
+    DEFAULT_PATH = "components/state/cluster.db"
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        super().__init__(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (name, owner, now + ttl, now)
+            )
+            row = self._conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == owner
+
+    def release(self, name: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def holders(self, prefix: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, owner FROM leases WHERE substr(name, 1, ?) = ? AND expires_at >= ?",
+                (len(prefix), prefix, time.time())
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class HashRing:
+    """
+    Консистентное хеширование: ключ принадлежит первому узлу по часовой
+    стрелке на кольце. У каждого узла replicas виртуальных точек, поэтому
+    ключи распределяются равномерно, а при добавлении или уходе узла
+    переезжает только ~1/N ключей.
+
+    Examples:
+        >>> ring = HashRing(["bot-1", "bot-2", "bot-3"])
+        >>> ring.owner("example")
+        'bot-2'
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64) -> None:
+        self.nodes = tuple(sorted(set(nodes)))
+        self.replicas = max(1, int(replicas))
+        points = sorted(
+            (self._hash(f"{node}#{index}"), node)
+            for node in self.nodes
+            for index in range(self.replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+    def owner(self, key: str) -> Optional[str]:
+        """
+        Узел, которому принадлежит ключ, или None, если узлов нет.
+        """
+        if not self._hashes:
+            return None
+        index = bisect_right(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class ClusterCoordinator:
+    """
+    Распределение работы между несколькими экземплярами бота через общее хранилище аренд.
+
+    Режимы:
+        leader - активный/резервный: проверки выполняет и тревоги отправляет только
+            держатель аренды лидера. Лидер продлевает аренду раз в renew_interval;
+            если он остановился или завис, аренда истекает через ttl, и резервный
+            экземпляр захватывает её при следующей попытке.
+        shard - все экземпляры работают одновременно, каждый проверяет свою часть
+            целей: экземпляры продлевают аренды участника, по действующим арендам
+            строится кольцо консистентного хеширования. При уходе экземпляра его
+            цели переходят к оставшимся.
+
+    Лидер отказывается от роли сам, если не смог продлить аренду до истечения
+    ttl по своим часам, - раньше, чем её сможет захватить другой экземпляр.
+    Так же шард, не продливший свою аренду участника, перестаёт владеть
+    целями, пока продление не удастся.
+
+    Attributes:
+        backend (LeaseBackend): Хранилище аренд
+        mode (str): Режим ('leader', 'shard')
+        instance_id (str): Идентификатор экземпляра
+        ttl (float): Срок аренды в секундах
+        renew_interval (float): Интервал продления аренды в секундах
+        is_leader (bool): Является ли экземпляр лидером (режим leader)
+        members (Tuple[str, ...]): Действующие участники (режим shard)
+
+    Examples:
+        >>> cluster = ClusterCoordinator(SqliteLeaseBackend("cluster.db"), mode="leader", instance_id="bot-1")
+        >>> cluster.subscribe(on_change)
+        >>> await cluster.start()
+        >>> cluster.owns("example")
+        >>> await cluster.stop()
+    """
+
+    MODES = ("leader", "shard")
+    LEADER_LEASE = "leader"
+    MEMBER_PREFIX = "member:"
+
+    def __init__(
+        self,
+        backend: LeaseBackend,
+        mode: str = "leader",
+        instance_id: Optional[str] = None,
+        ttl: float = 15.0,
+        renew_interval: Optional[float] = None,
+        replicas: int = 64,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Any = None
+    ) -> None:
+        """
+        Инициализация координатора.
+
+        Args:
+            backend (LeaseBackend): Хранилище аренд
+            mode (str): Режим ('leader', 'shard'). По умолчанию 'leader'.
+            instance_id (Optional[str]): Идентификатор экземпляра. По умолчанию имя хоста.
+            ttl (float): Срок аренды в секундах. По умолчанию 15.
+            renew_interval (Optional[float]): Интервал продления в секундах. По умолчанию ttl / 3.
+            replicas (int): Виртуальных точек экземпляра на кольце. По умолчанию 64.
+            metrics (Optional[MetricsRegistry]): Реестр метрик
+            logger (Any): Логгер
+
+        Raises:
+            ValueError: Если режим неизвестен
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"неизвестный режим кластера {mode!r}, ожидается {' или '.join(self.MODES)}")
+        self.backend = backend
+        self.mode = mode
+        self.instance_id = instance_id or socket.gethostname()
+        self.ttl = float(ttl)
+        self.renew_interval = min(float(renew_interval or self.ttl / 3), self.ttl / 2)
+        self.replicas = replicas
+        self.logger = logger
+        self.is_leader = False
+        self.members: Tuple[str, ...] = ()
+        self._ring = HashRing(replicas=replicas)
+        self._valid_until = 0.0
+        self._callbacks: List[Callable[[], Awaitable[None]]] = []
+        self._task: Optional[asyncio.Task] = None
+        metrics = metrics or MetricsRegistry()
+        self._leader_gauge = metrics.gauge("cluster_leader", "Является ли экземпляр лидером (1 - да)").labels()
+        self._members_gauge = metrics.gauge("cluster_members", "Количество действующих экземпляров кластера").labels()
+
+    @classmethod
+    def from_env(cls, env: Any, **overrides: Any) -> Optional["ClusterCoordinator"]:
+        """
+        Создание координатора по переменным окружения CLUSTER_*.
+
+        Срок аренды по умолчанию - половина ALARM_MONITOR_TIMEOUT (не меньше 3 секунд),
+        чтобы резервный экземпляр успевал перехватить проверки в пределах одного интервала.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+
+        Returns:
+            Optional[ClusterCoordinator]: Координатор или None, если CLUSTER_MODE не задан или 'single'
+
+        Raises:
+            ValueError: Если режим или хранилище неизвестны
+        """
+        mode = str(env.get("CLUSTER_MODE") or "single").strip().lower()
+        if mode == "single":
+            return None
+        kind = str(env.get("CLUSTER_BACKEND") or "sqlite").strip().lower()
+        backend_cls = LEASE_BACKENDS.get(kind)
+        if backend_cls is None:
+            raise ValueError(f"неизвестное хранилище аренд {kind!r}, доступны: {', '.join(sorted(LEASE_BACKENDS))}")
+        ttl = env.get("CLUSTER_LEASE_TTL")
+        if ttl in (None, ""):
+            ttl = max(3.0, float(env.get("ALARM_MONITOR_TIMEOUT") or 60) / 2)
+        settings = {
+            "mode": mode,
+            "instance_id": env.get("CLUSTER_INSTANCE_ID"),
+            "ttl": float(ttl),
+            "renew_interval": env.get("CLUSTER_RENEW_INTERVAL"),
+        }
+        settings = {key: value for key, value in settings.items() if value not in (None, "")}
+        if "instance_id" in settings:
+            settings["instance_id"] = str(settings["instance_id"])
+        if "renew_interval" in settings:
+            settings["renew_interval"] = float(settings["renew_interval"])
+        settings.update(overrides)
+        if "backend" not in settings:
+            settings["backend"] = backend_cls(str(env.get("CLUSTER_PATH") or "") or None)
+        return cls(**settings)
+
+    def subscribe(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """
+        Подписка на изменение лидерства или состава участников.
+        """
+        self._callbacks.append(callback)
+
+    def owns(self, key: str) -> bool:
+        """
+        Должен ли этот экземпляр обрабатывать ключ (цель мониторинга).
+        """
+        if self.mode == "leader":
+            return self.is_leader
+        return self._ring.owner(key) == self.instance_id
+
+    def describe(self) -> str:
+        """
+        Краткое описание роли экземпляра для статуса.
+        """
+        if self.mode == "leader":
+            return f"{'лидер' if self.is_leader else 'резерв'} ({self.instance_id})"
+        return f"шард {self.instance_id}, экземпляров: {len(self.members)}"
+
+    async def start(self) -> None:
+        """
+        Первая попытка захвата аренды (чтобы роли были известны до запуска мониторинга)
+        и запуск фонового продления.
+        """
+        await self.tick()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Остановка продления и освобождение аренд, чтобы другой экземпляр
+        перехватил работу сразу, не дожидаясь истечения срока.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.to_thread(self._release)
+        except Exception as e:
+            self._log("error", f"Не удалось освободить аренду: {e}")
+        self.backend.close()
+
+    def _release(self) -> None:
+        if self.mode == "leader":
+            self.backend.release(self.LEADER_LEASE, self.instance_id)
+        else:
+            self.backend.release(self.MEMBER_PREFIX + self.instance_id, self.instance_id)
+
+    async def _run(self) -> None:
+        while True:
+            delay = self.renew_interval
+            if self.is_leader or self.members:
+                # Проснуться не позже истечения аренды, чтобы вовремя отказаться от роли или целей
+                delay = min(delay, max(0.0, self._valid_until - time.monotonic()))
+            await asyncio.sleep(delay)
+            await self.tick()
+
+    def _sync(self) -> Tuple[bool, Tuple[str, ...]]:
+        if self.mode == "leader":
+            return self.backend.acquire(self.LEADER_LEASE, self.instance_id, self.ttl), ()
+        self.backend.acquire(self.MEMBER_PREFIX + self.instance_id, self.instance_id, self.ttl)
+        return False, tuple(sorted(set(self.backend.holders(self.MEMBER_PREFIX).values())))
+
+    async def tick(self) -> bool:
+        """
+        Продление или захват аренды и обновление ролей.
+
+        Returns:
+            bool: Изменились ли лидерство или состав участников
+        """
+        started = time.monotonic()
+        try:
+            is_leader, members = await asyncio.wait_for(asyncio.to_thread(self._sync), self.renew_interval)
+        except Exception as e:
+            self._log("error", f"Ошибка обращения к хранилищу аренд: {e!r}")
+            # Роль и цели сохраняются, пока не истекла последняя подтверждённая аренда
+            valid = started < self._valid_until
+            is_leader = self.is_leader and valid
+            members = self.members if valid else ()
+        else:
+            if is_leader or self.mode == "shard":
+                self._valid_until = started + self.ttl
+        return await self._update(is_leader, members)
+
+    async def _update(self, is_leader: bool, members: Tuple[str, ...]) -> bool:
+        changed = False
+        if is_leader != self.is_leader:
+            self.is_leader = is_leader
+            self._leader_gauge.set(1 if is_leader else 0)
+            if is_leader:
+                self._log("warning", f"Экземпляр {self.instance_id} стал лидером")
+            else:
+                self._log("warning", f"Экземпляр {self.instance_id} больше не лидер")
+            changed = True
+        if members != self.members:
+            self.members = members
+            self._ring = HashRing(members, replicas=self.replicas)
+            self._members_gauge.set(len(members))
+            self._log("info", f"Состав кластера изменился: {', '.join(members) or 'нет участников'}")
+            changed = True
+        if changed:
+            for callback in list(self._callbacks):
+                try:
+                    await callback()
+                except Exception as e:
+                    self._log("error", f"Ошибка при смене роли экземпляра: {e}")
+        return changed
+
+    def _log(self, level: str, message: str) -> None:
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
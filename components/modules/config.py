@@ -0,0 +1,304 @@
+from types import MappingProxyType
+from typing import (
+    Any,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+)
+
+from .alarm import AlarmPolicy, parse_escalation
+from .matcher import ResponseMatcher, parse_json_expectations
+from .probe import parse_headers
+from .silence import normalize_id, parse_timeouts
+
+
+def _as_list(value: Any) -> List[str]:
+    """
+    Приведение значения переменной окружения (одно значение, список или пусто) к списку строк.
+    """
+    if value in (None, ""):
+        return []
+    values = value if isinstance(value, list) else [value]
+    return [item for item in (normalize_id(v) for v in values) if item]
+
+
+def _as_text(value: Any, separator: str = ",") -> Optional[str]:
+    """
+    Восстановление текста, который EnvReader разбил по запятым на список.
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, list):
+        return separator.join(str(item) for item in value)
+    return str(value)
+
+
+class AppConfig:
+    """
+    Неизменяемый типизированный снимок настроек мониторинга.
+
+    Создаётся один раз из EnvReader: значения проверяются, списки
+    преобразуются в frozenset и tuple, поэтому обработчики и тики мониторинга
+    читают обычные атрибуты без разбора строк. При перезагрузке настроек
+    создаётся новый снимок и заменяет старый одним присваиванием ссылки.
+
+    Attributes:
+        monitor_mode (str): Режим мониторинга ('api' или 'channel')
+        allow_all_users (bool): Доступ к боту разрешён всем
+        allowed_users (FrozenSet[str]): id пользователей с доступом к боту
+        notify_users (Tuple[str, ...]): Получатели уведомлений ('all' - все известные чаты)
+        phones_for_call (FrozenSet[str]): Телефоны для звонков при тревоге
+        timeout_for_message (int): Таймаут тревоги в секундах
+        monitor_timeout (int): Интервал проверки в секундах
+        monitor_channel_ids (Optional[FrozenSet[str]]): Отслеживаемые каналы (None - все)
+        message_author_ids (Optional[FrozenSet[str]]): Отслеживаемые авторы (None - любые)
+        channel_timeouts (Mapping[Tuple[str, str], float]): Индивидуальные таймауты каналов
+        alarm_fail_threshold (int): Количество сбоев (N) среди последних alarm_fail_window проверок для тревоги
+        alarm_fail_window (int): Количество последних проверок (M)
+        alarm_recover_threshold (int): Успешных проверок подряд для снятия тревоги
+        alarm_flap_threshold (int): Переключений тревоги за alarm_flap_window для признания нестабильности (0 - выключено)
+        alarm_flap_window (float): Окно обнаружения нестабильности в секундах
+        alarm_escalation (Tuple[Tuple[float, str], ...]): Ступени эскалации (задержка, действие)
+        duty_phones (FrozenSet[str]): Телефоны дежурных для последней ступени эскалации
+        incident_history (int): Количество закрытых инцидентов в памяти для /incidents
+
+    Examples:
+        >>> config = AppConfig.from_env(env)
+        >>> if config.allow_all_users or user_id in config.allowed_users:
+        ...     ...
+    """
+
+    __slots__ = (
+        "monitor_mode",
+        "allow_all_users",
+        "allowed_users",
+        "notify_users",
+        "phones_for_call",
+        "timeout_for_message",
+        "monitor_timeout",
+        "monitor_channel_ids",
+        "message_author_ids",
+        "channel_timeouts",
+        "alarm_fail_threshold",
+        "alarm_fail_window",
+        "alarm_recover_threshold",
+        "alarm_flap_threshold",
+        "alarm_flap_window",
+        "alarm_escalation",
+        "duty_phones",
+        "incident_history",
+        "api_urls",
+        "api_method",
+        "api_headers",
+        "api_body",
+        "api_targets_file",
+        "api_expect",
+        "tls_min_days",
+        "api_concurrency",
+        "api_request_timeout",
+        "latency_threshold_ms",
+        "latency_percentile",
+        "latency_window",
+        "latency_min_samples",
+        "zvonobot_api_key",
+        "zvonobot_outgoing_phone",
+        "zvonobot_duty_phone",
+        "zvonobot_voice_gender",
+        "zvonobot_message",
+        "zvonobot_base_url",
+        "zvonobot_connect_timeout",
+        "zvonobot_read_timeout",
+        "zvonobot_retries",
+        "zvonobot_backoff_base",
+        "zvonobot_backoff_max",
+    )
+
+    MONITOR_MODES = frozenset({"api", "channel"})
+    API_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+
+    def __init__(self, **values: Any) -> None:
+        """
+        Создание снимка из готовых значений (все поля обязательны).
+
+        Raises:
+            TypeError: Если не заданы или заданы лишние поля
+        """
+        missing = [name for name in self.__slots__ if name not in values]
+        extra = [name for name in values if name not in self.__slots__]
+        if missing or extra:
+            raise TypeError(f"Неверные поля конфигурации: не заданы {missing}, лишние {extra}")
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("AppConfig неизменяем, используйте replace()")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("AppConfig неизменяем")
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, AppConfig):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"AppConfig(mode={self.monitor_mode!r}, monitor_timeout={self.monitor_timeout})"
+
+    def replace(self, **changes: Any) -> "AppConfig":
+        """
+        Новый снимок с изменёнными полями.
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return AppConfig(**values)
+
+    def diff(self, other: "AppConfig") -> Set[str]:
+        """
+        Имена полей, значения которых отличаются от другого снимка.
+        """
+        return {name for name in self.__slots__ if getattr(self, name) != getattr(other, name)}
+
+    def is_allowed(self, user_id: Any) -> bool:
+        """
+        Проверка доступа пользователя к боту.
+        """
+        return self.allow_all_users or normalize_id(user_id) in self.allowed_users
+
+    @classmethod
+    def from_env(cls, env: Any) -> "AppConfig":
+        """
+        Построение и проверка снимка настроек по переменным окружения.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+
+        Returns:
+            AppConfig: Снимок настроек
+
+        Raises:
+            ValueError: Если настройки некорректны (перечисляются все ошибки)
+        """
+        errors: List[str] = []
+
+        def number(key: str, default: float, cast=float, minimum: Optional[float] = None) -> Any:
+            value = env.get(key)
+            if value in (None, ""):
+                return cast(default)
+            try:
+                result = cast(value)
+            except (TypeError, ValueError):
+                errors.append(f"{key}: ожидается число, получено {value!r}")
+                return cast(default)
+            if minimum is not None and result < minimum:
+                errors.append(f"{key}: значение должно быть не меньше {minimum}")
+            return result
+
+        def id_set(key: str, wildcard: str) -> Optional[FrozenSet[str]]:
+            values = _as_list(env.get(key))
+            if not values or wildcard in values:
+                return None
+            return frozenset(values)
+
+        monitor_mode = str(env.get("ALARM_MONITOR_MODE") or "api").lower()
+        if monitor_mode not in cls.MONITOR_MODES:
+            errors.append(f"ALARM_MONITOR_MODE: неизвестный режим {monitor_mode!r}")
+
+        allowed_users = frozenset(_as_list(env.get("TELEGRAM_BOT_USERS_ID_ACCESS")))
+
+        api_method = str(env.get("ALARM_API_METHOD") or "GET").upper()
+        if api_method not in cls.API_METHODS:
+            errors.append(f"ALARM_API_METHOD: неподдерживаемый метод {api_method!r}")
+
+        try:
+            channel_timeouts = parse_timeouts(env.get("ALARM_CHANNEL_TIMEOUTS"))
+        except ValueError as e:
+            errors.append(f"ALARM_CHANNEL_TIMEOUTS: {e}")
+            channel_timeouts = {}
+
+        try:
+            alarm_escalation = parse_escalation(env.get("ALARM_ESCALATION") or ["telegram:0", "call:0"])
+        except ValueError as e:
+            errors.append(f"ALARM_ESCALATION: {e}")
+            alarm_escalation = ()
+
+        alarm_fail_threshold = number("ALARM_FAIL_THRESHOLD", 1, int, minimum=1)
+        alarm_fail_window = number("ALARM_FAIL_WINDOW", alarm_fail_threshold, int, minimum=1)
+        alarm_recover_threshold = number("ALARM_RECOVER_THRESHOLD", 1, int, minimum=1)
+        alarm_flap_threshold = number("ALARM_FLAP_THRESHOLD", 0, int, minimum=0)
+        alarm_flap_window = number("ALARM_FLAP_WINDOW", 600, minimum=1)
+        try:
+            AlarmPolicy(
+                fail_threshold=alarm_fail_threshold,
+                fail_window=alarm_fail_window,
+                recover_threshold=alarm_recover_threshold,
+                flap_threshold=alarm_flap_threshold,
+                flap_window=alarm_flap_window
+            )
+        except ValueError as e:
+            errors.append(f"ALARM_FAIL_THRESHOLD/ALARM_FAIL_WINDOW/ALARM_FLAP_THRESHOLD: {e}")
+
+        try:
+            api_expect = {
+                "status": env.get("ALARM_API_EXPECT_STATUS"),
+                "contains": _as_text(env.get("ALARM_API_EXPECT_BODY")),
+                "json": parse_json_expectations(env.get("ALARM_API_EXPECT_JSON")),
+                "max_body": number("ALARM_API_MAX_BODY", 0, int, minimum=0),
+            }
+            api_expect = {key: value for key, value in api_expect.items() if value not in (None, "", {}, 0)}
+            ResponseMatcher.from_dict(api_expect)
+        except ValueError as e:
+            errors.append(f"ALARM_API_EXPECT_*: {e}")
+            api_expect = {}
+
+        latency_percentile = number("ALARM_LATENCY_PERCENTILE", 95, minimum=0)
+        if latency_percentile > 100:
+            errors.append("ALARM_LATENCY_PERCENTILE: значение должно быть от 0 до 100")
+
+        config = cls(
+            monitor_mode=monitor_mode,
+            allow_all_users="all" in allowed_users,
+            allowed_users=allowed_users,
+            notify_users=tuple(dict.fromkeys(_as_list(env.get("ALARM_USERS_ID_NOTIFICATION")))),
+            phones_for_call=frozenset(_as_list(env.get("ALARM_PHONES_FOR_CALL"))),
+            timeout_for_message=number("ALARM_TIMEOUT_FOR_MESSAGE", 300, int, minimum=1),
+            monitor_timeout=number("ALARM_MONITOR_TIMEOUT", 60, int, minimum=1),
+            monitor_channel_ids=id_set("ALARM_MONITOR_CHANNEL_ID", "auto"),
+            message_author_ids=id_set("ALARM_MESSAGE_AUTHOR_ID", "all"),
+            channel_timeouts=MappingProxyType(channel_timeouts),
+            alarm_fail_threshold=alarm_fail_threshold,
+            alarm_fail_window=alarm_fail_window,
+            alarm_recover_threshold=alarm_recover_threshold,
+            alarm_flap_threshold=alarm_flap_threshold,
+            alarm_flap_window=alarm_flap_window,
+            alarm_escalation=alarm_escalation,
+            duty_phones=frozenset(_as_list(env.get("ALARM_DUTY_PHONES"))),
+            incident_history=number("ALARM_INCIDENT_HISTORY", 100, int, minimum=1),
+            api_urls=tuple(str(url).strip() for url in _as_list(env.get("ALARM_API_URL"))),
+            api_method=api_method,
+            api_headers=MappingProxyType(parse_headers(env.get("ALARM_API_HEADERS"))),
+            api_body=_as_text(env.get("ALARM_API_BODY")),
+            api_targets_file=_as_text(env.get("ALARM_API_TARGETS_FILE")),
+            api_expect=MappingProxyType(api_expect),
+            tls_min_days=number("ALARM_TLS_MIN_DAYS", 14, minimum=0),
+            api_concurrency=number("ALARM_API_CONCURRENCY", 100, int, minimum=1),
+            api_request_timeout=number("ALARM_API_REQUEST_TIMEOUT", 10, minimum=0.001),
+            latency_threshold_ms=number("ALARM_LATENCY_THRESHOLD_MS", 0, minimum=0),
+            latency_percentile=latency_percentile,
+            latency_window=number("ALARM_LATENCY_WINDOW", 300, minimum=1),
+            latency_min_samples=number("ALARM_LATENCY_MIN_SAMPLES", 5, int, minimum=1),
+            zvonobot_api_key=_as_text(env.get("ZVONOBOT_API_KEY")),
+            zvonobot_outgoing_phone=_as_text(env.get("ZVONOBOT_OUTGOING_PHONE")),
+            zvonobot_duty_phone=number("ZVONOBOT_DUTY_PHONE", 0, int),
+            zvonobot_voice_gender=number("ZVONOBOT_VOICE_GENDER", 0, int),
+            zvonobot_message=_as_text(env.get("ZVONOBOT_MESSAGE"), ", "),
+            zvonobot_base_url=_as_text(env.get("ZVONOBOT_BASE_URL")) or "https://lk.zvonobot.ru",
+            zvonobot_connect_timeout=number("ZVONOBOT_CONNECT_TIMEOUT", 5, minimum=0.001),
+            zvonobot_read_timeout=number("ZVONOBOT_READ_TIMEOUT", 15, minimum=0.001),
+            zvonobot_retries=number("ZVONOBOT_RETRIES", 3, int, minimum=0),
+            zvonobot_backoff_base=number("ZVONOBOT_BACKOFF_BASE", 1, minimum=0),
+            zvonobot_backoff_max=number("ZVONOBOT_BACKOFF_MAX", 30, minimum=0),
+        )
+        if errors:
+            raise ValueError("Некорректные настройки:\n" + "\n".join(errors))
+        return config
@@ -1,14 +1,17 @@
 import os
+import asyncio
+import inspect
 from typing import (
     Any, 
+    Callable, 
     Dict, 
     List, 
     Optional, 
+    Set, 
+    Tuple, 
     Union
 )
 
-from rich.table import Table
-from rich.console import Console
 
 class EnvReader:
     """
@@ -21,33 +24,50 @@ class EnvReader:
     Attributes:
         env_data (Dict[str, Any]): Словарь с переменными окружения.
         required_vars (List[str]): Список обязательных переменных окружения.
+        env_file (Optional[str]): Файл с переменными (KEY=VALUE), значения которого имеют приоритет над окружением.
+        dump (bool): Выводить ли таблицу переменных при создании (ENV_DUMP, по умолчанию True).
     
     Examples:
         >>> env = EnvReader(required_vars=["API_KEY"])
         >>> api_key = env.API_KEY
         >>> debug_mode = env.get("DEBUG", False)
+        >>> env = EnvReader(env_file=".env")
+        >>> quiet = EnvReader(dump=False)
+        >>> env.subscribe(on_change)
+        >>> env.watch(interval=2)
     """
     
     def __init__(
         self, 
-        required_vars: Optional[List[str]] = None
+        required_vars: Optional[List[str]] = None,
+        env_file: Optional[str] = None,
+        dump: Optional[bool] = None
     ) -> None:
         """
         Инициализация EnvReader.
         
         Args:
             required_vars (Optional[List[str]]): Список обязательных переменных окружения.
+            env_file (Optional[str]): Файл с переменными окружения для чтения и отслеживания изменений.
+            dump (Optional[bool]): Выводить ли таблицу переменных. По умолчанию - значение ENV_DUMP (True, если не задано).
         
         Raises:
             ValueError: Если отсутствуют обязательные переменные окружения.
         """
-        self.console = Console()
         self.env_data: Dict[str, Any] = {}
         self.required_vars = required_vars or []
+        self.env_file = env_file
+        self._subscribers: List[Callable[[Set[str]], Any]] = []
+        self._watched: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+        if env_file:
+            self._watched[env_file] = self._stat(env_file)
         
         self._load_envs()
         self._validate_required_vars()
-        self._display_env_table()
+        self.dump = bool(self.env_data.get("ENV_DUMP", True)) if dump is None else dump
+        if self.dump:
+            self._display_env_table()
 
     def _load_envs(self) -> None:
         """
@@ -55,8 +75,48 @@ class EnvReader:
         
         Автоматически преобразует значения в соответствующие типы данных.
         """
-        for name, value in os.environ.items():
-            self.env_data[name.strip()] = self._convert_type(value.strip())
+        self.env_data = self._read_envs()
+
+    def _read_envs(self) -> Dict[str, Any]:
+        """
+        Чтение переменных окружения и файла env_file (значения файла имеют приоритет).
+        
+        Returns:
+            Dict[str, Any]: Новый словарь переменных с преобразованными типами.
+        """
+        data = {name.strip(): self._convert_type(value.strip()) for name, value in os.environ.items()}
+        if self.env_file and os.path.exists(self.env_file):
+            for name, value in self._parse_env_file(self.env_file).items():
+                data[name] = self._convert_type(value)
+        return data
+
+    @staticmethod
+    def _parse_env_file(path: str) -> Dict[str, str]:
+        """
+        Разбор файла формата .env: KEY=VALUE, комментарии '#', необязательные кавычки и 'export'.
+        
+        Args:
+            path (str): Путь к файлу.
+        
+        Returns:
+            Dict[str, str]: Значения переменных в виде строк.
+        """
+        values: Dict[str, str] = {}
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                if line.startswith("export "):
+                    line = line[len("export "):]
+                name, value = line.split("=", 1)
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                    value = value[1:-1]
+                elif " #" in value:
+                    value = value.split(" #", 1)[0].rstrip()
+                values[name.strip()] = value
+        return values
 
     def _convert_type(self, value: str) -> Union[str, bool, int, float, List[str]]:
         """
@@ -159,13 +219,119 @@ class EnvReader:
         """
         return list(self.env_data.keys())
 
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def subscribe(self, callback: Callable[[Set[str]], Any]) -> None:
+        """
+        Подписка на изменения переменных.
+        
+        Args:
+            callback (Callable[[Set[str]], Any]): Функция или корутина, получающая множество
+                изменившихся переменных (для отслеживаемых файлов - "file:<путь>").
+        """
+        self._subscribers.append(callback)
+
+    def watch_file(self, path: Optional[str]) -> None:
+        """
+        Добавление файла (например, файла целей) в отслеживаемые.
+        """
+        if path and path not in self._watched:
+            self._watched[path] = self._stat(path)
+
+    def reload(self) -> Set[str]:
+        """
+        Перечитывание переменных и атомарная замена env_data.
+        
+        Returns:
+            Set[str]: Имена добавленных, изменённых и удалённых переменных.
+        
+        Raises:
+            ValueError: Если после перечитывания отсутствуют обязательные переменные (env_data не меняется).
+        """
+        data = self._read_envs()
+        missing_vars = [var for var in self.required_vars if var not in data]
+        if missing_vars:
+            raise ValueError(f"Отсутствуют обязательные переменные окружения: {', '.join(missing_vars)}")
+        old = self.env_data
+        changed = {key for key in old.keys() | data.keys() if old.get(key) != data.get(key)}
+        self.env_data = data
+        return changed
+
+    async def check_changes(self) -> Set[str]:
+        """
+        Проверка отслеживаемых файлов по времени изменения и уведомление подписчиков.
+        
+        Returns:
+            Set[str]: Изменившиеся переменные и файлы (пустое множество, если изменений нет).
+        """
+        changed: Set[str] = set()
+        for path, previous in list(self._watched.items()):
+            current = self._stat(path)
+            if current == previous:
+                continue
+            self._watched[path] = current
+            if path == self.env_file:
+                changed |= self.reload()
+            else:
+                changed.add(f"file:{path}")
+        if changed:
+            for callback in list(self._subscribers):
+                result = callback(changed)
+                if inspect.isawaitable(result):
+                    await result
+        return changed
+
+    async def _run_watch(self, interval: float, logger: Any = None) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check_changes()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if logger:
+                    logger.error(f"Ошибка при перезагрузке переменных окружения: {e}")
+
+    def watch(self, interval: float = 2.0, logger: Any = None) -> None:
+        """
+        Запуск фонового отслеживания изменений файлов (опрос времени изменения).
+        
+        Args:
+            interval (float): Интервал проверки в секундах.
+            logger (Any): Логгер для записи ошибок.
+        """
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._run_watch(float(interval), logger))
+
+    async def stop_watch(self) -> None:
+        """
+        Остановка отслеживания изменений.
+        """
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
     def _display_env_table(self) -> None:
         """
         Отображение таблицы с переменными окружения.
         
         Выводит таблицу с информацией о переменных окружения, включая их значения
         и типы. Чувствительные данные (содержащие TOKEN, KEY, SHA) маскируются.
+        Таблицы rich импортируются только здесь, чтобы тихий запуск (ENV_DUMP=False) их не загружал.
         """
+        from rich.table import Table
+        from rich.console import Console
+
         table = Table(title="Переменные окружения")
         table.add_column("Переменная", style="bold cyan")
         table.add_column("Значение", style="bold green")
@@ -176,4 +342,4 @@ class EnvReader:
             value_type = type(value).__name__
             table.add_row(key, display_value, value_type)
 
-        self.console.print(table)
\ No newline at end of file
+        Console().print(table)
\ No newline at end of file
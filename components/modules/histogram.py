@@ -0,0 +1,322 @@
+import math
+import time
+from array import array
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+
+_BUCKET_COUNTS: Dict[tuple, int] = {}
+
+
+def _bucket_count(min_value: float, max_value: float, growth: float) -> int:
+    key = (min_value, max_value, growth)
+    size = _BUCKET_COUNTS.get(key)
+    if size is None:
+        size = int(math.ceil(math.log(max_value / min_value) / math.log(growth))) + 2
+        _BUCKET_COUNTS[key] = size
+    return size
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с фиксированным набором логарифмических корзин (в стиле HDR).
+
+    Границы корзин растут геометрически, поэтому относительная погрешность
+    перцентилей одинакова во всём диапазоне, а память не зависит от количества
+    записанных значений.
+
+    Attributes:
+        min_value (float): Нижняя граница диапазона (значения ниже попадают в первую корзину)
+        max_value (float): Верхняя граница диапазона (значения выше попадают в последнюю корзину)
+        growth (float): Отношение границ соседних корзин (1.1 - погрешность около 5%)
+        counts (array): Количество значений в каждой корзине
+        total (int): Общее количество значений
+
+    Examples:
+        >>> histogram = LatencyHistogram()
+        >>> histogram.record(12.5)
+        >>> histogram.percentile(95)
+    """
+
+    __slots__ = ("min_value", "max_value", "growth", "_log_growth", "counts", "total", "sum")
+
+    def __init__(self, min_value: float = 0.1, max_value: float = 120_000, growth: float = 1.1) -> None:
+        """
+        Инициализация гистограммы.
+
+        Args:
+            min_value (float): Нижняя граница диапазона. По умолчанию 0.1 (мс).
+            max_value (float): Верхняя граница диапазона. По умолчанию 120000 (мс).
+            growth (float): Отношение границ соседних корзин. По умолчанию 1.1.
+        """
+        self.min_value = float(min_value)
+        self.max_value = float(max_value)
+        self.growth = float(growth)
+        self._log_growth = math.log(self.growth)
+        self.counts = array("I", bytes(4 * _bucket_count(self.min_value, self.max_value, self.growth)))
+        self.total = 0
+        self.sum = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.log(value / self.min_value) / self._log_growth) + 1
+        return min(index, len(self.counts) - 1)
+
+    def upper_bound(self, index: int) -> float:
+        """
+        Верхняя граница корзины с указанным индексом.
+        """
+        return self.min_value * (self.growth ** index)
+
+    def record(self, value: float, count: int = 1) -> None:
+        """
+        Запись значения.
+
+        Args:
+            value (float): Значение (например, задержка в мс)
+            count (int): Количество одинаковых значений
+        """
+        self.counts[self._index(value)] += count
+        self.total += count
+        self.sum += value * count
+
+    def reset(self) -> None:
+        """
+        Очистка гистограммы без выделения новой памяти.
+        """
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.total = 0
+        self.sum = 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Добавление значений другой гистограммы с такими же корзинами.
+        """
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Оценка перцентиля.
+
+        Args:
+            q (float): Перцентиль от 0 до 100
+
+        Returns:
+            Optional[float]: Верхняя граница корзины, содержащей перцентиль, или None если данных нет
+        """
+        return percentiles_from_counts(self.counts, self.total, (q,), self.upper_bound)[0]
+
+    def percentiles(self, qs: Sequence[float] = (50, 95, 99)) -> List[Optional[float]]:
+        """
+        Оценка нескольких перцентилей за один проход.
+        """
+        return percentiles_from_counts(self.counts, self.total, qs, self.upper_bound)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """
+        Среднее значение или None если данных нет.
+        """
+        return self.sum / self.total if self.total else None
+
+
+def percentiles_from_counts(counts: Iterable[int], total: int, qs: Sequence[float], upper_bound) -> List[Optional[float]]:
+    """
+    Вычисление перцентилей по счётчикам корзин за один проход.
+
+    Args:
+        counts (Iterable[int]): Счётчики корзин
+        total (int): Сумма счётчиков
+        qs (Sequence[float]): Перцентили от 0 до 100
+        upper_bound (Callable[[int], float]): Функция получения верхней границы корзины по индексу
+
+    Returns:
+        List[Optional[float]]: Значения перцентилей в порядке qs
+    """
+    if not total:
+        return [None] * len(qs)
+    order = sorted(range(len(qs)), key=lambda i: qs[i])
+    ranks = [max(1, math.ceil(total * min(max(qs[i], 0), 100) / 100)) for i in order]
+    result: List[Optional[float]] = [None] * len(qs)
+    position = 0
+    cumulative = 0
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        cumulative += count
+        while position < len(order) and cumulative >= ranks[position]:
+            result[order[position]] = upper_bound(index)
+            position += 1
+        if position == len(order):
+            break
+    return result
+
+
+class WindowedHistogram:
+    """
+    Гистограмма за скользящее окно времени.
+
+    Окно разбито на фиксированное количество интервалов, для каждого хранится
+    своя LatencyHistogram (создаётся при первой записи в интервал). Устаревшие
+    интервалы очищаются и переиспользуются, поэтому память ограничена, а запрос
+    перцентилей стоит O(интервалы × корзины).
+
+    Attributes:
+        window (float): Длина окна в секундах
+        slots (int): Количество интервалов в окне
+
+    Examples:
+        >>> histogram = WindowedHistogram(window=300, slots=5)
+        >>> histogram.record(42.0)
+        >>> p50, p95, p99 = histogram.percentiles((50, 95, 99))
+        >>> p95_last_minute = histogram.percentile(95, window=60)
+    """
+
+    __slots__ = ("window", "slots", "slot_seconds", "_histograms", "_epochs", "_clock", "_options")
+
+    def __init__(self, window: float = 300, slots: int = 5, clock=time.monotonic, **histogram_options) -> None:
+        """
+        Инициализация гистограммы со скользящим окном.
+
+        Args:
+            window (float): Длина окна в секундах. По умолчанию 300.
+            slots (int): Количество интервалов в окне. По умолчанию 5.
+            clock (Callable[[], float]): Источник монотонного времени.
+            **histogram_options: Параметры корзин LatencyHistogram.
+        """
+        self.window = float(window)
+        self.slots = max(1, int(slots))
+        self.slot_seconds = self.window / self.slots
+        self._histograms: List[Optional[LatencyHistogram]] = [None] * self.slots
+        self._epochs = [-1] * self.slots
+        self._clock = clock
+        self._options = histogram_options
+
+    def _current(self) -> LatencyHistogram:
+        epoch = int(self._clock() // self.slot_seconds)
+        index = epoch % self.slots
+        histogram = self._histograms[index]
+        if histogram is None:
+            histogram = self._histograms[index] = LatencyHistogram(**self._options)
+            self._epochs[index] = epoch
+        elif self._epochs[index] != epoch:
+            histogram.reset()
+            self._epochs[index] = epoch
+        return histogram
+
+    def record(self, value: float) -> None:
+        """
+        Запись значения в текущий интервал.
+        """
+        self._current().record(value)
+
+    def snapshot(self, window: Optional[float] = None) -> LatencyHistogram:
+        """
+        Объединённая гистограмма за последние window секунд (не больше длины окна).
+
+        Args:
+            window (Optional[float]): Длина запрашиваемого окна в секундах (None - всё окно)
+
+        Returns:
+            LatencyHistogram: Новая гистограмма со значениями за окно
+        """
+        epoch = int(self._clock() // self.slot_seconds)
+        span = self.slots if window is None else max(1, min(self.slots, math.ceil(window / self.slot_seconds)))
+        merged = LatencyHistogram(**self._options)
+        for index, slot_epoch in enumerate(self._epochs):
+            if slot_epoch >= 0 and epoch - span < slot_epoch <= epoch:
+                merged.merge(self._histograms[index])
+        return merged
+
+    def percentile(self, q: float, window: Optional[float] = None) -> Optional[float]:
+        """
+        Оценка перцентиля за окно.
+        """
+        return self.snapshot(window).percentile(q)
+
+    def percentiles(self, qs: Sequence[float] = (50, 95, 99), window: Optional[float] = None) -> List[Optional[float]]:
+        """
+        Оценка нескольких перцентилей за окно.
+        """
+        return self.snapshot(window).percentiles(qs)
+
+    def count(self, window: Optional[float] = None) -> int:
+        """
+        Количество значений за окно.
+        """
+        return self.snapshot(window).total
+
+
+class LatencyTracker:
+    """
+    Набор гистограмм со скользящим окном по фазам запроса одной цели.
+
+    Фазы: dns (разрешение имени), connect (TCP и TLS), ttfb (до первого байта ответа),
+    total (полное время проверки).
+
+    Examples:
+        >>> tracker = LatencyTracker(window=300)
+        >>> tracker.record({"dns": 1.2, "connect": 10.5, "ttfb": 40.0, "total": 42.3})
+        >>> tracker.percentiles("total")
+    """
+
+    PHASES = ("dns", "connect", "ttfb", "total")
+
+    __slots__ = ("window", "slots", "phases")
+
+    def __init__(self, window: float = 300, slots: int = 5) -> None:
+        """
+        Инициализация трекера. Гистограммы фаз создаются при первой записи.
+
+        Args:
+            window (float): Длина окна в секундах
+            slots (int): Количество интервалов в окне
+        """
+        self.window = window
+        self.slots = slots
+        self.phases: Dict[str, WindowedHistogram] = {}
+
+    def record(self, timings: Dict[str, Optional[float]]) -> None:
+        """
+        Запись времени фаз одного запроса (в мс). Отсутствующие фазы пропускаются.
+        """
+        for phase, value in timings.items():
+            if value is None or phase not in self.PHASES:
+                continue
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = WindowedHistogram(window=self.window, slots=self.slots)
+            histogram.record(value)
+
+    def snapshot(self, phase: str = "total", window: Optional[float] = None) -> LatencyHistogram:
+        """
+        Объединённая гистограмма фазы за окно.
+        """
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            return LatencyHistogram()
+        return histogram.snapshot(window)
+
+    def percentile(self, q: float, phase: str = "total", window: Optional[float] = None) -> Optional[float]:
+        """
+        Оценка перцентиля для фазы за окно.
+        """
+        return self.snapshot(phase, window).percentile(q)
+
+    def percentiles(self, phase: str = "total", qs: Sequence[float] = (50, 95, 99), window: Optional[float] = None) -> List[Optional[float]]:
+        """
+        Оценка нескольких перцентилей для фазы за окно.
+        """
+        return self.snapshot(phase, window).percentiles(qs)
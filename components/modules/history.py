@@ -0,0 +1,1156 @@
+import os
+import re
+import json
+import math
+import mmap
+import time
+import struct
+from array import array
+from bisect import bisect_left
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .histogram import LatencyHistogram
+
+# Гистограмма задержек в свёртках: корзины с шагом 1.5 от 1 мс до 60 сек
+HISTORY_LATENCY_RANGE = (1.0, 60_000.0, 1.5)
+
+SeriesColumn = Tuple[str, str, int]
+
+HISTORY_PERIOD_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+_PERIOD_PART = re.compile(r"(\d+(?:\.\d+)?)([mhdw])")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def history_histogram() -> LatencyHistogram:
+    """
+    Пустая гистограмма задержек с корзинами свёрток истории.
+    """
+    return LatencyHistogram(*HISTORY_LATENCY_RANGE)
+
+
+def parse_history_period(text: str) -> float:
+    """
+    Разбор длительности периода вида "90m", "24h", "7d", "2w", "1d12h".
+
+    Args:
+        text (str): Длительность
+
+    Returns:
+        float: Длительность в секундах
+
+    Raises:
+        ValueError: Если строка не является длительностью
+    """
+    text = text.strip().lower()
+    parts = _PERIOD_PART.findall(text)
+    if not parts or "".join(value + unit for value, unit in parts) != text:
+        raise ValueError(f"{text!r} не является длительностью (например, 24h, 7d, 1d12h)")
+    seconds = sum(float(value) * HISTORY_PERIOD_UNITS[unit] for value, unit in parts)
+    if seconds <= 0:
+        raise ValueError(f"длительность {text!r} должна быть больше нуля")
+    return seconds
+
+
+def parse_history_window(text: str, now: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Разбор периода отчёта: длительность до текущего момента ("7d") или
+    диапазон дат "начало..конец" в локальном времени ("2026-10-01..2026-10-15",
+    "2026-10-01T09:00..2026-10-01T18:00"). Дата без времени в конце диапазона
+    включает весь день, одна дата - весь этот день.
+
+    Args:
+        text (str): Период
+        now (Optional[float]): Текущее время (unix time). По умолчанию time.time().
+
+    Returns:
+        Tuple[float, float]: Начало и конец периода (unix time)
+
+    Raises:
+        ValueError: Если период не разобран или пуст
+    """
+    now = time.time() if now is None else now
+    text = text.strip()
+    if ".." not in text and not _DATE.match(text):
+        return now - parse_history_period(text), now
+    first, _, last = (part.strip() for part in text.partition(".."))
+    last = last or first
+    try:
+        start = datetime.fromisoformat(first)
+        end = datetime.fromisoformat(last)
+    except ValueError:
+        raise ValueError(f"{text!r} не является диапазоном дат (например, 2026-10-01..2026-10-15)") from None
+    if ":" not in last:
+        end += timedelta(days=1)
+    start_ts, end_ts = start.timestamp(), min(end.timestamp(), now)
+    if start_ts >= end_ts:
+        raise ValueError(f"период {text!r} пуст или ещё не наступил")
+    return start_ts, end_ts
+
+
+class SeriesSegment:
+    """
+    Сегмент временного ряда: файл фиксированного размера, отображённый в память.
+
+    Записи фиксированной ширины хранятся по столбцам: за заголовком идут
+    подряд все значения первого столбца, затем второго и т.д., поэтому
+    чтение одного столбца (время, доступность) не затрагивает остальные.
+    Запись - присваивание в отображённую память и обновление счётчика записей
+    в заголовке, без системных вызовов; данные на диск сбрасывает ОС.
+
+    Столбец описывается кортежем (имя, код типа array, ширина): ширина больше 1 -
+    вектор значений на запись (например, корзины гистограммы).
+
+    Attributes:
+        path (str): Путь к файлу сегмента
+        columns (Tuple[SeriesColumn, ...]): Описание столбцов
+        capacity (int): Максимальное количество записей
+        count (int): Количество записанных записей
+
+    Examples:
+        >>> segment = SeriesSegment("raw-00000001.seg", (("ts", "d", 1), ("ok", "B", 1)), capacity=1024)
+        >>> segment.append((time.time(), 1))
+        >>> segment.column("ok")[:segment.count]
+    """
+
+    MAGIC = b"TFAS"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHII")
+    HEADER_SIZE = 64
+    COUNT_OFFSET = 12
+
+    def __init__(self, path: str, columns: Sequence[SeriesColumn], capacity: int = 65536) -> None:
+        """
+        Открытие сегмента или создание нового.
+
+        Args:
+            path (str): Путь к файлу сегмента
+            columns (Sequence[SeriesColumn]): Описание столбцов
+            capacity (int): Максимальное количество записей нового сегмента (округляется до кратного 8). По умолчанию 65536.
+
+        Raises:
+            ValueError: Если существующий файл не является сегментом с такими столбцами
+        """
+        self.path = path
+        self.columns = tuple(columns)
+        exists = os.path.exists(path) and os.path.getsize(path) >= self.HEADER_SIZE
+        self._file = open(path, "r+b" if exists else "w+b")
+        try:
+            if exists:
+                magic, version, width, capacity, count = self.HEADER.unpack(self._file.read(self.HEADER.size))
+                if magic != self.MAGIC or version != self.VERSION or width != len(self.columns):
+                    raise ValueError(f"{path} не является сегментом истории версии {self.VERSION}")
+            else:
+                capacity = max(8, int(math.ceil(int(capacity) / 8)) * 8)
+                count = 0
+            size = self.HEADER_SIZE + capacity * self.record_size(self.columns)
+            if exists and os.path.getsize(path) != size:
+                raise ValueError(f"размер {path} не соответствует заголовку")
+            if not exists:
+                self._file.truncate(size)
+            self._mmap = mmap.mmap(self._file.fileno(), size)
+        except Exception:
+            self._file.close()
+            raise
+        if not exists:
+            self.HEADER.pack_into(self._mmap, 0, self.MAGIC, self.VERSION, len(self.columns), capacity, 0)
+        self.capacity = capacity
+        self.count = min(count, capacity)
+        self._views: Dict[str, memoryview] = {}
+        self._order: List[Tuple[memoryview, int]] = []
+        offset = self.HEADER_SIZE
+        buffer = memoryview(self._mmap)
+        for name, code, width in self.columns:
+            length = capacity * width * struct.calcsize(code)
+            view = buffer[offset:offset + length].cast(code)
+            self._views[name] = view
+            self._order.append((view, width))
+            offset += length
+        buffer.release()
+
+    @staticmethod
+    def record_size(columns: Sequence[SeriesColumn]) -> int:
+        """
+        Размер одной записи в байтах.
+        """
+        return sum(struct.calcsize(code) * width for _, code, width in columns)
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def append(self, values: Sequence[Any]) -> None:
+        """
+        Добавление записи: значения в порядке столбцов, для векторных столбцов - последовательность.
+
+        Raises:
+            IndexError: Если сегмент заполнен
+        """
+        index = self.count
+        if index >= self.capacity:
+            raise IndexError(f"сегмент {self.path} заполнен")
+        for (view, width), value in zip(self._order, values):
+            if width == 1:
+                view[index] = value
+            else:
+                view[index * width:(index + 1) * width] = value
+        self.count = index + 1
+        struct.pack_into("<I", self._mmap, self.COUNT_OFFSET, self.count)
+
+    def column(self, name: str) -> memoryview:
+        """
+        Столбец целиком (значимы первые count * ширина значений).
+        """
+        return self._views[name]
+
+    def first(self, name: str = "ts") -> Optional[float]:
+        return self._views[name][0] if self.count else None
+
+    def last(self, name: str = "ts") -> Optional[float]:
+        return self._views[name][self.count - 1] if self.count else None
+
+    def find(self, value: float, name: str = "ts") -> int:
+        """
+        Индекс первой записи, у которой значение столбца не меньше value (столбец упорядочен).
+        """
+        return bisect_left(self._views[name], value, 0, self.count)
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._order.clear()
+        self._mmap.close()
+        self._file.close()
+
+
+class SegmentedSeries:
+    """
+    Временной ряд из последовательности сегментов в каталоге ({имя}-{номер}.seg).
+
+    Записи добавляются в последний сегмент; заполненный сегмент больше не
+    меняется, следующий создаётся по необходимости. Старые сегменты удаляются
+    целиком, когда последняя запись в них старше срока хранения.
+
+    Attributes:
+        directory (str): Каталог сегментов
+        name (str): Имя ряда
+        columns (Tuple[SeriesColumn, ...]): Описание столбцов (первый - время "ts")
+        capacity (int): Количество записей в сегменте
+        retention (float): Срок хранения в секундах
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        columns: Sequence[SeriesColumn],
+        capacity: int = 65536,
+        retention: float = 86400,
+        logger: Any = None
+    ) -> None:
+        self.directory = directory
+        self.name = name
+        self.columns = tuple(columns)
+        self.capacity = int(capacity)
+        self.retention = float(retention)
+        self.logger = logger
+        self.segments: List[SeriesSegment] = []
+        self._sequence = 0
+
+    def _path(self, sequence: int) -> str:
+        return os.path.join(self.directory, f"{self.name}-{sequence:08d}.seg")
+
+    def open(self) -> None:
+        """
+        Открытие существующих сегментов ряда по порядку номеров.
+        """
+        prefix = f"{self.name}-"
+        sequences = sorted(
+            int(filename[len(prefix):-4])
+            for filename in os.listdir(self.directory)
+            if filename.startswith(prefix) and filename.endswith(".seg") and filename[len(prefix):-4].isdigit()
+        )
+        for sequence in sequences:
+            path = self._path(sequence)
+            try:
+                self.segments.append(SeriesSegment(path, self.columns, self.capacity))
+            except (OSError, ValueError) as e:
+                if self.logger is not None:
+                    self.logger.warning(f"Сегмент истории пропущен: {e}")
+            self._sequence = sequence
+        self.expire()
+
+    def append(self, values: Sequence[Any]) -> None:
+        if not self.segments or self.segments[-1].full:
+            self._sequence += 1
+            self.segments.append(SeriesSegment(self._path(self._sequence), self.columns, self.capacity))
+            self.expire()
+        self.segments[-1].append(values)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Удаление сегментов, все записи которых старше срока хранения (последний сегмент не удаляется).
+
+        Returns:
+            int: Количество удалённых сегментов
+        """
+        horizon = (time.time() if now is None else now) - self.retention
+        removed = 0
+        while len(self.segments) > 1 and (self.segments[0].last() or 0) < horizon:
+            segment = self.segments.pop(0)
+            segment.close()
+            os.remove(segment.path)
+            removed += 1
+        return removed
+
+    def oldest(self) -> Optional[float]:
+        """
+        Время самой старой хранящейся записи.
+        """
+        for segment in self.segments:
+            if segment.count:
+                return segment.first()
+        return None
+
+    def latest(self) -> Optional[float]:
+        """
+        Время последней записи.
+        """
+        for segment in reversed(self.segments):
+            if segment.count:
+                return segment.last()
+        return None
+
+    def ranges(self, start: float, end: float) -> Iterator[Tuple[SeriesSegment, int, int]]:
+        """
+        Диапазоны записей со временем в [start, end): (сегмент, первый индекс, индекс после последнего).
+        """
+        for segment in self.segments:
+            if not segment.count or segment.last() < start:
+                continue
+            if segment.first() >= end:
+                break
+            first = segment.find(start)
+            last = segment.find(end)
+            if first < last:
+                yield segment, first, last
+
+    def records(self, start: float, end: float = math.inf) -> Iterator[Tuple[Any, ...]]:
+        """
+        Записи со временем в [start, end) по порядку, значения в порядке столбцов (только скалярные столбцы).
+        """
+        for segment, first, last in self.ranges(start, end):
+            yield from zip(*(segment.column(name)[first:last] for name, _, _ in self.columns))
+
+    def flush(self) -> None:
+        for segment in self.segments:
+            segment.flush()
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+        self.segments.clear()
+
+
+class RollupSegment:
+    """
+    Свёртки группы целей за отрезок времени: матрица [цель][интервал], отображённая в память.
+
+    В ячейке хранятся накопительные суммы с начала отрезка (количество проверок,
+    неудачи, сумма задержек, корзины гистограммы задержек, количество закрытых
+    инцидентов и их суммарная длительность) и максимум задержки
+    за интервал. Итог по цели за любой диапазон интервалов - разность двух
+    ячеек, поэтому не зависит от длины диапазона. Строки целей не заполняются
+    заранее: пропущенные интервалы дозаполняются предыдущими суммами при
+    следующей записи, а filled хранит количество заполненных интервалов строки.
+
+    Attributes:
+        path (str): Путь к файлу
+        resolution (int): Длительность интервала в секундах
+        slots (int): Количество интервалов в отрезке
+        rows (int): Количество строк (целей)
+        start (int): Начало отрезка (unix time)
+        width (int): Количество корзин гистограммы
+    """
+
+    MAGIC = b"TFAR"
+    VERSION = 2
+    HEADER = struct.Struct("<4sHHIIIq")
+    HEADER_SIZE = 64
+    CELL_COLUMNS = (
+        ("latency_sum", "d"),
+        ("downtime", "d"),
+        ("count", "I"),
+        ("failures", "I"),
+        ("incidents", "I"),
+        ("latency_max", "f"),
+    )
+    # Столбцы накопительных сумм (переносятся в пропущенные интервалы)
+    TOTALS = ("count", "failures", "latency_sum", "incidents", "downtime")
+
+    def __init__(self, path: str, resolution: int, slots: int, rows: int, start: int, width: int) -> None:
+        """
+        Открытие файла свёрток или создание нового.
+
+        Raises:
+            ValueError: Если существующий файл имеет другой формат
+        """
+        self.path = path
+        expected = (self.MAGIC, self.VERSION, width, resolution, slots, rows, start)
+        exists = os.path.exists(path) and os.path.getsize(path) >= self.HEADER_SIZE
+        cells = rows * slots
+        size = self.HEADER_SIZE + cells * (sum(struct.calcsize(code) for _, code in self.CELL_COLUMNS) + 4 * width) + 2 * rows
+        self._file = open(path, "r+b" if exists else "w+b")
+        try:
+            if exists:
+                if self.HEADER.unpack(self._file.read(self.HEADER.size)) != expected or os.path.getsize(path) != size:
+                    raise ValueError(f"{path} не является файлом свёрток с такими параметрами")
+            else:
+                self._file.truncate(size)
+            self._mmap = mmap.mmap(self._file.fileno(), size)
+        except Exception:
+            self._file.close()
+            raise
+        if not exists:
+            self.HEADER.pack_into(self._mmap, 0, *expected)
+        self.resolution = resolution
+        self.slots = slots
+        self.rows = rows
+        self.start = start
+        self.width = width
+        buffer = memoryview(self._mmap)
+        offset = self.HEADER_SIZE
+        views = {}
+        for name, code, length in (
+            *((name, code, cells) for name, code in self.CELL_COLUMNS),
+            ("histogram", "I", cells * width),
+            ("filled", "H", rows),
+        ):
+            end = offset + length * struct.calcsize(code)
+            views[name] = buffer[offset:end].cast(code)
+            offset = end
+        buffer.release()
+        self._views = views
+        self.latency_sum = views["latency_sum"]
+        self.downtime = views["downtime"]
+        self.count = views["count"]
+        self.failures = views["failures"]
+        self.incidents = views["incidents"]
+        self.latency_max = views["latency_max"]
+        self.histogram = views["histogram"]
+        self.filled = views["filled"]
+
+    def add(
+        self,
+        row: int,
+        slot: int,
+        count: int,
+        failures: int,
+        latency_sum: float,
+        latency_max: float,
+        histogram: Sequence[int],
+        incidents: int = 0,
+        downtime: float = 0.0
+    ) -> None:
+        """
+        Добавление итогов интервала slot в строку row. Результат за уже
+        заполненный интервал (запоздавший) добавляется в последний заполненный.
+        """
+        width = self.width
+        filled = self.filled[row]
+        slot = max(slot, filled - 1)
+        base = row * self.slots
+        columns = [self._views[name] for name in self.TOTALS]
+        if filled:
+            previous = base + filled - 1
+            totals = [column[previous] for column in columns]
+            counts = self.histogram[previous * width:(previous + 1) * width].tolist()
+        else:
+            totals = [0, 0, 0.0, 0, 0.0]
+            counts = [0] * width
+        if slot >= filled:
+            # Пропущенные интервалы получают накопленные суммы без изменений
+            carried = array("I", counts)
+            for index in range(base + filled, base + slot):
+                for column, value in zip(columns, totals):
+                    column[index] = value
+                self.latency_max[index] = 0.0
+                self.histogram[index * width:(index + 1) * width] = carried
+            self.latency_max[base + slot] = 0.0
+        index = base + slot
+        for column, value, delta in zip(columns, totals, (count, failures, latency_sum, incidents, downtime)):
+            column[index] = value + delta
+        self.latency_max[index] = max(self.latency_max[index], latency_max)
+        self.histogram[index * width:(index + 1) * width] = array("I", map(int.__add__, counts, histogram))
+        self.filled[row] = max(filled, slot + 1)
+
+    def latest(self) -> Optional[int]:
+        """
+        Начало последнего заполненного интервала по всем строкам.
+        """
+        filled = max(self.filled, default=0)
+        return self.start + (filled - 1) * self.resolution if filled else None
+
+    def summarize(self, row: int, first: int, last: int, summary: "HistorySummary", latency: bool) -> None:
+        """
+        Добавление в summary итогов строки row за интервалы [first, last).
+        """
+        filled = self.filled[row]
+        first = min(max(first, 0), filled)
+        last = min(max(last, 0), filled)
+        if first >= last:
+            return
+        base = row * self.slots
+        high = base + last - 1
+        low = base + first - 1 if first else None
+        if low is None:
+            summary.incidents += self.incidents[high]
+            summary.downtime += self.downtime[high]
+        else:
+            summary.incidents += self.incidents[high] - self.incidents[low]
+            summary.downtime += self.downtime[high] - self.downtime[low]
+        count = self.count[high] - (self.count[low] if low is not None else 0)
+        if not count:
+            return
+        failures = self.failures[high] - (self.failures[low] if low is not None else 0)
+        summary.count += count
+        summary.failures += failures
+        if not latency or count == failures:
+            return
+        width = self.width
+        upper = self.histogram[high * width:(high + 1) * width]
+        histogram = summary.latency
+        total = 0
+        if low is None:
+            for index, value in enumerate(upper):
+                if value:
+                    histogram.counts[index] += value
+                    total += value
+        else:
+            lower = self.histogram[low * width:(low + 1) * width]
+            for index, (value, previous) in enumerate(zip(upper, lower)):
+                if value != previous:
+                    histogram.counts[index] += value - previous
+                    total += value - previous
+        histogram.total += total
+        histogram.sum += self.latency_sum[high] - (self.latency_sum[low] if low is not None else 0.0)
+        summary.latency_max = max(summary.latency_max, max(self.latency_max[base + first:base + last]))
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self.latency_sum = self.downtime = self.count = self.failures = self.incidents = None
+        self.latency_max = self.histogram = self.filled = None
+        self._mmap.close()
+        self._file.close()
+
+
+class RollupSeries:
+    """
+    Ряд свёрток одного разрешения: файлы RollupSegment ({имя}-{начало отрезка}-{группа}.seg).
+
+    Время делится на отрезки по slots интервалов, цели - на группы по rows
+    строк (строка цели - её номер по модулю rows), для каждой пары отрезок/группа
+    свой файл. Файлы открываются при первом обращении, отрезки старше срока
+    хранения удаляются целиком.
+
+    Attributes:
+        directory (str): Каталог файлов
+        name (str): Имя ряда ("1m", "1h")
+        resolution (int): Длительность интервала в секундах
+        slots (int): Количество интервалов в отрезке
+        rows (int): Количество целей в группе
+        retention (float): Срок хранения в секундах
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        resolution: int,
+        slots: int,
+        rows: int = 256,
+        retention: float = 86400,
+        width: int = 1,
+        logger: Any = None
+    ) -> None:
+        self.directory = directory
+        self.name = name
+        self.resolution = int(resolution)
+        self.slots = int(slots)
+        self.rows = int(rows)
+        self.retention = float(retention)
+        self.width = int(width)
+        self.logger = logger
+        self.span = self.resolution * self.slots
+        self._files: Dict[Tuple[int, int], Optional[RollupSegment]] = {}
+
+    def _path(self, start: int, group: int) -> str:
+        return os.path.join(self.directory, f"{self.name}-{start}-{group}.seg")
+
+    def open(self) -> None:
+        """
+        Поиск существующих файлов ряда (без отображения в память) и удаление устаревших.
+        """
+        prefix = f"{self.name}-"
+        for filename in os.listdir(self.directory):
+            parts = filename[len(prefix):-4].split("-") if filename.startswith(prefix) and filename.endswith(".seg") else ()
+            if len(parts) == 2 and all(part.isdigit() for part in parts):
+                self._files[(int(parts[0]), int(parts[1]))] = None
+        self.expire()
+
+    def _segment(self, start: int, group: int, create: bool = False) -> Optional[RollupSegment]:
+        key = (start, group)
+        if key not in self._files and not create:
+            return None
+        segment = self._files.get(key)
+        if segment is None:
+            if key not in self._files:
+                # Новый отрезок: заодно удаляются устаревшие
+                self.expire()
+            path = self._path(start, group)
+            try:
+                segment = RollupSegment(path, self.resolution, self.slots, self.rows, start, self.width)
+            except (OSError, ValueError) as e:
+                if self.logger is not None:
+                    self.logger.warning(f"Файл свёрток истории пропущен: {e}")
+                if not create:
+                    self._files.pop(key, None)
+                    return None
+                if not isinstance(e, ValueError):
+                    raise
+                # Файл другого формата (например, от прошлой версии) откладывается, вместо него создаётся новый
+                os.replace(path, f"{path}.old")
+                segment = RollupSegment(path, self.resolution, self.slots, self.rows, start, self.width)
+            self._files[key] = segment
+        return segment
+
+    def add(
+        self,
+        ts: int,
+        target: int,
+        count: int,
+        failures: int,
+        latency_sum: float,
+        latency_max: float,
+        histogram: Sequence[int],
+        incidents: int = 0,
+        downtime: float = 0.0
+    ) -> None:
+        """
+        Запись итогов интервала, начинающегося в ts, для цели target.
+        """
+        start = ts // self.span * self.span
+        group, row = divmod(target, self.rows)
+        segment = self._segment(start, group, create=True)
+        segment.add(
+            row,
+            (ts - start) // self.resolution,
+            count,
+            failures,
+            latency_sum,
+            latency_max,
+            histogram,
+            incidents,
+            downtime
+        )
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Удаление отрезков, закончившихся раньше срока хранения.
+
+        Returns:
+            int: Количество удалённых файлов
+        """
+        horizon = (time.time() if now is None else now) - self.retention
+        expired = [key for key in self._files if key[0] + self.span < horizon]
+        for key in expired:
+            segment = self._files.pop(key)
+            if segment is not None:
+                segment.close()
+            with suppress(FileNotFoundError):
+                os.remove(self._path(*key))
+        return len(expired)
+
+    def oldest(self) -> Optional[int]:
+        """
+        Начало самого старого хранящегося отрезка.
+        """
+        return min((start for start, _ in self._files), default=None)
+
+    def latest(self) -> Optional[int]:
+        """
+        Начало последнего записанного интервала.
+        """
+        if not self._files:
+            return None
+        last = max(start for start, _ in self._files)
+        values = [
+            segment.latest()
+            for segment in (self._segment(start, group) for start, group in list(self._files) if start == last)
+            if segment is not None
+        ]
+        return max((value for value in values if value is not None), default=None)
+
+    def summarize(self, start: int, end: int, targets: Iterable[int], summaries: Dict[int, "HistorySummary"], latency: bool) -> None:
+        """
+        Добавление итогов целей за интервалы, начинающиеся в [start, end).
+        """
+        targets = list(targets)
+        span = self.span
+        for segment_start in range(start // span * span, end, span):
+            first = (max(start, segment_start) - segment_start) // self.resolution
+            last = (min(end, segment_start + span) - segment_start + self.resolution - 1) // self.resolution
+            for target in targets:
+                group, row = divmod(target, self.rows)
+                segment = self._segment(segment_start, group)
+                if segment is None:
+                    continue
+                summary = summaries.get(target)
+                if summary is None:
+                    summary = summaries[target] = HistorySummary()
+                segment.summarize(row, first, last, summary, latency)
+
+    def flush(self) -> None:
+        for segment in self._files.values():
+            if segment is not None:
+                segment.flush()
+
+    def close(self) -> None:
+        for segment in self._files.values():
+            if segment is not None:
+                segment.close()
+        self._files.clear()
+
+
+class HistorySummary:
+    """
+    Сводка проверок цели за период.
+
+    Attributes:
+        count (int): Количество проверок
+        failures (int): Количество неудачных проверок
+        latency (LatencyHistogram): Задержки успешных проверок в мс
+        latency_max (float): Максимальная задержка успешной проверки в мс
+        incidents (int): Количество инцидентов, закрытых за период
+        downtime (float): Суммарная длительность этих инцидентов в секундах
+    """
+
+    __slots__ = ("count", "failures", "latency", "latency_max", "incidents", "downtime")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.failures = 0
+        self.latency = history_histogram()
+        self.latency_max = 0.0
+        self.incidents = 0
+        self.downtime = 0.0
+
+    @property
+    def availability(self) -> Optional[float]:
+        """
+        Доля успешных проверок в процентах или None, если проверок не было.
+        """
+        if not self.count:
+            return None
+        return 100.0 * (self.count - self.failures) / self.count
+
+    @property
+    def mttr(self) -> Optional[float]:
+        """
+        Среднее время восстановления (MTTR) в секундах или None, если инцидентов не было.
+        """
+        if not self.incidents:
+            return None
+        return self.downtime / self.incidents
+
+    def __repr__(self) -> str:
+        return f"HistorySummary(count={self.count}, failures={self.failures}, incidents={self.incidents})"
+
+
+class _RollupBucket:
+    __slots__ = ("count", "failures", "latency_sum", "latency_max", "histogram", "incidents", "downtime")
+
+    def __init__(self, width: int) -> None:
+        self.count = 0
+        self.failures = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.histogram = [0] * width
+        self.incidents = 0
+        self.downtime = 0.0
+
+
+class _RollupLevel:
+    """
+    Накопление открытого интервала свёртки в памяти; когда время переходит
+    в следующий интервал, итоги всех целей записываются в ряд.
+    """
+
+    def __init__(self, series: RollupSeries) -> None:
+        self.series = series
+        self.resolution = series.resolution
+        self.start: Optional[int] = None
+        self.last: Optional[int] = None
+        self.buckets: Dict[int, _RollupBucket] = {}
+        self._histogram = history_histogram()
+
+    def _bucket(self, ts: float, target: int) -> _RollupBucket:
+        self.advance(ts)
+        if self.start is None:
+            start = int(ts // self.resolution) * self.resolution
+            if self.last is not None and start <= self.last:
+                # Запоздавший результат: интервал уже записан
+                start = self.last + self.resolution
+            self.start = start
+        bucket = self.buckets.get(target)
+        if bucket is None:
+            bucket = self.buckets[target] = _RollupBucket(self.series.width)
+        return bucket
+
+    def add(self, ts: float, target: int, ok: bool, latency: Optional[float]) -> None:
+        bucket = self._bucket(ts, target)
+        bucket.count += 1
+        if not ok:
+            bucket.failures += 1
+        elif latency is not None:
+            bucket.latency_sum += latency
+            if latency > bucket.latency_max:
+                bucket.latency_max = latency
+            bucket.histogram[self._histogram._index(latency)] += 1
+
+    def add_incident(self, ts: float, target: int, duration: float) -> None:
+        bucket = self._bucket(ts, target)
+        bucket.incidents += 1
+        bucket.downtime += duration
+
+    def advance(self, now: float) -> None:
+        """
+        Запись открытого интервала, если время now уже в следующем.
+        """
+        if self.start is not None and now >= self.start + self.resolution:
+            self.flush()
+
+    def flush(self) -> None:
+        for target, bucket in self.buckets.items():
+            self.series.add(
+                self.start,
+                target,
+                bucket.count,
+                bucket.failures,
+                bucket.latency_sum,
+                bucket.latency_max,
+                bucket.histogram,
+                bucket.incidents,
+                bucket.downtime
+            )
+        self.buckets.clear()
+        self.last = self.start
+        self.start = None
+
+
+class ProbeHistory:
+    """
+    Локальная история результатов проверок: сырые результаты и свёртки по минутам и часам.
+
+    Каждый результат добавляется в сырой ряд (время, цель, доступность, HTTP-статус,
+    задержка - сегменты SeriesSegment) и в открытые интервалы свёрток; закрытые
+    интервалы записываются в ряды "1m" и "1h" (RollupSegment) как накопительные
+    суммы, поэтому итог по цели за любой период - разность двух ячеек на файл
+    свёрток, а не перебор проверок. Все файлы отображаются в память, у каждого
+    ряда свой срок хранения.
+
+    Сводка за период собирается из самых крупных подходящих свёрток: целые часы -
+    из часовых, края периода - из минутных и сырых записей. Если мелкие записи
+    на краю периода уже удалены, край округляется до более крупного интервала.
+
+    Закрытые инциденты записываются в тот же сырой ряд отдельными записями
+    (ok = RAW_INCIDENT, в поле задержки - длительность инцидента в секундах)
+    и попадают в свёртки вместе с проверками, из них считаются количество
+    инцидентов и MTTR за период.
+
+    Открытые интервалы не сохраняются: при запуске они восстанавливаются из сырого ряда.
+
+    Attributes:
+        path (str): Каталог истории
+        segment_records (int): Количество записей в сегменте сырого ряда
+        group_targets (int): Количество целей в файле свёрток
+
+    Examples:
+        >>> history = ProbeHistory("components/state/history")
+        >>> history.open()
+        >>> history.record("users", ok=True, status=200, latency_ms=42.0)
+        >>> history.summarize(time.time() - 30 * 86400)["users"].availability
+        >>> history.close()
+    """
+
+    RAW_COLUMNS: Tuple[SeriesColumn, ...] = (
+        ("ts", "d", 1),
+        ("latency", "f", 1),
+        ("target", "I", 1),
+        ("status", "H", 1),
+        ("ok", "B", 1),
+    )
+    # Значение столбца ok у записи о закрытом инциденте
+    RAW_INCIDENT = 2
+    # Имя ряда, длительность интервала и количество интервалов в файле (сутки и неделя)
+    ROLLUPS = (("1m", 60, 1440), ("1h", 3600, 168))
+    DEFAULT_RETENTION = {"raw": 2 * 86400, "1m": 3 * 86400, "1h": 400 * 86400}
+
+    def __init__(
+        self,
+        path: str = "components/state/history",
+        segment_records: int = 65536,
+        group_targets: int = 256,
+        retention: Optional[Dict[str, float]] = None,
+        logger: Any = None
+    ) -> None:
+        """
+        Инициализация истории.
+
+        Args:
+            path (str): Каталог истории. По умолчанию "components/state/history".
+            segment_records (int): Количество записей в сегменте сырого ряда. По умолчанию 65536.
+            group_targets (int): Количество целей в файле свёрток. По умолчанию 256.
+            retention (Optional[Dict[str, float]]): Сроки хранения рядов в секундах {"raw", "1m", "1h"}.
+                По умолчанию 2 дня, 3 дня и 400 дней.
+            logger (Any): Логгер
+        """
+        self.path = path
+        self.segment_records = int(segment_records)
+        self.group_targets = int(group_targets)
+        self.logger = logger
+        retention = {**self.DEFAULT_RETENTION, **(retention or {})}
+        width = len(history_histogram().counts)
+        self.raw = SegmentedSeries(path, "raw", self.RAW_COLUMNS, self.segment_records, retention["raw"], logger)
+        self.rollups = [
+            _RollupLevel(RollupSeries(path, name, resolution, slots, self.group_targets, retention[name], width, logger))
+            for name, resolution, slots in self.ROLLUPS
+        ]
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+
+    @classmethod
+    def from_env(cls, env: Any, **overrides: Any) -> Optional["ProbeHistory"]:
+        """
+        Создание истории по переменным окружения HISTORY_*.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+
+        Returns:
+            Optional[ProbeHistory]: История или None, если HISTORY_ENABLED выключен
+        """
+        if not env.get("HISTORY_ENABLED", True):
+            return None
+        retention = {}
+        for name, key in (
+            ("raw", "HISTORY_RAW_RETENTION_DAYS"),
+            ("1m", "HISTORY_MINUTE_RETENTION_DAYS"),
+            ("1h", "HISTORY_HOUR_RETENTION_DAYS"),
+        ):
+            value = env.get(key)
+            if value not in (None, ""):
+                retention[name] = float(value) * 86400
+        settings = {
+            "path": str(env.get("HISTORY_PATH") or "components/state/history"),
+            "segment_records": int(env.get("HISTORY_SEGMENT_RECORDS") or 65536),
+            "retention": retention,
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    def open(self) -> None:
+        """
+        Открытие рядов, загрузка имён целей и восстановление открытых интервалов свёрток из сырого ряда.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        targets_path = os.path.join(self.path, "targets.json")
+        if os.path.exists(targets_path):
+            with open(targets_path, encoding="utf-8") as file:
+                self._ids = {name: int(target_id) for name, target_id in json.load(file).items()}
+            self._names = {target_id: name for name, target_id in self._ids.items()}
+        self.raw.open()
+        for level in self.rollups:
+            level.series.open()
+            latest = level.last = level.series.latest()
+            since = (latest + level.resolution) if latest is not None else (self.raw.oldest() or 0)
+            for ts, latency, target, _, ok in self.raw.records(since):
+                if ok == self.RAW_INCIDENT:
+                    level.add_incident(ts, target, latency)
+                else:
+                    level.add(ts, target, bool(ok), latency if ok and latency == latency else None)
+
+    def _target_id(self, name: str) -> int:
+        target_id = self._ids.get(name)
+        if target_id is None:
+            target_id = self._ids[name] = len(self._ids)
+            self._names[target_id] = name
+            path = os.path.join(self.path, "targets.json")
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(self._ids, file, ensure_ascii=False)
+            os.replace(f"{path}.tmp", path)
+        return target_id
+
+    def record(
+        self,
+        name: str,
+        ok: bool,
+        status: Optional[int] = None,
+        latency_ms: Optional[float] = None,
+        ts: Optional[float] = None
+    ) -> None:
+        """
+        Запись результата проверки цели.
+
+        Args:
+            name (str): Имя цели
+            ok (bool): Успешна ли проверка
+            status (Optional[int]): HTTP-статус (если есть)
+            latency_ms (Optional[float]): Задержка в мс
+            ts (Optional[float]): Время проверки (unix time). По умолчанию текущее.
+        """
+        ts = time.time() if ts is None else ts
+        target = self._target_id(name)
+        self.raw.append((ts, math.nan if latency_ms is None else latency_ms, target, status or 0, 1 if ok else 0))
+        for level in self.rollups:
+            level.add(ts, target, ok, latency_ms)
+
+    def record_incident(self, name: str, duration: float, ts: Optional[float] = None) -> None:
+        """
+        Запись закрытого инцидента цели.
+
+        Args:
+            name (str): Имя цели
+            duration (float): Длительность инцидента в секундах
+            ts (Optional[float]): Время закрытия (unix time). По умолчанию текущее.
+        """
+        ts = time.time() if ts is None else ts
+        target = self._target_id(name)
+        self.raw.append((ts, duration, target, 0, self.RAW_INCIDENT))
+        for level in self.rollups:
+            level.add_incident(ts, target, duration)
+
+    def targets(self) -> List[str]:
+        """
+        Имена целей, для которых есть записи.
+        """
+        return list(self._ids)
+
+    def _plan(self, start: float, end: float, level: int) -> List[Tuple[int, float, float]]:
+        # Покрытие [start, end) без пересечений: целые интервалы уровня level, края - уровнями мельче.
+        # Если мелкие записи на краю уже удалены, край расширяется до целого интервала уровня.
+        if start >= end:
+            return []
+        if level < 0:
+            return [(-1, start, end)]
+        resolution = self.rollups[level].resolution
+        finer = self.raw if level == 0 else self.rollups[level - 1].series
+        oldest = finer.oldest()
+        low = math.ceil(start / resolution) * resolution
+        high = math.floor(end / resolution) * resolution
+        if oldest is not None and start < oldest:
+            low = math.floor(start / resolution) * resolution
+        if oldest is not None and end < oldest:
+            high = math.ceil(end / resolution) * resolution
+        if low >= high:
+            return self._plan(start, end, level - 1)
+        return self._plan(start, low, level - 1) + [(level, low, high)] + self._plan(high, end, level - 1)
+
+    def summarize(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        targets: Optional[Iterable[str]] = None,
+        latency: bool = True
+    ) -> Dict[str, HistorySummary]:
+        """
+        Сводка проверок целей за период [start, end).
+
+        Args:
+            start (float): Начало периода (unix time)
+            end (Optional[float]): Конец периода (unix time). По умолчанию текущее время.
+            targets (Optional[Iterable[str]]): Имена целей (по умолчанию все)
+            latency (bool): Собирать ли задержки (без них сводка считается быстрее). По умолчанию True.
+
+        Returns:
+            Dict[str, HistorySummary]: {имя цели: сводка} для целей, у которых есть проверки или инциденты за период
+        """
+        now = time.time()
+        end = now if end is None else min(end, now)
+        for level in self.rollups:
+            level.advance(now)
+        if targets is None:
+            ids = set(self._names)
+        else:
+            ids = {self._ids[name] for name in targets if name in self._ids}
+        summaries: Dict[int, HistorySummary] = {}
+        for level, low, high in self._plan(start, end, len(self.rollups) - 1):
+            if level < 0:
+                self._scan_raw(low, high, ids, summaries, latency)
+            else:
+                self.rollups[level].series.summarize(int(low), int(high), ids, summaries, latency)
+        return {self._names[target]: summary for target, summary in summaries.items() if summary.count or summary.incidents}
+
+    def _scan_raw(self, start: float, end: float, ids, summaries: Dict[int, HistorySummary], latency: bool) -> None:
+        for segment, first, last in self.raw.ranges(start, end):
+            columns = zip(
+                segment.column("target")[first:last],
+                segment.column("ok")[first:last],
+                segment.column("latency")[first:last]
+            )
+            for target, ok, value in columns:
+                if target not in ids:
+                    continue
+                summary = summaries.get(target)
+                if summary is None:
+                    summary = summaries[target] = HistorySummary()
+                if ok == self.RAW_INCIDENT:
+                    summary.incidents += 1
+                    summary.downtime += value
+                    continue
+                summary.count += 1
+                if not ok:
+                    summary.failures += 1
+                elif latency and value == value:
+                    summary.latency.record(value)
+                    if value > summary.latency_max:
+                        summary.latency_max = value
+
+    def flush(self) -> None:
+        """
+        Сброс отображённых в память файлов на диск.
+        """
+        self.raw.flush()
+        for level in self.rollups:
+            level.series.flush()
+
+    def close(self) -> None:
+        """
+        Сброс на диск и закрытие файлов. Открытые интервалы свёрток
+        не записываются - они восстановятся из сырого ряда при следующем запуске.
+        """
+        self.flush()
+        self.raw.close()
+        for level in self.rollups:
+            level.series.close()
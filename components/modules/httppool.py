@@ -0,0 +1,137 @@
+import asyncio
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+import aiohttp
+
+
+class HttpSession:
+    """
+    Долгоживущая HTTP-сессия aiohttp с пулом соединений.
+
+    Сессия создаётся лениво при первом обращении (внутри работающего event loop)
+    и переиспользуется всё время жизни владельца, поэтому TCP-соединения и
+    TLS-сессии не устанавливаются заново на каждую проверку.
+
+    Attributes:
+        limit (int): Общее ограничение количества соединений в пуле (0 - без ограничения)
+        limit_per_host (int): Ограничение количества соединений на один хост (0 - без ограничения)
+        keepalive_timeout (float): Время жизни простаивающего keep-alive соединения в секундах
+        dns_cache_ttl (int): Время жизни записей DNS-кэша в секундах
+        timeout (float): Общий таймаут запроса по умолчанию в секундах
+
+    Examples:
+        >>> http = HttpSession(limit_per_host=4)
+        >>> session = await http.get()
+        >>> async with session.get("http://example.com") as response:
+        ...     print(response.status)
+        >>> await http.close()
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        timeout: float = 30,
+        headers: Optional[Dict[str, str]] = None,
+        trace_configs: Optional[List[aiohttp.TraceConfig]] = None
+    ) -> None:
+        """
+        Инициализация параметров пула соединений.
+
+        Args:
+            limit (int): Общее ограничение количества соединений. По умолчанию 100.
+            limit_per_host (int): Ограничение соединений на один хост. По умолчанию 10.
+            keepalive_timeout (float): Время жизни keep-alive соединения. По умолчанию 30 сек.
+            dns_cache_ttl (int): Время жизни DNS-кэша. По умолчанию 300 сек.
+            timeout (float): Общий таймаут запроса по умолчанию. По умолчанию 30 сек.
+            headers (Optional[Dict[str, str]]): Заголовки, добавляемые ко всем запросам.
+            trace_configs (Optional[List[aiohttp.TraceConfig]]): Трассировка запросов (например, замер фаз).
+        """
+        self.limit = int(limit)
+        self.limit_per_host = int(limit_per_host)
+        self.keepalive_timeout = float(keepalive_timeout)
+        self.dns_cache_ttl = int(dns_cache_ttl)
+        self.timeout = float(timeout)
+        self.headers = headers or {}
+        self.trace_configs = trace_configs or []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_env(cls, env: Any, prefix: str = "ALARM_HTTP_", **overrides: Any) -> "HttpSession":
+        """
+        Создание пула по переменным окружения с указанным префиксом.
+
+        Используются переменные {prefix}LIMIT, {prefix}LIMIT_PER_HOST,
+        {prefix}KEEPALIVE_TIMEOUT и {prefix}DNS_CACHE_TTL.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+            prefix (str): Префикс переменных окружения
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+
+        Returns:
+            HttpSession: Настроенный пул соединений
+        """
+        settings = {
+            "limit": env.get(f"{prefix}LIMIT"),
+            "limit_per_host": env.get(f"{prefix}LIMIT_PER_HOST"),
+            "keepalive_timeout": env.get(f"{prefix}KEEPALIVE_TIMEOUT"),
+            "dns_cache_ttl": env.get(f"{prefix}DNS_CACHE_TTL"),
+        }
+        settings = {key: value for key, value in settings.items() if value not in (None, "")}
+        settings.update(overrides)
+        return cls(**settings)
+
+    @property
+    def closed(self) -> bool:
+        """
+        Признак того, что сессия не создана или уже закрыта.
+        """
+        return self._session is None or self._session.closed
+
+    async def get(self) -> aiohttp.ClientSession:
+        """
+        Получение общей сессии, при необходимости создаёт её.
+
+        Returns:
+            aiohttp.ClientSession: Сессия с пулом соединений
+        """
+        if not self.closed:
+            return self._session
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    use_dns_cache=True,
+                    enable_cleanup_closed=True,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    headers=self.headers,
+                    trace_configs=self.trace_configs or None,
+                )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Закрытие сессии и всех соединений пула.
+        """
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+            # Даём SSL-транспортам корректно завершиться, чтобы не было предупреждений
+            await asyncio.sleep(0)
@@ -0,0 +1,215 @@
+import time
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+)
+
+
+class Incident:
+    """
+    Инцидент: период от срабатывания тревоги до её снятия.
+
+    Attributes:
+        id (str): Идентификатор (совпадает с alarm_id в логах)
+        key (str): Ключ цели тревоги
+        title (str): Описание цели для уведомлений
+        kind (str): Вид тревоги ('unavailable', 'silence')
+        opened_at (float): Время срабатывания тревоги (unix time)
+        closed_at (Optional[float]): Время снятия тревоги или None, пока инцидент открыт
+        failures (int): Количество неудачных проверок за время инцидента
+        error (Optional[str]): Последняя ошибка проверки
+        messages (Dict[str, int]): Отправленные уведомления {id чата: id сообщения}
+    """
+
+    __slots__ = ("id", "key", "title", "kind", "opened_at", "closed_at", "failures", "error", "messages")
+
+    def __init__(
+        self,
+        id: str,
+        key: str,
+        title: str,
+        kind: str,
+        opened_at: float,
+        closed_at: Optional[float] = None,
+        failures: int = 0,
+        error: Optional[str] = None,
+        messages: Optional[Dict[str, int]] = None
+    ) -> None:
+        self.id = id
+        self.key = key
+        self.title = title
+        self.kind = kind
+        self.opened_at = opened_at
+        self.closed_at = closed_at
+        self.failures = failures
+        self.error = error
+        self.messages = messages or {}
+
+    @property
+    def is_open(self) -> bool:
+        return self.closed_at is None
+
+    def duration(self, now: Optional[float] = None) -> float:
+        """
+        Длительность инцидента в секундах (для открытого - на момент now).
+        """
+        end = self.closed_at
+        if end is None:
+            end = time.time() if now is None else now
+        return max(0.0, end - self.opened_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Incident":
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+
+class IncidentLog:
+    """
+    Журнал инцидентов в памяти.
+
+    Открытые инциденты хранятся в словаре по ключу цели, закрытые - в
+    кольцевом буфере фиксированного размера: старые вытесняются новыми,
+    поэтому память не растёт, а учёт неудачной проверки - один поиск в словаре
+    без обращения к диску.
+
+    Attributes:
+        capacity (int): Максимальное количество закрытых инцидентов в буфере
+
+    Examples:
+        >>> incidents = IncidentLog(capacity=100)
+        >>> incident = incidents.open("api:example:1700000000", "example", "API example", "unavailable")
+        >>> incidents.record_failure("example", "timeout")
+        >>> incidents.close("example").duration()
+    """
+
+    def __init__(self, capacity: int = 100, clock: Callable[[], float] = time.time) -> None:
+        """
+        Инициализация журнала.
+
+        Args:
+            capacity (int): Максимальное количество закрытых инцидентов в буфере. По умолчанию 100.
+            clock (Callable[[], float]): Источник текущего времени. По умолчанию time.time.
+        """
+        self._clock = clock
+        self._open: Dict[str, Incident] = {}
+        self._closed: Deque[Incident] = deque(maxlen=max(1, int(capacity)))
+
+    @property
+    def capacity(self) -> int:
+        return self._closed.maxlen
+
+    def resize(self, capacity: int) -> None:
+        """
+        Изменение размера буфера с сохранением последних закрытых инцидентов.
+        """
+        capacity = max(1, int(capacity))
+        if capacity != self._closed.maxlen:
+            self._closed = deque(self._closed, maxlen=capacity)
+
+    def get(self, key: str) -> Optional[Incident]:
+        """
+        Открытый инцидент цели или None.
+        """
+        return self._open.get(key)
+
+    def active(self) -> List[Incident]:
+        """
+        Открытые инциденты.
+        """
+        return list(self._open.values())
+
+    def open(
+        self,
+        id: str,
+        key: str,
+        title: str,
+        kind: str,
+        failures: int = 0,
+        error: Optional[str] = None,
+        now: Optional[float] = None
+    ) -> Incident:
+        """
+        Открытие инцидента цели. Если инцидент уже открыт, возвращается он.
+
+        Args:
+            id (str): Идентификатор инцидента
+            key (str): Ключ цели
+            title (str): Описание цели
+            kind (str): Вид тревоги
+            failures (int): Неудачные проверки, которые привели к тревоге
+            error (Optional[str]): Последняя ошибка проверки
+            now (Optional[float]): Время открытия (по умолчанию - clock())
+
+        Returns:
+            Incident: Открытый инцидент
+        """
+        incident = self._open.get(key)
+        if incident is None:
+            incident = self._open[key] = Incident(
+                id=id,
+                key=key,
+                title=title,
+                kind=kind,
+                opened_at=self._clock() if now is None else now,
+                failures=failures,
+                error=error
+            )
+        return incident
+
+    def record_failure(self, key: str, error: Optional[str] = None) -> None:
+        """
+        Учёт неудачной проверки в открытом инциденте цели (если он есть).
+        """
+        incident = self._open.get(key)
+        if incident is not None:
+            incident.failures += 1
+            if error is not None:
+                incident.error = error
+
+    def close(self, key: str, now: Optional[float] = None) -> Optional[Incident]:
+        """
+        Закрытие инцидента цели и перенос его в буфер закрытых.
+
+        Returns:
+            Optional[Incident]: Закрытый инцидент или None, если открытого не было
+        """
+        incident = self._open.pop(key, None)
+        if incident is None:
+            return None
+        incident.closed_at = self._clock() if now is None else now
+        self._closed.append(incident)
+        return incident
+
+    def restore(self, data: Optional[Dict[str, Any]]) -> Optional[Incident]:
+        """
+        Восстановление открытого инцидента из сохранённого состояния.
+        """
+        if not data:
+            return None
+        incident = Incident.from_dict(data)
+        if not incident.is_open:
+            return None
+        self._open[incident.key] = incident
+        return incident
+
+    def recent(self, limit: int = 10) -> List[Incident]:
+        """
+        Последние инциденты, от новых к старым: сначала открытые, затем закрытые.
+        """
+        result = sorted(self._open.values(), key=lambda incident: incident.opened_at, reverse=True)
+        for incident in reversed(self._closed):
+            result.append(incident)
+            if len(result) >= limit:
+                break
+        return result[:limit]
+
+    def __len__(self) -> int:
+        return len(self._open) + len(self._closed)
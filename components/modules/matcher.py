@@ -0,0 +1,318 @@
+import re
+import json
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
+
+_MISSING = object()
+
+
+def parse_status_codes(values: Any) -> FrozenSet[int]:
+    """
+    Разбор допустимых HTTP-статусов.
+
+    Args:
+        values (Any): Статус, список статусов или строка через запятую; допускаются
+            классы ("2xx") и диапазоны ("200-299")
+
+    Returns:
+        FrozenSet[int]: Множество допустимых статусов
+
+    Raises:
+        ValueError: Если значение не распознано
+    """
+    if isinstance(values, (str, int)):
+        values = str(values).split(",")
+    codes = set()
+    for value in values:
+        item = str(value).strip().lower()
+        if not item:
+            continue
+        try:
+            if len(item) == 3 and item.endswith("xx") and item[0].isdigit():
+                start = int(item[0]) * 100
+                codes.update(range(start, start + 100))
+            elif "-" in item:
+                low, high = item.split("-", 1)
+                codes.update(range(int(low), int(high) + 1))
+            else:
+                codes.add(int(item))
+        except ValueError:
+            raise ValueError(f"некорректный HTTP-статус {value!r}") from None
+    if not codes:
+        raise ValueError("не задано ни одного HTTP-статуса")
+    return frozenset(codes)
+
+
+def parse_json_expectations(values: Any) -> Dict[str, Any]:
+    """
+    Разбор проверок JSON из строки вида "status=ok,db.connected=true".
+
+    Значение разбирается как JSON (true, 200, null), иначе сравнивается как строка.
+
+    Args:
+        values (Any): Строка или список строк "путь=значение"
+
+    Returns:
+        Dict[str, Any]: {путь: ожидаемое значение}
+
+    Raises:
+        ValueError: Если элемент не содержит '='
+    """
+    if values in (None, ""):
+        return {}
+    if isinstance(values, str):
+        values = values.split(",")
+    result = {}
+    for item in values:
+        item = str(item).strip()
+        if not item:
+            continue
+        path, separator, raw = item.partition("=")
+        if not separator or not path.strip():
+            raise ValueError(f"ожидается путь=значение, получено {item!r}")
+        raw = raw.strip()
+        try:
+            result[path.strip()] = json.loads(raw)
+        except ValueError:
+            result[path.strip()] = raw
+    return result
+
+
+def _parse_path(path: str) -> Tuple[Union[str, int], ...]:
+    parts = path.strip().lstrip("$").replace("[", ".").replace("]", "").split(".")
+    return tuple(int(part) if part.isdigit() else part for part in parts if part)
+
+
+def _resolve(document: Any, path: Tuple[Union[str, int], ...]) -> Any:
+    for part in path:
+        if isinstance(document, dict):
+            document = document.get(str(part), _MISSING)
+        elif isinstance(document, list) and isinstance(part, int) and part < len(document):
+            document = document[part]
+        else:
+            return _MISSING
+        if document is _MISSING:
+            return _MISSING
+    return document
+
+
+class ResponseMatcher:
+    """
+    Проверка ответа health-check: статус, заголовки, размер и содержимое тела.
+
+    Все проверки разбираются и компилируются один раз при создании, проверка
+    ответа только сравнивает. Тело читается потоком по CHUNK_SIZE байт и
+    перестаёт читаться, как только результат известен: подстрока или
+    регулярное выражение найдены, превышен max_body. Для проверок JSON тело
+    читается целиком (не больше max_body или BUFFER_LIMIT). Регулярное выражение
+    на каждом фрагменте ищется только в новых байтах и последних REGEX_OVERLAP
+    байтах прочитанного, поэтому совпадение длиннее REGEX_OVERLAP на стыке
+    фрагментов находится одним поиском по всему телу после его чтения. Если проверок тела
+    нет, тело не читается - небольшой остаток дочитывается, чтобы соединение
+    вернулось в пул keep-alive, большой не скачивается, а соединение закрывается.
+
+    Attributes:
+        status (FrozenSet[int]): Допустимые HTTP-статусы
+        contains (Optional[bytes]): Подстрока, которая должна быть в теле
+        regex (Optional[Pattern[bytes]]): Регулярное выражение, которое должно найтись в теле
+        json_equals (Tuple[Tuple[str, Tuple, Any], ...]): Проверки JSON (путь, разобранный путь, ожидаемое значение)
+        headers (Tuple[Tuple[str, Optional[Pattern[str]]], ...]): Заголовки и регулярные выражения их значений
+        max_body (int): Максимальный размер тела в байтах (0 - не ограничен)
+
+    Examples:
+        >>> matcher = ResponseMatcher.from_dict({"status": "2xx", "json": {"status": "ok"}})
+        >>> async with session.get(url) as response:
+        ...     error = await matcher.check(response)
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    BUFFER_LIMIT = 4 * 1024 * 1024
+    DRAIN_LIMIT = 64 * 1024
+    REGEX_OVERLAP = 4 * 1024
+    DEFAULT_STATUS = frozenset({200})
+
+    __slots__ = ("status", "contains", "regex", "json_equals", "headers", "max_body")
+
+    def __init__(
+        self,
+        status: Any = None,
+        contains: Optional[str] = None,
+        regex: Optional[str] = None,
+        json_equals: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Optional[str]]] = None,
+        max_body: int = 0
+    ) -> None:
+        """
+        Компиляция проверок ответа.
+
+        Args:
+            status (Any): Допустимые статусы (см. parse_status_codes). По умолчанию 200.
+            contains (Optional[str]): Подстрока в теле ответа
+            regex (Optional[str]): Регулярное выражение для поиска в теле ответа
+            json_equals (Optional[Dict[str, Any]]): {путь JSON: ожидаемое значение}, путь вида "data.items[0].status"
+            headers (Optional[Dict[str, Optional[str]]]): {заголовок: регулярное выражение значения или None - только наличие}
+            max_body (int): Максимальный размер тела в байтах. По умолчанию 0 (не ограничен).
+
+        Raises:
+            ValueError: Если статусы или регулярные выражения некорректны
+        """
+        self.status = self.DEFAULT_STATUS if status in (None, "", []) else parse_status_codes(status)
+        self.contains = str(contains).encode() if contains else None
+        self.regex = self._compile(str(regex).encode()) if regex else None
+        self.json_equals = tuple((path, _parse_path(path), value) for path, value in (json_equals or {}).items())
+        self.headers = tuple(
+            (name, self._compile(str(value)) if value else None)
+            for name, value in (headers or {}).items()
+        )
+        self.max_body = max(0, int(max_body or 0))
+
+    @staticmethod
+    def _compile(pattern: Union[str, bytes]) -> Pattern:
+        try:
+            return re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"некорректное регулярное выражение {pattern!r}: {e}") from None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ResponseMatcher":
+        """
+        Создание проверок из описания цели (поле "expect" файла целей).
+
+        Args:
+            data (Optional[Dict[str, Any]]): {"status", "contains", "regex", "json", "headers", "max_body"}
+
+        Returns:
+            ResponseMatcher: Скомпилированные проверки
+
+        Raises:
+            ValueError: Если описание некорректно
+        """
+        data = dict(data or {})
+        unknown = set(data) - {"status", "contains", "regex", "json", "headers", "max_body"}
+        if unknown:
+            raise ValueError(f"неизвестные проверки ответа: {', '.join(sorted(unknown))}")
+        json_equals = data.get("json")
+        if json_equals is not None and not isinstance(json_equals, dict):
+            json_equals = parse_json_expectations(json_equals)
+        return cls(
+            status=data.get("status"),
+            contains=data.get("contains"),
+            regex=data.get("regex"),
+            json_equals=json_equals,
+            headers=data.get("headers"),
+            max_body=data.get("max_body") or 0
+        )
+
+    @property
+    def reads_body(self) -> bool:
+        """
+        Нужно ли читать тело ответа для проверки.
+        """
+        return bool(self.contains or self.regex or self.json_equals or self.max_body)
+
+    def check_head(self, status: int, headers: Any) -> Optional[str]:
+        """
+        Проверка статуса, заголовков и объявленного размера тела.
+
+        Returns:
+            Optional[str]: Описание несоответствия или None
+        """
+        if status not in self.status:
+            return f"статус {status}"
+        for name, pattern in self.headers:
+            value = headers.get(name)
+            if value is None:
+                return f"нет заголовка {name}"
+            if pattern is not None and not pattern.search(value):
+                return f"заголовок {name}: {value!r} не соответствует {pattern.pattern!r}"
+        if self.max_body:
+            length = headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > self.max_body:
+                return f"тело ответа {length} байт, больше {self.max_body}"
+        return None
+
+    async def check(self, response: Any) -> Optional[str]:
+        """
+        Проверка ответа aiohttp с потоковым чтением тела.
+
+        Args:
+            response (Any): Ответ (status, headers, content)
+
+        Returns:
+            Optional[str]: Описание несоответствия или None, если ответ прошёл все проверки
+        """
+        error = self.check_head(response.status, response.headers)
+        if error is None and self.reads_body:
+            error = await self._check_body(response)
+        await self._drain(response.content)
+        return error
+
+    async def _check_body(self, response: Any) -> Optional[str]:
+        contains = self.contains
+        regex = self.regex
+        buffered = bool(regex or self.json_equals)
+        limit = self.max_body
+        length = response.headers.get("Content-Length")
+        if limit and length and length.isdigit():
+            # Объявленный размер уже проверен, дочитывать тело ради него не нужно
+            limit = 0
+        buffer = bytearray()
+        tail = b""
+        size = 0
+        scanned = 0
+        async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+            size += len(chunk)
+            if limit and size > limit:
+                return f"тело ответа больше {limit} байт"
+            if contains is not None:
+                if contains in chunk or contains in tail + chunk[:len(contains) - 1]:
+                    contains = None
+                else:
+                    tail = (tail + chunk)[-(len(contains) - 1):] if len(contains) > 1 else b""
+            if buffered:
+                buffer += chunk
+                if len(buffer) > self.BUFFER_LIMIT:
+                    return f"тело ответа больше {self.BUFFER_LIMIT} байт, проверка невозможна"
+                if regex is not None:
+                    # Повторно просматривается только перекрытие с уже проверенной частью
+                    if regex.search(buffer, max(0, scanned - self.REGEX_OVERLAP)):
+                        regex = None
+                    scanned = len(buffer)
+            if contains is None and regex is None and not self.json_equals and not limit:
+                return None
+        if contains is not None:
+            return f"в теле ответа нет {contains.decode(errors='replace')!r}"
+        if regex is not None and not regex.search(buffer):
+            return f"тело ответа не соответствует {regex.pattern.decode(errors='replace')!r}"
+        if self.json_equals:
+            return self._check_json(buffer)
+        return None
+
+    def _check_json(self, body: bytes) -> Optional[str]:
+        try:
+            document = json.loads(body)
+        except ValueError:
+            return "тело ответа не является JSON"
+        for path, parts, expected in self.json_equals:
+            actual = _resolve(document, parts)
+            if actual is _MISSING:
+                return f"в JSON нет {path}"
+            if actual != expected and str(actual) != str(expected):
+                return f"JSON {path}: ожидалось {expected!r}, получено {actual!r}"
+        return None
+
+    async def _drain(self, content: Any) -> None:
+        # Небольшой остаток дочитываем, чтобы соединение вернулось в пул keep-alive;
+        # большой не скачиваем - соединение будет закрыто при освобождении ответа
+        drained = 0
+        async for chunk in content.iter_chunked(self.CHUNK_SIZE):
+            drained += len(chunk)
+            if drained > self.DRAIN_LIMIT:
+                return
@@ -0,0 +1,444 @@
+import math
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from aiohttp import web
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Child(ABC):
+    __slots__ = ("family", "labels", "_text")
+
+    def __init__(self, family: "MetricFamily", labels: str) -> None:
+        self.family = family
+        self.labels = labels
+        self._text: Optional[str] = None
+
+    def _changed(self) -> None:
+        if self._text is not None:
+            self._text = None
+            self.family._dirty = True
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._render()
+        return self._text
+
+    @abstractmethod
+    def _render(self) -> str:
+        """
+        Строки экспозиции Prometheus для этого набора меток.
+        """
+
+
+class CounterChild(_Child):
+    """
+    Монотонно растущий счётчик с фиксированными значениями меток.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, family: "MetricFamily", labels: str) -> None:
+        super().__init__(family, labels)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        """
+        Увеличение счётчика на amount (не может быть отрицательным).
+        """
+        if amount < 0:
+            raise ValueError("Счётчик может только увеличиваться")
+        self.value += amount
+        self._changed()
+
+    def _render(self) -> str:
+        return f"{self.family.name}{self.labels} {_format_value(self.value)}\n"
+
+
+class GaugeChild(_Child):
+    """
+    Значение, которое может как расти, так и уменьшаться.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, family: "MetricFamily", labels: str) -> None:
+        super().__init__(family, labels)
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """
+        Установка значения.
+        """
+        if value != self.value:
+            self.value = value
+            self._changed()
+
+    def inc(self, amount: float = 1) -> None:
+        """
+        Увеличение значения на amount.
+        """
+        self.set(self.value + amount)
+
+    def dec(self, amount: float = 1) -> None:
+        """
+        Уменьшение значения на amount.
+        """
+        self.set(self.value - amount)
+
+    def set_to_current_time(self) -> None:
+        """
+        Установка значения в текущее время (unix timestamp).
+        """
+        self.set(time.time())
+
+    def _render(self) -> str:
+        return f"{self.family.name}{self.labels} {_format_value(self.value)}\n"
+
+
+class HistogramChild(_Child):
+    """
+    Гистограмма Prometheus с кумулятивными корзинами.
+    """
+
+    __slots__ = ("bucket_labels", "counts", "sum", "count")
+
+    def __init__(self, family: "MetricFamily", labels: str, bucket_labels: List[str]) -> None:
+        super().__init__(family, labels)
+        self.bucket_labels = bucket_labels
+        self.counts = [0] * len(family.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Запись наблюдения.
+        """
+        index = bisect_left(self.family.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+        self._changed()
+
+    def _render(self) -> str:
+        name = self.family.name
+        lines = []
+        cumulative = 0
+        for bucket_label, count in zip(self.bucket_labels, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{bucket_label} {cumulative}\n")
+        lines.append(f"{name}_bucket{self.bucket_labels[-1]} {self.count}\n")
+        lines.append(f"{name}_sum{self.labels} {_format_value(self.sum)}\n")
+        lines.append(f"{name}_count{self.labels} {self.count}\n")
+        return "".join(lines)
+
+
+class MetricFamily:
+    """
+    Семейство метрик одного имени и типа с набором меток.
+
+    Отрисовка инкрементальная: каждая серия кэширует свою текстовую
+    форму и перерисовывается только после изменения значения, а семейство
+    кэширует свой текст целиком, пока ни одна серия не изменилась.
+
+    Attributes:
+        name (str): Имя метрики
+        documentation (str): Описание метрики (HELP)
+        metric_type (str): Тип метрики (counter, gauge, histogram)
+        labelnames (Tuple[str, ...]): Имена меток
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _Child] = {}
+        self._header = f"# HELP {name} {_escape(documentation)}\n# TYPE {name} {metric_type}\n"
+        self._text: Optional[str] = None
+        self._dirty = True
+        self._function: Optional[Callable[[], Iterable[Tuple[Sequence[Any], float]]]] = None
+
+    def labels(self, *values: Any, **kwargs: Any) -> Any:
+        """
+        Получение серии с указанными значениями меток (создаётся при первом обращении).
+
+        Returns:
+            CounterChild | GaugeChild | HistogramChild: Серия метрики
+        """
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+            child = self._create_child(key)
+            self._children[key] = child
+            self._dirty = True
+        return child
+
+    def _create_child(self, key: Tuple[str, ...]) -> _Child:
+        labels = _format_labels(self.labelnames, key)
+        if self.metric_type == "counter":
+            return CounterChild(self, labels)
+        if self.metric_type == "histogram":
+            bucket_labels = [
+                _format_labels(self.labelnames, key, f'le="{_format_value(bucket)}"')
+                for bucket in self.buckets
+            ]
+            bucket_labels.append(_format_labels(self.labelnames, key, 'le="+Inf"'))
+            return HistogramChild(self, labels, bucket_labels)
+        return GaugeChild(self, labels)
+
+    def remove(self, *values: Any) -> None:
+        """
+        Удаление серии с указанными значениями меток.
+        """
+        if self._children.pop(tuple(str(value) for value in values), None) is not None:
+            self._dirty = True
+
+    def clear(self) -> None:
+        """
+        Удаление всех серий семейства.
+        """
+        self._children.clear()
+        self._dirty = True
+
+    def set_function(self, function: Callable[[], Iterable[Tuple[Sequence[Any], float]]]) -> None:
+        """
+        Вычисление значений в момент сбора метрик.
+
+        Функция возвращает пары (значения меток, значение). Такие метрики
+        не кэшируются и пересчитываются при каждом запросе.
+        """
+        self._function = function
+
+    def render(self) -> str:
+        """
+        Текстовое представление семейства в формате Prometheus.
+        """
+        if self._function is not None:
+            lines = [self._header]
+            for values, value in self._function():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}\n")
+            return "".join(lines)
+        if self._dirty or self._text is None:
+            self._text = self._header + "".join(child.text() for child in self._children.values())
+            self._dirty = False
+        return self._text
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик с отрисовкой в текстовом формате Prometheus/OpenMetrics.
+
+    Повторная регистрация метрики с тем же именем возвращает существующее
+    семейство, поэтому роутеры могут объявлять метрики независимо друг от друга.
+
+    Examples:
+        >>> registry = MetricsRegistry(prefix="tfa_")
+        >>> probes = registry.counter("probe_total", "Количество проверок", ["target"])
+        >>> probes.labels("users").inc()
+        >>> print(registry.render())
+    """
+
+    def __init__(self, prefix: str = "tfa_") -> None:
+        """
+        Инициализация реестра.
+
+        Args:
+            prefix (str): Префикс имён всех метрик. По умолчанию "tfa_".
+        """
+        self.prefix = prefix
+        self._families: Dict[str, MetricFamily] = {}
+
+    def _register(self, name: str, documentation: str, metric_type: str, labelnames: Sequence[str], **options: Any) -> MetricFamily:
+        full_name = f"{self.prefix}{name}"
+        family = self._families.get(full_name)
+        if family is None:
+            family = MetricFamily(full_name, documentation, metric_type, labelnames, **options)
+            self._families[full_name] = family
+        elif family.metric_type != metric_type or family.labelnames != tuple(labelnames):
+            raise ValueError(f"Метрика {full_name} уже зарегистрирована с другим типом или метками")
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """
+        Регистрация счётчика.
+        """
+        return self._register(name, documentation, "counter", labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """
+        Регистрация метрики-значения.
+        """
+        return self._register(name, documentation, "gauge", labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> MetricFamily:
+        """
+        Регистрация гистограммы.
+        """
+        return self._register(name, documentation, "histogram", labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[MetricFamily]:
+        """
+        Получение семейства по имени без префикса.
+        """
+        return self._families.get(f"{self.prefix}{name}")
+
+    def render(self) -> str:
+        """
+        Текстовое представление всех метрик.
+        """
+        return "".join(family.render() for family in self._families.values())
+
+
+async def measure_loop_lag(registry: MetricsRegistry, interval: float = 1.0) -> None:
+    """
+    Непрерывный замер задержки event loop.
+
+    Корутина засыпает на interval и измеряет, насколько позже запланированного
+    она проснулась. Выполняется до отмены задачи.
+
+    Args:
+        registry (MetricsRegistry): Реестр метрик
+        interval (float): Интервал замера в секундах
+    """
+    lag_gauge = registry.gauge("event_loop_lag_seconds", "Последняя измеренная задержка event loop").labels()
+    lag_histogram = registry.histogram(
+        "event_loop_lag_distribution_seconds",
+        "Распределение задержки event loop",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+    ).labels()
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - expected)
+        lag_gauge.set(lag)
+        lag_histogram.observe(lag)
+
+
+class MetricsServer:
+    """
+    Встроенный HTTP-сервер для сбора метрик Prometheus.
+
+    Работает в том же event loop, что и бот, и отдаёт метрики по пути /metrics.
+
+    Examples:
+        >>> server = MetricsServer(registry, host="0.0.0.0", port=9108)
+        >>> await server.start()
+        >>> await server.stop()
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = "0.0.0.0",
+        port: int = 9108,
+        path: str = "/metrics",
+        lag_interval: float = 1.0
+    ) -> None:
+        """
+        Инициализация сервера метрик.
+
+        Args:
+            registry (MetricsRegistry): Реестр метрик
+            host (str): Адрес для прослушивания
+            port (int): Порт для прослушивания
+            path (str): Путь для отдачи метрик
+            lag_interval (float): Интервал замера задержки event loop (0 - не замерять)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = int(port)
+        self.path = path
+        self.lag_interval = float(lag_interval)
+        self._runner: Optional[web.AppRunner] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.registry.render().encode("utf-8"), headers={"Content-Type": self.CONTENT_TYPE})
+
+    async def start(self) -> None:
+        """
+        Запуск HTTP-сервера и замера задержки event loop.
+        """
+        app = web.Application()
+        app.router.add_get(self.path, self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.lag_interval > 0:
+            self._lag_task = asyncio.create_task(measure_loop_lag(self.registry, self.lag_interval))
+
+    async def stop(self) -> None:
+        """
+        Остановка HTTP-сервера и фоновых задач.
+        """
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
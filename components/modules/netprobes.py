@@ -0,0 +1,151 @@
+import os
+import ssl
+import time
+import socket
+import asyncio
+from contextlib import suppress
+from functools import lru_cache
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlsplit
+
+from .probe import ProbeResult, ProbeTarget, ProbeTimer
+
+
+class ProbeError(Exception):
+    """
+    Проверку невозможно выполнить: в адресе цели нет хоста или порта, имя не разрешается.
+    """
+
+
+ProbeFunction = Callable[[ProbeTarget, ProbeTimer], Awaitable[ProbeResult]]
+
+PROBE_TYPES: Dict[str, ProbeFunction] = {}
+
+PROBE_DEFAULT_PORTS = {"tls": 443}
+
+
+def register_probe(kind: str) -> Callable[[ProbeFunction], ProbeFunction]:
+    """
+    Регистрация проверки для схемы URL цели (tcp://, tls://, dns:// и т.д.).
+
+    Проверка - корутина (target, timer) -> ProbeResult; при ошибке она
+    выбрасывает исключение, которое записывается в результат как ошибка.
+
+    Args:
+        kind (str): Схема URL
+
+    Examples:
+        >>> @register_probe("redis")
+        ... async def redis_probe(target, timer):
+        ...     ...
+    """
+    def decorator(func: ProbeFunction) -> ProbeFunction:
+        PROBE_TYPES[kind] = func
+        return func
+    return decorator
+
+
+def _address(target: ProbeTarget) -> Tuple[str, int]:
+    parts = urlsplit(target.url)
+    port = parts.port or PROBE_DEFAULT_PORTS.get(target.kind)
+    if not parts.hostname or not port:
+        raise ProbeError(f"в адресе {target.url} не указан хост или порт")
+    return parts.hostname, port
+
+
+async def _resolve(host: str, port: int, timer: ProbeTimer) -> List[Tuple]:
+    start = time.perf_counter()
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    timer.dns = (time.perf_counter() - start) * 1000
+    if not infos:
+        raise ProbeError(f"имя {host} не разрешается")
+    return infos
+
+
+async def _connect(target: ProbeTarget, timer: ProbeTimer, ssl_context: Optional[ssl.SSLContext] = None) -> asyncio.StreamWriter:
+    host, port = _address(target)
+    family, _, _, _, address = (await _resolve(host, port, timer))[0]
+    start = time.perf_counter()
+    _, writer = await asyncio.open_connection(
+        address[0],
+        port,
+        family=family,
+        ssl=ssl_context,
+        server_hostname=host if ssl_context is not None else None
+    )
+    timer.connect = (time.perf_counter() - start) * 1000
+    return writer
+
+
+async def _close(writer: asyncio.StreamWriter) -> None:
+    writer.close()
+    with suppress(Exception):
+        await writer.wait_closed()
+
+
+@register_probe("tcp")
+async def tcp_probe(target: ProbeTarget, timer: ProbeTimer) -> ProbeResult:
+    """
+    Проверка установки TCP-соединения (tcp://host:port) - замена ping там, где ICMP недоступен.
+    """
+    writer = await asyncio.wait_for(_connect(target, timer), target.timeout)
+    await _close(writer)
+    return timer.result(ok=True)
+
+
+@lru_cache(maxsize=32)
+def _ssl_context(ca_file: Optional[str], modified: Optional[int]) -> ssl.SSLContext:
+    # Загрузка корневых сертификатов блокирует event loop на десятки миллисекунд,
+    # поэтому контекст создаётся один раз на файл (и заново после его изменения)
+    return ssl.create_default_context(cafile=ca_file)
+
+
+def _tls_context(ca_file: Optional[str]) -> ssl.SSLContext:
+    modified = None
+    if ca_file:
+        with suppress(OSError):
+            modified = os.stat(ca_file).st_mtime_ns
+    return _ssl_context(ca_file, modified)
+
+
+@register_probe("tls")
+async def tls_probe(target: ProbeTarget, timer: ProbeTimer) -> ProbeResult:
+    """
+    Проверка TLS-рукопожатия и срока действия сертификата (tls://host[:port]).
+
+    Сертификат проверяется по системным корневым сертификатам или по target.ca_file.
+    Если до окончания срока действия меньше target.cert_min_days дней, проверка не проходит.
+    """
+    context = _tls_context(target.ca_file)
+    writer = await asyncio.wait_for(_connect(target, timer, context), target.timeout)
+    try:
+        cert = writer.get_extra_info("ssl_object").getpeercert()
+    finally:
+        await _close(writer)
+    expires_at = float(ssl.cert_time_to_seconds(cert["notAfter"]))
+    days_left = (expires_at - time.time()) / 86400
+    result = timer.result(ok=True)
+    result.cert_expires_at = expires_at
+    if target.cert_min_days and days_left < target.cert_min_days:
+        result.ok = False
+        result.error = f"сертификат истекает через {days_left:.1f} дн. (порог {target.cert_min_days:g} дн.)"
+    return result
+
+
+@register_probe("dns")
+async def dns_probe(target: ProbeTarget, timer: ProbeTimer) -> ProbeResult:
+    """
+    Проверка разрешения имени (dns://host) системным резолвером.
+    """
+    host = urlsplit(target.url).hostname
+    if not host:
+        raise ProbeError(f"в адресе {target.url} не указано имя")
+    await asyncio.wait_for(_resolve(host, 0, timer), target.timeout)
+    return timer.result(ok=True)
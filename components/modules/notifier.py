@@ -0,0 +1,381 @@
+import time
+import random
+import asyncio
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .metrics import MetricsRegistry
+from .silence import normalize_id
+
+
+class TokenBucket:
+    """
+    Token bucket с резервированием: вызывающий сразу получает время ожидания
+    своего токена, поэтому конкурентные отправители выстраиваются в очередь
+    без циклов опроса и блокировок.
+
+    Attributes:
+        rate (float): Скорость пополнения, токенов в секунду
+        capacity (float): Максимальное количество токенов (размер всплеска)
+
+    Examples:
+        >>> bucket = TokenBucket(rate=30, capacity=30)
+        >>> await asyncio.sleep(bucket.reserve())
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float = 1, clock=time.monotonic) -> None:
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """
+        Резервирование одного токена.
+
+        Args:
+            now (Optional[float]): Текущее монотонное время
+
+        Returns:
+            float: Время в секундах, через которое токен станет доступен (0 - сразу)
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def idle(self, now: float) -> bool:
+        """
+        Признак того, что корзина полностью восстановилась и её можно удалить.
+        """
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class NotificationDispatcher:
+    """
+    Рассылка уведомлений всем получателям с учётом ограничений Telegram.
+
+    Сообщения отправляются конкурентно, темп задаётся общей корзиной токенов
+    (лимит бота) и корзиной каждого чата (лимит на чат; для групп он ниже).
+    Ответ RetryAfter приостанавливает всю отправку на указанное время, после
+    чего сообщение повторяется. Одинаковые сообщения в один чат в пределах
+    dedupe_ttl отправляются один раз.
+
+    При await_bot рассылка создаётся раньше бота (мониторинг запускается, пока
+    загружается aiogram): уведомления ждут, пока бот не будет задан, а не теряются.
+
+    Attributes:
+        bot (Any): Экземпляр Bot
+        await_bot (bool): Ожидать появления бота вместо пропуска уведомлений
+        global_rate (float): Общий лимит сообщений в секунду
+        chat_rate (float): Лимит сообщений в секунду в личный чат
+        group_rate (float): Лимит сообщений в секунду в группу или канал
+        dedupe_ttl (float): Время подавления одинаковых сообщений в секундах
+        retries (int): Количество повторов при RetryAfter и сетевых ошибках
+        backoff_base (float): Базовая задержка перед повтором после сетевой ошибки в секундах
+        backoff_max (float): Максимальная задержка перед повтором после сетевой ошибки в секундах
+
+    Examples:
+        >>> notifier = NotificationDispatcher(bot)
+        >>> await notifier.send([123, 456], "⚠️ API недоступен")
+    """
+
+    MAX_BUCKETS = 10_000
+
+    def __init__(
+        self,
+        bot: Any = None,
+        global_rate: float = 25,
+        chat_rate: float = 1,
+        group_rate: float = 20 / 60,
+        dedupe_ttl: float = 60,
+        retries: int = 3,
+        backoff_base: float = 1,
+        backoff_max: float = 30,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Any = None,
+        store: Any = None,
+        await_bot: bool = False
+    ) -> None:
+        """
+        Инициализация рассылки.
+
+        Args:
+            bot (Any): Экземпляр Bot (можно задать позже)
+            global_rate (float): Общий лимит сообщений в секунду. По умолчанию 25.
+            chat_rate (float): Лимит сообщений в секунду в личный чат. По умолчанию 1.
+            group_rate (float): Лимит сообщений в секунду в группу. По умолчанию 20 в минуту.
+            dedupe_ttl (float): Время подавления одинаковых сообщений. По умолчанию 60 сек (0 - выключено).
+            retries (int): Количество повторов. По умолчанию 3.
+            backoff_base (float): Базовая задержка перед повтором после сетевой ошибки. По умолчанию 1 сек.
+            backoff_max (float): Максимальная задержка перед повтором после сетевой ошибки. По умолчанию 30 сек.
+            metrics (Optional[MetricsRegistry]): Реестр метрик
+            logger (Any): Логгер
+            store (Any): Хранилище состояния для списка известных чатов
+            await_bot (bool): Ожидать появления бота вместо пропуска уведомлений. По умолчанию False.
+        """
+        self._bot_ready = asyncio.Event()
+        self.bot = bot
+        self.await_bot = bool(await_bot)
+        self.global_rate = float(global_rate)
+        self.chat_rate = float(chat_rate)
+        self.group_rate = float(group_rate)
+        self.dedupe_ttl = float(dedupe_ttl)
+        self.retries = max(0, int(retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.logger = logger
+        self.store = store
+        self._global = TokenBucket(self.global_rate, capacity=self.global_rate)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._sent: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self._paused_until = 0.0
+        self.known_chats: Set[str] = set(store.get("notify:chats") or []) if store is not None else set()
+        metrics = metrics or MetricsRegistry()
+        self._notifications_total = metrics.counter("notifications_total", "Количество уведомлений по результату", ["result"])
+        self._retry_after_total = metrics.counter("notifications_retry_after_total", "Количество ответов RetryAfter от Telegram")
+
+    @property
+    def bot(self) -> Any:
+        return self._bot
+
+    @bot.setter
+    def bot(self, bot: Any) -> None:
+        self._bot = bot
+        if bot is None:
+            self._bot_ready.clear()
+        else:
+            self._bot_ready.set()
+
+    @property
+    def ready(self) -> bool:
+        """
+        Можно ли отправлять уведомления: бот задан или ожидается.
+        """
+        return self._bot is not None or self.await_bot
+
+    async def _wait_bot(self) -> bool:
+        if self._bot is None and self.await_bot:
+            await self._bot_ready.wait()
+        return self._bot is not None
+
+    @classmethod
+    def from_env(cls, env: Any, **overrides: Any) -> "NotificationDispatcher":
+        """
+        Создание рассылки по переменным окружения ALARM_NOTIFY_*.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+
+        Returns:
+            NotificationDispatcher: Настроенная рассылка
+        """
+        settings = {
+            "global_rate": env.get("ALARM_NOTIFY_GLOBAL_RATE"),
+            "chat_rate": env.get("ALARM_NOTIFY_CHAT_RATE"),
+            "group_rate": env.get("ALARM_NOTIFY_GROUP_RATE"),
+            "dedupe_ttl": env.get("ALARM_NOTIFY_DEDUPE_TTL"),
+            "retries": env.get("ALARM_NOTIFY_RETRIES"),
+            "backoff_base": env.get("ALARM_NOTIFY_BACKOFF_BASE"),
+            "backoff_max": env.get("ALARM_NOTIFY_BACKOFF_MAX"),
+        }
+        settings = {key: value for key, value in settings.items() if value not in (None, "")}
+        settings.update(overrides)
+        return cls(**settings)
+
+    def remember(self, chat_id: Any) -> None:
+        """
+        Запоминание чата, начавшего переписку с ботом (получатель при 'all').
+        """
+        chat_id = normalize_id(chat_id)
+        if chat_id in self.known_chats:
+            return
+        self.known_chats.add(chat_id)
+        if self.store is not None:
+            self.store.set("notify:chats", sorted(self.known_chats))
+
+    def resolve(self, recipients: Any, extra: Iterable[Any] = ()) -> List[str]:
+        """
+        Получение списка получателей по значению ALARM_USERS_ID_NOTIFICATION.
+
+        Args:
+            recipients (Any): Список id, одно значение или 'all' (все известные чаты)
+            extra (Iterable[Any]): Дополнительные получатели (например, чат запуска мониторинга)
+
+        Returns:
+            List[str]: Уникальные id чатов в исходном порядке
+        """
+        if recipients in (None, ""):
+            values = []
+        elif isinstance(recipients, list):
+            values = recipients
+        else:
+            values = [recipients]
+        result: Dict[str, None] = {}
+        for value in values:
+            value = normalize_id(value)
+            if not value:
+                continue
+            if value == "all":
+                result.update(dict.fromkeys(sorted(self.known_chats)))
+            else:
+                result[value] = None
+        for value in extra:
+            if value is not None:
+                result[normalize_id(value)] = None
+        return list(result)
+
+    def _is_duplicate(self, chat_id: str, text: str, now: float) -> bool:
+        if self.dedupe_ttl <= 0:
+            return False
+        sent = self._sent
+        while sent:
+            key, expires = next(iter(sent.items()))
+            if expires > now:
+                break
+            sent.popitem(last=False)
+        key = (chat_id, hash(text))
+        if key in sent:
+            return True
+        sent[key] = now + self.dedupe_ttl
+        return False
+
+    def _bucket(self, chat_id: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_BUCKETS:
+                self._buckets = {key: value for key, value in self._buckets.items() if not value.idle(now)}
+            rate = self.group_rate if chat_id.startswith("-") else self.chat_rate
+            bucket = self._buckets[chat_id] = TokenBucket(rate)
+        return bucket
+
+    async def _wait_turn(self, chat_id: str) -> None:
+        delay = self._bucket(chat_id, time.monotonic()).reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            await asyncio.sleep(pause)
+        delay = self._global.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Задержка перед повтором: случайное значение в [0, min(max, base * 2^attempt)].
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _deliver(self, chat_id: str, request: Callable[[], Awaitable[Any]], result: str) -> Any:
+        from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+
+        for attempt in range(self.retries + 1):
+            await self._wait_turn(chat_id)
+            try:
+                response = await request()
+                self._notifications_total.labels(result).inc()
+                return response
+            except TelegramRetryAfter as e:
+                self._retry_after_total.labels().inc()
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                if self.logger:
+                    self.logger.warning(f"Telegram ограничил отправку на {e.retry_after} сек (чат {chat_id})")
+            except TelegramForbiddenError as e:
+                if self.logger:
+                    self.logger.warning(f"Бот не может писать в чат {chat_id}: {e}")
+                break
+            except TelegramBadRequest as e:
+                if "message is not modified" in str(e):
+                    return True
+                if self.logger:
+                    self.logger.warning(f"Telegram отклонил запрос в чат {chat_id}: {e}")
+                break
+            except TelegramNetworkError as e:
+                if self.logger:
+                    self.logger.warning(f"Сетевая ошибка при отправке в чат {chat_id} (попытка {attempt + 1}): {e}")
+                if attempt < self.retries:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Ошибка при отправке уведомления в чат {chat_id}: {e}")
+                break
+        self._notifications_total.labels("failed").inc()
+        return None
+
+    async def _send_one(self, chat_id: str, text: str, **kwargs: Any) -> Any:
+        return await self._deliver(chat_id, lambda: self.bot.send_message(int(chat_id), text, **kwargs), "sent")
+
+    async def _edit_one(self, chat_id: str, message_id: int, text: str, **kwargs: Any) -> Any:
+        return await self._deliver(
+            chat_id,
+            lambda: self.bot.edit_message_text(text, chat_id=int(chat_id), message_id=int(message_id), **kwargs),
+            "edited"
+        )
+
+    async def send(self, recipients: Iterable[Any], text: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Конкурентная отправка сообщения всем получателям.
+
+        Args:
+            recipients (Iterable[Any]): id чатов
+            text (str): Текст сообщения
+            **kwargs (Any): Дополнительные параметры send_message
+
+        Returns:
+            Dict[str, Any]: {id чата: отправленное сообщение или None при ошибке}; дубликаты не включаются
+        """
+        if not await self._wait_bot():
+            if self.logger:
+                self.logger.warning(f"Бот не задан, уведомление не отправлено: {text}")
+            return {}
+        now = time.monotonic()
+        targets = []
+        for chat_id in dict.fromkeys(normalize_id(chat_id) for chat_id in recipients):
+            if self._is_duplicate(chat_id, text, now):
+                self._notifications_total.labels("deduplicated").inc()
+            else:
+                targets.append(chat_id)
+        if not targets:
+            return {}
+        results = await asyncio.gather(*(self._send_one(chat_id, text, **kwargs) for chat_id in targets))
+        for chat_id, result in zip(targets, results):
+            if result is None:
+                # Неудачная отправка не должна подавлять повтор того же уведомления
+                self._sent.pop((chat_id, hash(text)), None)
+        return dict(zip(targets, results))
+
+    async def edit(self, messages: Dict[Any, int], text: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Конкурентное изменение ранее отправленных сообщений с теми же ограничениями, что и отправка.
+
+        Args:
+            messages (Dict[Any, int]): {id чата: id сообщения}
+            text (str): Новый текст сообщения
+            **kwargs (Any): Дополнительные параметры edit_message_text
+
+        Returns:
+            Dict[str, Any]: {id чата: изменённое сообщение (или True) либо None при ошибке}
+        """
+        if not messages or not await self._wait_bot():
+            return {}
+        targets = {normalize_id(chat_id): message_id for chat_id, message_id in messages.items()}
+        results = await asyncio.gather(*(
+            self._edit_one(chat_id, message_id, text, **kwargs) for chat_id, message_id in targets.items()
+        ))
+        return dict(zip(targets, results))
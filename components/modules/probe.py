@@ -0,0 +1,620 @@
+import json
+import time
+import asyncio
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Union,
+)
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .histogram import LatencyTracker
+from .matcher import ResponseMatcher
+from .scheduler import Scheduler
+
+
+@dataclass
+class ProbeTarget:
+    """
+    Описание одной проверяемой цели (endpoint).
+
+    Тип проверки задаётся схемой URL: http:// и https:// - HTTP-запрос,
+    tcp://host:port - установка соединения, tls://host[:port] - TLS-рукопожатие
+    и срок действия сертификата, dns://host - разрешение имени.
+
+    Attributes:
+        name (str): Уникальное имя цели, используется в уведомлениях и статусе
+        url (str): URL для проверки
+        method (str): HTTP-метод запроса
+        headers (Dict[str, str]): Заголовки запроса
+        body (Optional[str]): Тело запроса (для POST/PUT/PATCH)
+        interval (float): Интервал между проверками в секундах
+        timeout (float): Таймаут одного запроса в секундах
+        alarm_timeout (Optional[float]): Время недоступности до тревоги (None - общее значение)
+        latency_threshold_ms (Optional[float]): Порог перцентиля задержки для тревоги (None - общее значение, 0 - выключено)
+        latency_percentile (Optional[float]): Перцентиль задержки, сравниваемый с порогом (None - общее значение)
+        expect (Dict[str, Any]): Описание проверок ответа (см. ResponseMatcher.from_dict)
+        cert_min_days (Optional[float]): Минимальный срок действия TLS-сертификата в днях (None или 0 - не проверяется)
+        ca_file (Optional[str]): Файл корневых сертификатов для TLS-проверки (None - системные)
+        matcher (ResponseMatcher): Скомпилированные проверки ответа
+    """
+    name: str
+    url: str
+    method: str = "GET"
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[str] = None
+    interval: float = 60
+    timeout: float = 10
+    alarm_timeout: Optional[float] = None
+    latency_threshold_ms: Optional[float] = None
+    latency_percentile: Optional[float] = None
+    expect: Dict[str, Any] = field(default_factory=dict)
+    cert_min_days: Optional[float] = None
+    ca_file: Optional[str] = None
+    matcher: Optional[ResponseMatcher] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.matcher is None:
+            self.matcher = ResponseMatcher.from_dict(self.expect)
+
+    @property
+    def kind(self) -> str:
+        """
+        Тип проверки по схеме URL ('http' для http:// и https://).
+        """
+        scheme = urlsplit(self.url).scheme.lower()
+        return "http" if scheme in ("http", "https", "") else scheme
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None) -> "ProbeTarget":
+        """
+        Создание цели из словаря (например, из JSON-файла целей).
+
+        Args:
+            data (Dict[str, Any]): Описание цели
+            defaults (Optional[Dict[str, Any]]): Значения по умолчанию для незаданных полей
+
+        Returns:
+            ProbeTarget: Описание цели
+
+        Raises:
+            ValueError: Если не указан url или проверки ответа некорректны
+        """
+        merged = dict(defaults or {})
+        merged.update({key: value for key, value in data.items() if value is not None})
+        if not merged.get("url"):
+            raise ValueError(f"У цели не указан url: {data}")
+
+        headers = merged.get("headers") or {}
+        if isinstance(headers, str):
+            headers = parse_headers(headers)
+
+        body = merged.get("body")
+        if body is not None and not isinstance(body, str):
+            body = json.dumps(body, ensure_ascii=False)
+
+        alarm_timeout = merged.get("alarm_timeout")
+        latency_threshold_ms = merged.get("latency_threshold_ms")
+        latency_percentile = merged.get("latency_percentile")
+        cert_min_days = merged.get("cert_min_days")
+        # Проверки ответа цели дополняют общие, а не заменяют их целиком
+        expect = dict((defaults or {}).get("expect") or {})
+        expect.update(data.get("expect") or {})
+        try:
+            matcher = ResponseMatcher.from_dict(expect)
+        except ValueError as e:
+            raise ValueError(f"Некорректные проверки ответа цели {merged.get('name') or merged['url']}: {e}") from None
+        return cls(
+            name=str(merged.get("name") or merged["url"]),
+            url=str(merged["url"]),
+            method=str(merged.get("method") or "GET").upper(),
+            headers=dict(headers),
+            body=body or None,
+            interval=float(merged.get("interval") or 60),
+            timeout=float(merged.get("timeout") or 10),
+            alarm_timeout=float(alarm_timeout) if alarm_timeout is not None else None,
+            latency_threshold_ms=float(latency_threshold_ms) if latency_threshold_ms is not None else None,
+            latency_percentile=float(latency_percentile) if latency_percentile is not None else None,
+            expect=expect,
+            cert_min_days=float(cert_min_days) if cert_min_days is not None else None,
+            ca_file=str(merged["ca_file"]) if merged.get("ca_file") else None,
+            matcher=matcher,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Описание цели в виде словаря (обратно совместимо с from_dict).
+        """
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__ if name != "matcher"}
+        data["headers"] = dict(self.headers)
+        data["expect"] = dict(self.expect)
+        return data
+
+
+@dataclass
+class ProbeResult:
+    """
+    Результат одной проверки цели.
+
+    Времена фаз указаны в миллисекундах. Для переиспользованного keep-alive
+    соединения dns и connect равны 0.
+
+    Attributes:
+        ok (bool): Цель доступна
+        status (Optional[int]): HTTP-статус ответа
+        dns (Optional[float]): Время разрешения имени
+        connect (Optional[float]): Время установки TCP/TLS соединения
+        ttfb (Optional[float]): Время до получения заголовков ответа
+        total (Optional[float]): Полное время проверки
+        error (Optional[str]): Описание ошибки
+        cert_expires_at (Optional[float]): Окончание срока действия TLS-сертификата (unix time)
+    """
+    ok: bool
+    status: Optional[int] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    total: Optional[float] = None
+    error: Optional[str] = None
+    cert_expires_at: Optional[float] = None
+
+    def timings(self) -> Dict[str, Optional[float]]:
+        """
+        Времена фаз проверки в виде словаря {фаза: мс}.
+        """
+        return {"dns": self.dns, "connect": self.connect, "ttfb": self.ttfb, "total": self.total}
+
+
+@dataclass
+class TargetState:
+    """
+    Состояние тревоги для одной цели.
+
+    Attributes:
+        target (ProbeTarget): Проверяемая цель
+        last_successful_check (datetime): Время последней успешной проверки
+        last_check (Optional[datetime]): Время последней проверки
+        is_available (Optional[bool]): Результат последней проверки (None - ещё не проверялась)
+        failures (int): Количество неудачных проверок подряд
+        last_result (Optional[ProbeResult]): Результат последней проверки
+        latency (LatencyTracker): Гистограммы задержек по фазам за скользящее окно
+        last_latency_alarm (Optional[datetime]): Время последней тревоги по задержке
+    """
+    target: ProbeTarget
+    last_successful_check: datetime = field(default_factory=datetime.now)
+    last_check: Optional[datetime] = None
+    is_available: Optional[bool] = None
+    failures: int = 0
+    last_result: Optional[ProbeResult] = None
+    latency: LatencyTracker = field(default_factory=LatencyTracker)
+    last_latency_alarm: Optional[datetime] = None
+
+    PERSISTENT_FIELDS = ("last_successful_check", "last_check", "last_latency_alarm")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Сохраняемая часть состояния (время в виде unix timestamp).
+        """
+        data: Dict[str, Any] = {
+            name: value.timestamp() if value is not None else None
+            for name, value in ((name, getattr(self, name)) for name in self.PERSISTENT_FIELDS)
+        }
+        data["is_available"] = self.is_available
+        data["failures"] = self.failures
+        return data
+
+    def restore(self, data: Optional[Dict[str, Any]]) -> None:
+        """
+        Восстановление сохранённой части состояния.
+        """
+        if not data:
+            return
+        for name in self.PERSISTENT_FIELDS:
+            value = data.get(name)
+            if value is not None:
+                setattr(self, name, datetime.fromtimestamp(value))
+        self.is_available = data.get("is_available")
+        self.failures = int(data.get("failures") or 0)
+
+
+def create_timing_trace_config() -> aiohttp.TraceConfig:
+    """
+    Создание TraceConfig aiohttp, замеряющего фазы запроса.
+
+    Замеры записываются в объект, переданный в запрос как trace_request_ctx
+    (см. ProbeTimer), поэтому одна конфигурация обслуживает все запросы сессии.
+
+    Returns:
+        aiohttp.TraceConfig: Конфигурация трассировки для ClientSession
+    """
+    def _timer(params_ctx) -> Optional["ProbeTimer"]:
+        timer = params_ctx.trace_request_ctx
+        return timer if isinstance(timer, ProbeTimer) else None
+
+    async def on_dns_start(session, ctx, params):
+        timer = _timer(ctx)
+        if timer:
+            timer.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        timer = _timer(ctx)
+        if timer and timer.dns_start is not None:
+            timer.dns = (time.perf_counter() - timer.dns_start) * 1000
+
+    async def on_dns_cache_hit(session, ctx, params):
+        timer = _timer(ctx)
+        if timer:
+            timer.dns = 0.0
+
+    async def on_connection_start(session, ctx, params):
+        timer = _timer(ctx)
+        if timer:
+            timer.connect_start = time.perf_counter()
+
+    async def on_connection_end(session, ctx, params):
+        timer = _timer(ctx)
+        if timer and timer.connect_start is not None:
+            # Разрешение имени выполняется внутри создания соединения
+            elapsed = (time.perf_counter() - timer.connect_start) * 1000
+            if timer.dns is None:
+                # Для IP-адреса разрешение имени не выполняется
+                timer.dns = 0.0
+            timer.connect = max(0.0, elapsed - timer.dns)
+
+    async def on_connection_reuse(session, ctx, params):
+        timer = _timer(ctx)
+        if timer:
+            timer.dns = 0.0
+            timer.connect = 0.0
+
+    async def on_request_end(session, ctx, params):
+        timer = _timer(ctx)
+        if timer:
+            timer.ttfb = (time.perf_counter() - timer.start) * 1000
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+    trace_config.on_connection_create_start.append(on_connection_start)
+    trace_config.on_connection_create_end.append(on_connection_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuse)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+class ProbeTimer:
+    """
+    Накопитель замеров фаз одного запроса, передаётся как trace_request_ctx.
+
+    Examples:
+        >>> timer = ProbeTimer()
+        >>> async with session.get(url, trace_request_ctx=timer) as response:
+        ...     await response.read()
+        >>> result = timer.result(ok=True, status=response.status)
+    """
+
+    __slots__ = ("start", "dns_start", "connect_start", "dns", "connect", "ttfb")
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.dns_start: Optional[float] = None
+        self.connect_start: Optional[float] = None
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+
+    def elapsed(self) -> float:
+        """
+        Время с начала запроса в миллисекундах.
+        """
+        return (time.perf_counter() - self.start) * 1000
+
+    def result(self, ok: bool, status: Optional[int] = None, error: Optional[str] = None) -> ProbeResult:
+        """
+        Формирование результата проверки с замерами фаз.
+        """
+        return ProbeResult(
+            ok=ok,
+            status=status,
+            dns=self.dns,
+            connect=self.connect,
+            ttfb=self.ttfb,
+            total=self.elapsed(),
+            error=error,
+        )
+
+
+def parse_headers(headers_str: str) -> Dict[str, str]:
+    """
+    Парсинг строки заголовков в словарь.
+
+    Args:
+        headers_str (str): Строка заголовков в формате key1:value1,key2:value2
+
+    Returns:
+        Dict[str, str]: Словарь заголовков
+    """
+    if not headers_str:
+        return {}
+    if isinstance(headers_str, list):
+        headers_str = ",".join(str(item) for item in headers_str)
+
+    headers = {}
+    for header in str(headers_str).split(','):
+        if ':' in header:
+            key, value = header.split(':', 1)
+            headers[key.strip()] = value.strip()
+    return headers
+
+
+def load_targets_file(path: str, defaults: Optional[Dict[str, Any]] = None) -> List[ProbeTarget]:
+    """
+    Загрузка списка целей из JSON-файла.
+
+    Файл может содержать либо список целей, либо объект вида
+    {"defaults": {...}, "targets": [...]}.
+
+    Args:
+        path (str): Путь к JSON-файлу
+        defaults (Optional[Dict[str, Any]]): Значения по умолчанию для всех целей
+
+    Returns:
+        List[ProbeTarget]: Список целей
+
+    Raises:
+        ValueError: Если файл имеет неверный формат или имена целей повторяются
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    merged_defaults = dict(defaults or {})
+    if isinstance(data, dict):
+        merged_defaults.update(data.get("defaults") or {})
+        data = data.get("targets")
+    if not isinstance(data, list):
+        raise ValueError(f"Файл целей {path} должен содержать список целей")
+
+    targets = [ProbeTarget.from_dict(item, merged_defaults) for item in data]
+    names = [target.name for target in targets]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Повторяющиеся имена целей: {', '.join(sorted(duplicates))}")
+    return targets
+
+
+def build_targets(
+    urls: Union[str, List[str], None],
+    targets_file: Optional[str] = None,
+    defaults: Optional[Dict[str, Any]] = None
+) -> List[ProbeTarget]:
+    """
+    Формирование списка целей из файла и/или списка URL.
+
+    Args:
+        urls (Union[str, List[str], None]): Один URL или список URL с общими настройками
+        targets_file (Optional[str]): Путь к JSON-файлу с описанием целей
+        defaults (Optional[Dict[str, Any]]): Общие настройки (method, headers, body, interval, timeout)
+
+    Returns:
+        List[ProbeTarget]: Список уникальных по имени целей
+    """
+    targets: Dict[str, ProbeTarget] = {}
+    if targets_file:
+        for target in load_targets_file(targets_file, defaults):
+            targets[target.name] = target
+
+    if isinstance(urls, str):
+        urls = [urls]
+    for url in urls or []:
+        url = str(url).strip()
+        if url and url not in targets:
+            targets[url] = ProbeTarget.from_dict({"url": url}, defaults)
+    return list(targets.values())
+
+
+class ConcurrencyLimiter:
+    """
+    Ограничение количества одновременных операций с изменяемым пределом.
+
+    В отличие от замены asyncio.Semaphore новым, изменение предела учитывает
+    уже выполняющиеся операции: при уменьшении новые ждут, пока выполняющихся
+    не станет меньше нового предела, при увеличении ожидающие запускаются сразу.
+
+    Attributes:
+        limit (int): Максимальное количество одновременных операций
+        active (int): Количество выполняющихся операций
+
+    Examples:
+        >>> limiter = ConcurrencyLimiter(50)
+        >>> async with limiter:
+        ...     await check()
+        >>> limiter.set_limit(20)
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, int(limit))
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def set_limit(self, limit: int) -> None:
+        """
+        Изменение предела.
+        """
+        self.limit = max(1, int(limit))
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Разрешение уже выдано - возвращаем его следующему
+                self.release()
+            else:
+                with suppress(ValueError):
+                    self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        self._wake()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class ProbeEngine:
+    """
+    Движок параллельной проверки множества целей.
+
+    Проверки запускаются общим планировщиком (Scheduler) по расписанию без
+    дрейфа, при этом количество одновременно выполняемых проверок ограничено
+    (ConcurrencyLimiter), чтобы сотни целей не открывали сотни соединений одновременно.
+
+    Attributes:
+        probe (Callable): Корутина проверки цели, возвращает ProbeResult
+        on_result (Callable): Корутина обработки результата проверки
+        concurrency (int): Максимальное количество одновременных проверок
+        scheduler (Scheduler): Планировщик проверок
+        name (str): Пространство имён задач движка в планировщике
+
+    Examples:
+        >>> engine = ProbeEngine(probe=check, on_result=handle, concurrency=50)
+        >>> await engine.run(targets)
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[ProbeTarget], Awaitable[ProbeResult]],
+        on_result: Callable[[ProbeTarget, ProbeResult], Awaitable[None]],
+        concurrency: int = 100,
+        logger: Any = None,
+        scheduler: Optional[Scheduler] = None,
+        name: str = "probe"
+    ) -> None:
+        """
+        Инициализация движка проверок.
+
+        Args:
+            probe (Callable[[ProbeTarget], Awaitable[ProbeResult]]): Корутина проверки цели
+            on_result (Callable[[ProbeTarget, ProbeResult], Awaitable[None]]): Корутина обработки результата
+            concurrency (int): Максимальное количество одновременных проверок
+            logger (Any): Логгер для записи ошибок
+            scheduler (Optional[Scheduler]): Общий планировщик (по умолчанию создаётся собственный)
+            name (str): Пространство имён задач в планировщике
+        """
+        self.probe = probe
+        self.on_result = on_result
+        self.concurrency = max(1, int(concurrency))
+        self.logger = logger
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.name = name
+        self._limiter = ConcurrencyLimiter(self.concurrency)
+        self._targets: Dict[str, ProbeTarget] = {}
+
+    def _key(self, name: str) -> str:
+        return f"{self.name}:{name}"
+
+    async def run(self, targets: List[ProbeTarget]) -> None:
+        """
+        Запуск проверки всех целей. Выполняется до отмены задачи,
+        при отмене цели снимаются с расписания.
+
+        Args:
+            targets (List[ProbeTarget]): Список целей
+        """
+        for target in targets:
+            self.add(target)
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            for name in list(self._targets):
+                self.remove(name)
+
+    def add(self, target: ProbeTarget, delay: Optional[float] = None) -> None:
+        """
+        Добавление (или замена) цели в расписании.
+
+        Args:
+            target (ProbeTarget): Цель
+            delay (Optional[float]): Задержка первой проверки (None - со случайным смещением)
+        """
+        self._targets[target.name] = target
+        self.scheduler.add(self._key(target.name), target.interval, lambda: self._tick(target), delay=delay)
+
+    def update(self, target: ProbeTarget) -> None:
+        """
+        Замена определения цели. При неизменном интервале фаза расписания сохраняется.
+
+        Args:
+            target (ProbeTarget): Новое определение цели
+        """
+        if target.name not in self._targets:
+            self.add(target)
+            return
+        self._targets[target.name] = target
+        self.scheduler.update(self._key(target.name), target.interval, lambda: self._tick(target))
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """
+        Изменение ограничения параллельности с учётом уже выполняющихся проверок.
+        """
+        self.concurrency = max(1, int(concurrency))
+        self._limiter.set_limit(self.concurrency)
+
+    def remove(self, name: str) -> None:
+        """
+        Удаление цели из расписания.
+        """
+        self._targets.pop(name, None)
+        self.scheduler.remove(self._key(name))
+
+    async def check(self, target: ProbeTarget) -> ProbeResult:
+        """
+        Однократная проверка цели с учётом ограничения параллельности.
+
+        Args:
+            target (ProbeTarget): Проверяемая цель
+
+        Returns:
+            ProbeResult: Результат проверки
+        """
+        async with self._limiter:
+            return await self.probe(target)
+
+    async def _tick(self, target: ProbeTarget) -> None:
+        try:
+            result = await self.check(target)
+            await self.on_result(target, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Ошибка при проверке цели {target.name}: {e}")
@@ -0,0 +1,278 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+from functools import wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+
+class FunctionStats:
+    """
+    Накопленное время одной функции за период между сбросами.
+
+    Attributes:
+        calls (int): Количество вызовов (для корутин в выборке - возобновлений)
+        total (float): Суммарное время в секундах
+        max (float): Максимальное время одного вызова в секундах
+    """
+
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+
+def _code_name(code: Any) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Выборочный профилировщик с низкими накладными расходами.
+
+    Для каждого вызова обёрнутой функции замеряется только время выполнения
+    (два вызова perf_counter). Для доли вызовов sample_rate дополнительно
+    включается хук вызовов и возвратов - sys.monitoring на Python 3.12+ или
+    sys.setprofile на более ранних версиях - и записывается время вложенных
+    функций. Хук не читает локальные переменные и не обходит стек, поэтому
+    его можно держать включённым в продакшене. Для корутин время выборки -
+    время выполнения на потоке event loop между возобновлением и приостановкой.
+
+    Таблица времени по функциям пишется в лог раз в flush_interval секунд
+    и обнуляется.
+
+    Attributes:
+        sample_rate (float): Доля вызовов с записью вложенных функций (0 - только время выполнения)
+        flush_interval (float): Интервал записи таблицы в лог в секундах
+        top (int): Количество строк таблицы
+        wall (Dict[str, FunctionStats]): Время выполнения обёрнутых функций
+        sampled (Dict[str, FunctionStats]): Время функций из выборки
+
+    Examples:
+        >>> profiler = SamplingProfiler(sample_rate=0.01, flush_interval=300, logger=logger)
+        >>> @profiler.wrap
+        ... async def check():
+        ...     ...
+    """
+
+    MONITORING_EVENTS = ("PY_START", "PY_RESUME", "PY_RETURN", "PY_YIELD", "PY_UNWIND")
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        flush_interval: float = 300,
+        top: int = 20,
+        logger: Any = None
+    ) -> None:
+        """
+        Инициализация профилировщика.
+
+        Args:
+            sample_rate (float): Доля вызовов с записью вложенных функций. По умолчанию 0.01.
+            flush_interval (float): Интервал записи таблицы в лог в секундах (0 - только по flush()). По умолчанию 300.
+            top (int): Количество строк таблицы. По умолчанию 20.
+            logger (Any): Логгер для записи таблицы
+        """
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self.flush_interval = float(flush_interval)
+        self.top = max(1, int(top))
+        self.logger = logger
+        self.wall: Dict[str, FunctionStats] = {}
+        self.sampled: Dict[str, FunctionStats] = {}
+        self._targets: Set[Any] = set()
+        self._stack: List[Tuple[Any, float]] = []
+        self._active = 0
+        self._thread: Optional[int] = None
+        self._backend: Optional[str] = None
+        self._started = time.monotonic()
+        self._next_flush = self._started + self.flush_interval if self.flush_interval > 0 else float("inf")
+
+    def wrap(self, func: Callable, sample_rate: Optional[float] = None) -> Callable:
+        """
+        Обёртка функции или корутины для профилирования.
+
+        Args:
+            func (Callable): Функция или асинхронная функция
+            sample_rate (Optional[float]): Доля вызовов в выборке (по умолчанию - общая)
+
+        Returns:
+            Callable: Обёрнутая функция
+        """
+        rate = self.sample_rate if sample_rate is None else min(1.0, max(0.0, float(sample_rate)))
+        code = getattr(func, "__code__", None) or getattr(getattr(func, "__func__", None), "__code__", None)
+        if code is not None:
+            self._targets.add(code)
+        name = _code_name(code) if code is not None else getattr(func, "__qualname__", repr(func))
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                sampled = rate > 0 and random.random() < rate and self._start_sample()
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._finish(name, start, sampled)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            sampled = rate > 0 and random.random() < rate and self._start_sample()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._finish(name, start, sampled)
+        return wrapper
+
+    def _finish(self, name: str, start: float, sampled: bool) -> None:
+        elapsed = time.perf_counter() - start
+        stats = self.wall.get(name)
+        if stats is None:
+            stats = self.wall[name] = FunctionStats()
+        stats.add(elapsed)
+        if sampled:
+            self._stop_sample()
+        if time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def _start_sample(self) -> bool:
+        thread = threading.get_ident()
+        if self._active:
+            if thread != self._thread:
+                return False
+        elif not self._install():
+            return False
+        else:
+            self._thread = thread
+        self._active += 1
+        return True
+
+    def _stop_sample(self) -> None:
+        self._active -= 1
+        if not self._active:
+            self._uninstall()
+            self._stack.clear()
+
+    def _install(self) -> bool:
+        monitoring = getattr(sys, "monitoring", None)
+        if monitoring is not None:
+            tool = monitoring.PROFILER_ID
+            try:
+                monitoring.use_tool_id(tool, "alarm-profiler")
+            except ValueError:
+                pass
+            else:
+                events = monitoring.events
+                for event in ("PY_START", "PY_RESUME"):
+                    monitoring.register_callback(tool, getattr(events, event), self._on_start)
+                for event in ("PY_RETURN", "PY_YIELD", "PY_UNWIND"):
+                    monitoring.register_callback(tool, getattr(events, event), self._on_return)
+                mask = 0
+                for event in self.MONITORING_EVENTS:
+                    mask |= getattr(events, event)
+                monitoring.set_events(tool, mask)
+                self._backend = "monitoring"
+                return True
+        if sys.getprofile() is not None:
+            # Уже работает другой профилировщик - записываем только время выполнения
+            return False
+        sys.setprofile(self._on_profile)
+        self._backend = "setprofile"
+        return True
+
+    def _uninstall(self) -> None:
+        if self._backend == "monitoring":
+            monitoring = sys.monitoring
+            tool = monitoring.PROFILER_ID
+            monitoring.set_events(tool, 0)
+            for event in self.MONITORING_EVENTS:
+                monitoring.register_callback(tool, getattr(monitoring.events, event), None)
+            monitoring.free_tool_id(tool)
+        elif self._backend == "setprofile" and sys.getprofile() == self._on_profile:
+            sys.setprofile(None)
+        self._backend = None
+
+    def _enter(self, code: Any) -> None:
+        # Записываются только функции, вызванные (прямо или косвенно) из обёрнутых
+        if self._stack or code in self._targets:
+            self._stack.append((code, time.perf_counter()))
+
+    def _leave(self, code: Any) -> None:
+        stack = self._stack
+        if not stack:
+            return
+        entered, start = stack.pop()
+        if entered is not code:
+            # Хук включён посреди стека - события не сопоставляются, начинаем заново
+            stack.clear()
+            return
+        name = _code_name(code)
+        stats = self.sampled.get(name)
+        if stats is None:
+            stats = self.sampled[name] = FunctionStats()
+        stats.add(time.perf_counter() - start)
+
+    def _on_profile(self, frame: Any, event: str, arg: Any) -> None:
+        if event == "call":
+            self._enter(frame.f_code)
+        elif event == "return":
+            self._leave(frame.f_code)
+
+    def _on_start(self, code: Any, offset: int) -> None:
+        if threading.get_ident() == self._thread:
+            self._enter(code)
+
+    def _on_return(self, code: Any, offset: int, value: Any) -> None:
+        if threading.get_ident() == self._thread:
+            self._leave(code)
+
+    def _format_table(self, title: str, table: Dict[str, FunctionStats]) -> List[str]:
+        lines = [title]
+        for name, stats in sorted(table.items(), key=lambda item: item[1].total, reverse=True)[:self.top]:
+            lines.append(
+                f"  {name}: вызовов {stats.calls}, всего {stats.total * 1000:.1f} мс, "
+                f"среднее {stats.total / stats.calls * 1000:.2f} мс, максимум {stats.max * 1000:.2f} мс"
+            )
+        return lines
+
+    def report(self) -> str:
+        """
+        Текстовая таблица времени по функциям за текущий период.
+        """
+        period = time.monotonic() - self._started
+        lines = self._format_table(f"Профиль за {period:.0f} сек, время выполнения:", self.wall)
+        if self.sampled:
+            lines += self._format_table(f"Время на потоке по выборке {self.sample_rate:.2%} вызовов:", self.sampled)
+        return "\n".join(lines)
+
+    def flush(self) -> None:
+        """
+        Запись таблицы в лог и начало нового периода.
+        """
+        if self.wall and self.logger:
+            self.logger.info(self.report())
+        self.wall = {}
+        self.sampled = {}
+        self._started = time.monotonic()
+        if self.flush_interval > 0:
+            self._next_flush = self._started + self.flush_interval
@@ -0,0 +1,237 @@
+import heapq
+import random
+import asyncio
+from itertools import count
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .histogram import LatencyHistogram
+
+
+class ScheduledJob:
+    """
+    Периодическая задача планировщика.
+
+    Attributes:
+        key (str): Уникальный ключ задачи
+        interval (float): Период запуска в секундах
+        callback (Callable[[], Awaitable[Any]]): Запускаемая корутина
+        deadline (float): Следующее время запуска по монотонным часам event loop
+        runs (int): Количество запусков
+        skipped (int): Количество пропущенных запусков (предыдущий ещё выполнялся)
+    """
+
+    __slots__ = ("key", "interval", "callback", "deadline", "task", "cancelled", "runs", "skipped")
+
+    def __init__(self, key: str, interval: float, callback: Callable[[], Awaitable[Any]], deadline: float) -> None:
+        self.key = key
+        self.interval = float(interval)
+        self.callback = callback
+        self.deadline = deadline
+        self.task: Optional[asyncio.Task] = None
+        self.cancelled = False
+        self.runs = 0
+        self.skipped = 0
+
+
+class Scheduler:
+    """
+    Центральный планировщик периодических задач на куче дедлайнов.
+
+    Все задачи обслуживаются одной фоновой задачей asyncio. Следующий дедлайн
+    отсчитывается от предыдущего дедлайна, а не от момента завершения проверки,
+    поэтому расписание не дрейфует. Первые запуски разносятся случайным
+    смещением внутри интервала, чтобы сотни целей не проверялись одновременно.
+    Добавление и перепланирование стоят O(log n), удаление - O(1) (ленивое).
+
+    Attributes:
+        start_jitter (float): Доля интервала для случайного смещения первого запуска (0 - без смещения)
+        lateness (LatencyHistogram): Гистограмма опоздания запусков относительно дедлайна (мс)
+
+    Examples:
+        >>> scheduler = Scheduler()
+        >>> scheduler.add("api:users", 10, check_users)
+        >>> scheduler.remove("api:users")
+        >>> await scheduler.close()
+    """
+
+    def __init__(self, start_jitter: float = 1.0) -> None:
+        """
+        Инициализация планировщика.
+
+        Args:
+            start_jitter (float): Доля интервала для смещения первого запуска. По умолчанию 1.0.
+        """
+        self.start_jitter = max(0.0, float(start_jitter))
+        self.lateness = LatencyHistogram(min_value=0.01, max_value=60_000)
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._heap: List[Tuple[float, int, ScheduledJob]] = []
+        self._sequence = count()
+        self._runner: Optional[asyncio.Task] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._logger: Any = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._jobs
+
+    def set_logger(self, logger: Any) -> None:
+        """
+        Установка логгера для ошибок задач.
+        """
+        self._logger = logger
+
+    def _push(self, job: ScheduledJob) -> None:
+        heapq.heappush(self._heap, (job.deadline, next(self._sequence), job))
+        if self._heap[0][2] is job:
+            self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _ensure_running(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    def add(
+        self,
+        key: str,
+        interval: float,
+        callback: Callable[[], Awaitable[Any]],
+        delay: Optional[float] = None
+    ) -> ScheduledJob:
+        """
+        Добавление (или замена) периодической задачи.
+
+        Args:
+            key (str): Уникальный ключ задачи
+            interval (float): Период запуска в секундах
+            callback (Callable[[], Awaitable[Any]]): Запускаемая корутина
+            delay (Optional[float]): Задержка первого запуска (None - случайная в пределах start_jitter × interval)
+
+        Returns:
+            ScheduledJob: Добавленная задача
+        """
+        if interval <= 0:
+            raise ValueError(f"Интервал задачи {key} должен быть положительным")
+        self.remove(key)
+        loop = asyncio.get_running_loop()
+        if delay is None:
+            delay = random.uniform(0, interval * self.start_jitter) if self.start_jitter else 0.0
+        job = ScheduledJob(key, interval, callback, loop.time() + delay)
+        self._jobs[key] = job
+        self._push(job)
+        self._ensure_running()
+        return job
+
+    def update(self, key: str, interval: Optional[float] = None, callback: Optional[Callable[[], Awaitable[Any]]] = None) -> Optional[ScheduledJob]:
+        """
+        Изменение интервала и/или корутины задачи без сброса фазы расписания.
+
+        Args:
+            key (str): Ключ задачи
+            interval (Optional[float]): Новый интервал
+            callback (Optional[Callable[[], Awaitable[Any]]]): Новая корутина
+
+        Returns:
+            Optional[ScheduledJob]: Задача или None, если её нет
+        """
+        job = self._jobs.get(key)
+        if job is None:
+            return None
+        if callback is not None:
+            job.callback = callback
+        if interval is not None and float(interval) != job.interval:
+            previous = job.deadline - job.interval
+            job.interval = float(interval)
+            job.deadline = max(asyncio.get_running_loop().time(), previous + job.interval)
+            self._push(job)
+        return job
+
+    def remove(self, key: str) -> bool:
+        """
+        Удаление задачи. Уже запущенное выполнение не прерывается.
+
+        Returns:
+            bool: True если задача была
+        """
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return False
+        job.cancelled = True
+        return True
+
+    def get(self, key: str) -> Optional[ScheduledJob]:
+        """
+        Получение задачи по ключу.
+        """
+        return self._jobs.get(key)
+
+    def _fire(self, job: ScheduledJob, now: float) -> None:
+        self.lateness.record((now - job.deadline) * 1000)
+        if job.task is not None and not job.task.done():
+            job.skipped += 1
+            return
+        job.runs += 1
+        job.task = asyncio.get_running_loop().create_task(self._execute(job))
+
+    async def _execute(self, job: ScheduledJob) -> None:
+        try:
+            await job.callback()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self._logger:
+                self._logger.error(f"Ошибка в задаче планировщика {job.key}: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        heap = self._heap
+        while True:
+            now = loop.time()
+            while heap and heap[0][0] <= now:
+                deadline, _, job = heapq.heappop(heap)
+                if job.cancelled or job.deadline != deadline:
+                    continue
+                self._fire(job, now)
+                next_deadline = deadline + job.interval
+                if next_deadline <= now:
+                    # Пропускаем периоды, которые уже прошли, сохраняя фазу расписания
+                    next_deadline += ((now - next_deadline) // job.interval + 1) * job.interval
+                job.deadline = next_deadline
+                heapq.heappush(heap, (next_deadline, next(self._sequence), job))
+
+            self._waiter = loop.create_future()
+            handle = loop.call_at(heap[0][0], self._wake) if heap else None
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                if handle is not None:
+                    handle.cancel()
+
+    async def close(self) -> None:
+        """
+        Остановка планировщика и всех выполняющихся задач.
+        """
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for key in list(self._jobs):
+            self.remove(key)
+        self._heap.clear()
+        if self._runner is not None:
+            tasks.append(self._runner)
+            self._runner = None
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,338 @@
+import time
+import heapq
+from itertools import count
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+
+ANY_AUTHOR = "*"
+
+
+def normalize_id(value: Any) -> str:
+    """
+    Приведение идентификатора чата или пользователя к строке.
+
+    EnvReader превращает отрицательные id каналов (-100...) во float,
+    поэтому целые float приводятся к int перед преобразованием в строку.
+
+    Args:
+        value (Any): Идентификатор (int, float или str)
+
+    Returns:
+        str: Идентификатор в виде строки
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class SilenceEntry:
+    """
+    Отслеживаемая пара (чат, автор).
+
+    Attributes:
+        chat_id (str): Идентификатор чата
+        author_id (str): Идентификатор автора или ANY_AUTHOR для любого автора
+        timeout (float): Допустимое время тишины в секундах
+        last_seen (float): Время последнего сообщения (unix time)
+        last_alarm (Optional[float]): Время последней тревоги (unix time)
+        alarms (int): Количество тревог с последнего сообщения
+        title (Optional[str]): Название чата для уведомлений
+    """
+
+    __slots__ = ("chat_id", "author_id", "timeout", "last_seen", "last_alarm", "alarms", "title")
+
+    def __init__(self, chat_id: str, author_id: str, timeout: float, last_seen: float) -> None:
+        self.chat_id = chat_id
+        self.author_id = author_id
+        self.timeout = float(timeout)
+        self.last_seen = last_seen
+        self.last_alarm: Optional[float] = None
+        self.alarms = 0
+        self.title: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """
+        Ключ записи вида "chat_id:author_id".
+        """
+        return f"{self.chat_id}:{self.author_id}"
+
+    @property
+    def deadline(self) -> float:
+        """
+        Момент, после которого тишина считается тревогой (повторная тревога - через timeout после предыдущей).
+        """
+        start = self.last_seen if self.last_alarm is None else max(self.last_seen, self.last_alarm)
+        return start + self.timeout
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Сериализация состояния для сохранения.
+        """
+        return {
+            "last_seen": self.last_seen,
+            "last_alarm": self.last_alarm,
+            "alarms": self.alarms,
+            "title": self.title,
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """
+        Восстановление сохранённого состояния.
+        """
+        if data.get("last_seen"):
+            self.last_seen = float(data["last_seen"])
+        self.last_alarm = data.get("last_alarm")
+        self.alarms = int(data.get("alarms") or 0)
+        self.title = data.get("title") or self.title
+
+
+class SilenceTracker:
+    """
+    Индекс времени последнего сообщения по парам (чат, автор) с отдельным таймаутом у каждой.
+
+    Запись сообщения стоит O(1): обновляется только время в записи. Дедлайны
+    хранятся в min-куче по одному элементу на запись и проверяются лениво:
+    при извлечении устаревшего элемента (было новое сообщение) он возвращается
+    в кучу с актуальным дедлайном. Поэтому проверка тишины стоит
+    O(k log n) для k истёкших или устаревших записей, а не O(n).
+
+    Attributes:
+        default_timeout (float): Таймаут тишины по умолчанию в секундах
+        channels (Optional[frozenset]): Отслеживаемые чаты (None - все)
+        authors (Optional[frozenset]): Отслеживаемые авторы (None - любой автор)
+        timeouts (Dict[Tuple[str, str], float]): Индивидуальные таймауты {(чат, автор): секунды}
+
+    Examples:
+        >>> tracker = SilenceTracker(300, channels=["-100123"], authors=None)
+        >>> tracker.touch("-100123", "42")
+        >>> for entry in tracker.expired():
+        ...     print(entry.chat_id, entry.timeout)
+    """
+
+    def __init__(
+        self,
+        default_timeout: float,
+        channels: Optional[Iterable[Any]] = None,
+        authors: Optional[Iterable[Any]] = None,
+        timeouts: Optional[Dict[Tuple[str, str], float]] = None,
+        clock=time.time
+    ) -> None:
+        """
+        Инициализация индекса.
+
+        Args:
+            default_timeout (float): Таймаут тишины по умолчанию в секундах
+            channels (Optional[Iterable[Any]]): Отслеживаемые чаты (None - все чаты, записи создаются по первому сообщению)
+            authors (Optional[Iterable[Any]]): Отслеживаемые авторы (None - сообщения любого автора)
+            timeouts (Optional[Dict[Tuple[str, str], float]]): Индивидуальные таймауты, автор ANY_AUTHOR - для всего чата
+            clock (Callable[[], float]): Источник времени (unix time)
+        """
+        self.default_timeout = float(default_timeout)
+        self.channels = frozenset(normalize_id(c) for c in channels) if channels is not None else None
+        self.authors = frozenset(normalize_id(a) for a in authors) if authors is not None else None
+        self.timeouts = dict(timeouts or {})
+        self._clock = clock
+        self._entries: Dict[Tuple[str, str], SilenceEntry] = {}
+        self._heap: List[Tuple[float, int, SilenceEntry]] = []
+        self._sequence = count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[SilenceEntry]:
+        """
+        Список всех отслеживаемых записей.
+        """
+        return list(self._entries.values())
+
+    def get(self, chat_id: Any, author_id: Any = ANY_AUTHOR) -> Optional[SilenceEntry]:
+        """
+        Получение записи по чату и автору.
+        """
+        return self._entries.get((normalize_id(chat_id), normalize_id(author_id)))
+
+    def timeout_for(self, chat_id: str, author_id: str) -> float:
+        """
+        Таймаут для пары: сначала (чат, автор), затем (чат, любой автор), затем таймаут по умолчанию.
+        """
+        timeout = self.timeouts.get((chat_id, author_id))
+        if timeout is None:
+            timeout = self.timeouts.get((chat_id, ANY_AUTHOR), self.default_timeout)
+        return timeout
+
+    def _add(self, chat_id: str, author_id: str, last_seen: float) -> SilenceEntry:
+        entry = SilenceEntry(chat_id, author_id, self.timeout_for(chat_id, author_id), last_seen)
+        self._entries[(chat_id, author_id)] = entry
+        heapq.heappush(self._heap, (entry.deadline, next(self._sequence), entry))
+        return entry
+
+    def watch_configured(self, now: Optional[float] = None) -> int:
+        """
+        Создание записей для всех явно заданных чатов (и авторов), чтобы
+        тревога сработала даже если в чат не пришло ни одного сообщения.
+
+        Returns:
+            int: Количество добавленных записей
+        """
+        if self.channels is None:
+            return 0
+        now = self._clock() if now is None else now
+        authors = self.authors if self.authors is not None else (ANY_AUTHOR,)
+        added = 0
+        for chat_id in self.channels:
+            for author_id in authors:
+                if (chat_id, author_id) not in self._entries:
+                    self._add(chat_id, author_id, now)
+                    added += 1
+        return added
+
+    def touch(self, chat_id: Any, author_id: Any = None, timestamp: Optional[float] = None, title: Optional[str] = None) -> Optional[SilenceEntry]:
+        """
+        Учёт нового сообщения.
+
+        Args:
+            chat_id (Any): Идентификатор чата
+            author_id (Any): Идентификатор автора (None - неизвестен)
+            timestamp (Optional[float]): Время сообщения (по умолчанию - текущее)
+            title (Optional[str]): Название чата
+
+        Returns:
+            Optional[SilenceEntry]: Обновлённая запись или None, если сообщение не отслеживается
+        """
+        chat_id = normalize_id(chat_id)
+        if self.channels is not None and chat_id not in self.channels:
+            return None
+        if self.authors is None:
+            author_id = ANY_AUTHOR
+        else:
+            author_id = normalize_id(author_id) if author_id is not None else None
+            if author_id not in self.authors:
+                return None
+        timestamp = self._clock() if timestamp is None else timestamp
+        entry = self._entries.get((chat_id, author_id))
+        if entry is None:
+            entry = self._add(chat_id, author_id, timestamp)
+        elif timestamp > entry.last_seen:
+            entry.last_seen = timestamp
+        entry.alarms = 0
+        if title:
+            entry.title = title
+        return entry
+
+    def expired(self, now: Optional[float] = None) -> List[SilenceEntry]:
+        """
+        Извлечение записей, у которых истёк таймаут тишины. Для каждой
+        возвращённой записи отмечается тревога и ставится следующий дедлайн.
+
+        Args:
+            now (Optional[float]): Текущее время (по умолчанию - clock())
+
+        Returns:
+            List[SilenceEntry]: Записи с истёкшим таймаутом
+        """
+        now = self._clock() if now is None else now
+        heap = self._heap
+        result = []
+        stale = []
+        while heap and heap[0][0] <= now:
+            _, _, entry = heapq.heappop(heap)
+            if self._entries.get((entry.chat_id, entry.author_id)) is not entry:
+                continue
+            deadline = entry.deadline
+            if deadline > now:
+                # Было новое сообщение - возвращаем с актуальным дедлайном после цикла
+                stale.append(entry)
+                continue
+            entry.last_alarm = now
+            entry.alarms += 1
+            result.append(entry)
+            stale.append(entry)
+        for entry in stale:
+            heapq.heappush(heap, (entry.deadline, next(self._sequence), entry))
+        return result
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Ближайший возможный дедлайн (может быть раньше фактического из-за ленивого обновления).
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def most_silent(self, limit: int = 5) -> List[SilenceEntry]:
+        """
+        Записи с самым давним последним сообщением.
+        """
+        return heapq.nsmallest(limit, self._entries.values(), key=lambda entry: entry.last_seen)
+
+    def restore(self, saved: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Восстановление записей из сохранённого состояния {"chat_id:author_id": состояние}.
+        Записи чатов и авторов, которые больше не отслеживаются, пропускаются.
+
+        Returns:
+            int: Количество восстановленных записей
+        """
+        restored = 0
+        for key, data in saved.items():
+            chat_id, _, author_id = key.rpartition(":")
+            if not chat_id or not data:
+                continue
+            if self.channels is not None and chat_id not in self.channels:
+                continue
+            if (self.authors is None) != (author_id == ANY_AUTHOR):
+                continue
+            if self.authors is not None and author_id not in self.authors:
+                continue
+            entry = self._entries.get((chat_id, author_id))
+            if entry is None:
+                entry = self._add(chat_id, author_id, float(data.get("last_seen") or self._clock()))
+                entry.restore(data)
+            else:
+                # Дедлайн мог стать раньше, чем элемент кучи - добавляем актуальный
+                entry.restore(data)
+                heapq.heappush(self._heap, (entry.deadline, next(self._sequence), entry))
+            restored += 1
+        return restored
+
+
+def parse_timeouts(values: Any) -> Dict[Tuple[str, str], float]:
+    """
+    Разбор индивидуальных таймаутов из переменной окружения.
+
+    Формат элементов: "chat_id:секунды" или "chat_id:author_id:секунды".
+
+    Args:
+        values (Any): Строка или список строк
+
+    Returns:
+        Dict[Tuple[str, str], float]: {(чат, автор): таймаут}
+
+    Raises:
+        ValueError: Если элемент имеет неверный формат
+
+    Examples:
+        >>> parse_timeouts(["-100123:600", "-100456:42:60"])
+        {('-100123', '*'): 600.0, ('-100456', '42'): 60.0}
+    """
+    if values in (None, ""):
+        return {}
+    if not isinstance(values, list):
+        values = [values]
+    result = {}
+    for value in values:
+        parts = normalize_id(value).split(":")
+        if len(parts) == 2:
+            chat_id, author_id, seconds = parts[0], ANY_AUTHOR, parts[1]
+        elif len(parts) == 3:
+            chat_id, author_id, seconds = parts
+        else:
+            raise ValueError(f"Неверный формат таймаута канала: {value}")
+        result[(chat_id.strip(), author_id.strip())] = float(seconds)
+    return result
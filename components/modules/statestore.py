@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+
+
+class StateStore:
+    """
+    Локальное хранилище состояния мониторов на SQLite в режиме WAL.
+
+    Хранит определения целей, их состояние (время последней успешной проверки,
+    состояние тревоги) и произвольные ключи (активность мониторов, чат уведомлений).
+    Чтение выполняется из памяти, изменения накапливаются в буфере и
+    записываются одной транзакцией в отдельном потоке записи, поэтому частые
+    обновления не блокируют event loop, а пакеты записываются строго по порядку.
+
+    Attributes:
+        path (str): Путь к файлу базы данных
+        flush_interval (float): Интервал фоновой записи изменений в секундах
+
+    Examples:
+        >>> store = StateStore("components/state/state.db")
+        >>> store.open()
+        >>> store.set("api:chat_id", 123456)
+        >>> store.save_target("api", "users", state={"last_success": 1700000000.0})
+        >>> await store.flush()
+        >>> await store.close()
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS kv ("
+        " key TEXT PRIMARY KEY,"
+        " value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS targets ("
+        " monitor TEXT NOT NULL,"
+        " name TEXT NOT NULL,"
+        " definition TEXT,"
+        " state TEXT,"
+        " updated REAL NOT NULL,"
+        " PRIMARY KEY (monitor, name))",
+    )
+
+    def __init__(self, path: str = "components/state/state.db", flush_interval: float = 5.0) -> None:
+        """
+        Инициализация хранилища.
+
+        Args:
+            path (str): Путь к файлу базы данных. По умолчанию "components/state/state.db".
+            flush_interval (float): Интервал фоновой записи изменений. По умолчанию 5 сек.
+        """
+        self.path = path
+        self.flush_interval = float(flush_interval)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._kv: Dict[str, Any] = {}
+        self._pending_kv: Dict[str, str] = {}
+        self._pending_targets: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]] = {}
+        self._pending_deletes: Set[Tuple[str, str]] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls, env: Any) -> Optional["StateStore"]:
+        """
+        Создание хранилища по переменным окружения STATE_*.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+
+        Returns:
+            Optional[StateStore]: Хранилище или None, если STATE_ENABLED выключен
+        """
+        if not env.get("STATE_ENABLED", True):
+            return None
+        return cls(
+            path=str(env.get("STATE_PATH") or "components/state/state.db"),
+            flush_interval=float(env.get("STATE_FLUSH_INTERVAL") or 5),
+        )
+
+    def open(self) -> None:
+        """
+        Открытие базы данных, создание схемы и загрузка ключей в память.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self._conn.execute(statement)
+        self._kv = {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM kv")}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-store")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Получение значения ключа.
+        """
+        return self._kv.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Установка значения ключа (записывается при следующем сбросе буфера).
+        """
+        self._kv[key] = value
+        self._pending_kv[key] = json.dumps(value, ensure_ascii=False)
+
+    def load_targets(self, monitor: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Загрузка всех сохранённых целей монитора одним запросом.
+
+        Args:
+            monitor (str): Имя монитора
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {имя цели: {"definition": ..., "state": ...}}
+        """
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT name, definition, state FROM targets WHERE monitor = ?",
+                (monitor,)
+            ).fetchall()
+        return {
+            name: {
+                "definition": json.loads(definition) if definition else None,
+                "state": json.loads(state) if state else None,
+            }
+            for name, definition, state in rows
+        }
+
+    def save_target(
+        self,
+        monitor: str,
+        name: str,
+        definition: Optional[Dict[str, Any]] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Сохранение определения и/или состояния цели (None - не менять).
+
+        Args:
+            monitor (str): Имя монитора
+            name (str): Имя цели
+            definition (Optional[Dict[str, Any]]): Определение цели
+            state (Optional[Dict[str, Any]]): Состояние цели
+        """
+        key = (monitor, name)
+        self._pending_deletes.discard(key)
+        old_definition, old_state = self._pending_targets.get(key, (None, None))
+        self._pending_targets[key] = (
+            json.dumps(definition, ensure_ascii=False) if definition is not None else old_definition,
+            json.dumps(state, ensure_ascii=False) if state is not None else old_state,
+        )
+
+    def replace_targets(
+        self,
+        monitor: str,
+        targets: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+        keep: Optional[Iterable[str]] = None,
+        existing: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Замена набора целей монитора: сохранённые цели, которых нет в наборе, удаляются.
+
+        Args:
+            monitor (str): Имя монитора
+            targets (Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]): Записываемые цели {имя: (определение, состояние)}
+            keep (Optional[Iterable[str]]): Полный набор имён целей (по умолчанию - ключи targets)
+            existing (Optional[Iterable[str]]): Уже известные сохранённые имена (чтобы не читать их из базы)
+        """
+        keep = set(targets.keys() if keep is None else keep)
+        if existing is None:
+            with self._db_lock:
+                names = {name for (name,) in self._conn.execute("SELECT name FROM targets WHERE monitor = ?", (monitor,))}
+        else:
+            names = set(existing)
+        names.update(name for (pending_monitor, name) in self._pending_targets if pending_monitor == monitor)
+        for name in names - keep:
+            self.delete_target(monitor, name)
+        for name, (definition, state) in targets.items():
+            self.save_target(monitor, name, definition=definition, state=state)
+
+    def delete_target(self, monitor: str, name: str) -> None:
+        """
+        Удаление цели монитора.
+        """
+        key = (monitor, name)
+        self._pending_targets.pop(key, None)
+        self._pending_deletes.add(key)
+
+    def _write(
+        self,
+        kv: Dict[str, str],
+        targets: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]],
+        deletes: Set[Tuple[str, str]]
+    ) -> None:
+        now = time.time()
+        with self._db_lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                if kv:
+                    conn.executemany(
+                        "INSERT INTO kv (key, value) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                        kv.items()
+                    )
+                if deletes:
+                    conn.executemany("DELETE FROM targets WHERE monitor = ? AND name = ?", deletes)
+                if targets:
+                    conn.executemany(
+                        "INSERT INTO targets (monitor, name, definition, state, updated) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(monitor, name) DO UPDATE SET "
+                        "definition = COALESCE(excluded.definition, targets.definition), "
+                        "state = COALESCE(excluded.state, targets.state), "
+                        "updated = excluded.updated",
+                        [(monitor, name, definition, state, now) for (monitor, name), (definition, state) in targets.items()]
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _take_pending(self):
+        pending = (self._pending_kv, self._pending_targets, self._pending_deletes)
+        self._pending_kv, self._pending_targets, self._pending_deletes = {}, {}, set()
+        return pending
+
+    def _restore_pending(
+        self,
+        kv: Dict[str, str],
+        targets: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]],
+        deletes: Set[Tuple[str, str]]
+    ) -> None:
+        """
+        Возврат незаписанного пакета в буфер: изменения, сделанные после его
+        извлечения, имеют приоритет (удаление цели отменяет её старую запись).
+        """
+        self._pending_kv = {**kv, **self._pending_kv}
+        merged = {key: value for key, value in targets.items() if key not in self._pending_deletes}
+        for key, (definition, state) in self._pending_targets.items():
+            old_definition, old_state = merged.get(key, (None, None))
+            merged[key] = (
+                definition if definition is not None else old_definition,
+                state if state is not None else old_state,
+            )
+        self._pending_targets = merged
+        self._pending_deletes = deletes | self._pending_deletes
+
+    def flush_sync(self) -> None:
+        """
+        Синхронная запись накопленных изменений (ожидает завершения записи).
+
+        Raises:
+            Exception: Ошибка записи; изменения остаются в буфере до следующего сброса
+        """
+        if self._conn is None:
+            return
+        kv, targets, deletes = self._take_pending()
+        if kv or targets or deletes:
+            try:
+                self._executor.submit(self._write, kv, targets, deletes).result()
+            except Exception:
+                self._restore_pending(kv, targets, deletes)
+                raise
+
+    async def flush(self) -> None:
+        """
+        Запись накопленных изменений в потоке записи.
+
+        Raises:
+            Exception: Ошибка записи; изменения остаются в буфере до следующего сброса
+        """
+        if self._conn is None:
+            return
+        kv, targets, deletes = self._take_pending()
+        if kv or targets or deletes:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._executor, self._write, kv, targets, deletes)
+            except BaseException:
+                self._restore_pending(kv, targets, deletes)
+                raise
+
+    async def _run_flusher(self, logger: Any = None) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                if logger:
+                    logger.error(f"Ошибка при сохранении состояния (повтор при следующем сбросе): {e}")
+
+    def start(self, logger: Any = None) -> None:
+        """
+        Запуск периодической фоновой записи изменений.
+        """
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run_flusher(logger))
+
+    async def close(self) -> None:
+        """
+        Остановка фоновой записи, запись оставшихся изменений и закрытие базы.
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._conn is not None:
+            await self.flush()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            with self._db_lock:
+                self._conn.close()
+            self._conn = None
@@ -0,0 +1,157 @@
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from typing import (
+    Any,
+    Optional,
+)
+
+from .metrics import MetricsRegistry
+
+
+class LoopWatchdog:
+    """
+    Обнаружение блокировок event loop с захватом стека блокирующего кода.
+
+    В event loop раз в interval выполняется короткий обратный вызов, который
+    отмечает время и замеряет задержку своего запуска. Отдельный поток раз
+    в interval сравнивает время последней отметки с текущим: если отметки
+    нет дольше threshold, значит loop занят одним обратным вызовом, и поток
+    снимает стек потока loop через sys._current_frames() - это и есть
+    блокирующий код. Стек пишется в лог один раз на блокировку, длительность
+    блокировки - в метрики после её окончания.
+
+    Пока loop не блокируется, накладные расходы - один обратный вызов
+    и одно пробуждение потока за interval.
+
+    Attributes:
+        threshold (float): Время блокировки в секундах, после которого снимается стек
+        interval (float): Интервал отметок и проверок в секундах
+        stack_limit (int): Максимальное количество кадров стека в отчёте
+        blocks (int): Количество обнаруженных блокировок
+
+    Examples:
+        >>> watchdog = LoopWatchdog(threshold=0.5, metrics=metrics, logger=logger)
+        >>> watchdog.start()
+        >>> await watchdog.stop()
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        interval: float = 0.1,
+        stack_limit: int = 30,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Any = None
+    ) -> None:
+        """
+        Инициализация сторожа.
+
+        Args:
+            threshold (float): Время блокировки в секундах, после которого снимается стек. По умолчанию 0.5.
+            interval (float): Интервал отметок и проверок в секундах. По умолчанию 0.1.
+            stack_limit (int): Максимальное количество кадров стека в отчёте. По умолчанию 30.
+            metrics (Optional[MetricsRegistry]): Реестр метрик
+            logger (Any): Логгер для отчётов о блокировках
+        """
+        self.threshold = float(threshold)
+        self.interval = min(float(interval), self.threshold / 2)
+        self.stack_limit = max(1, int(stack_limit))
+        self.logger = logger
+        self.blocks = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = 0.0
+        self._expected = 0.0
+        self._reported_beat: Optional[float] = None
+        metrics = metrics or MetricsRegistry()
+        self._blocks_total = metrics.counter("event_loop_blocks_total", "Количество блокировок event loop дольше порога").labels()
+        self._block_duration = metrics.histogram(
+            "event_loop_block_duration_seconds",
+            "Длительность блокировок event loop дольше порога",
+            buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+        ).labels()
+
+    @classmethod
+    def from_env(cls, env: Any, **overrides: Any) -> Optional["LoopWatchdog"]:
+        """
+        Создание сторожа по переменным окружения WATCHDOG_*.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+
+        Returns:
+            Optional[LoopWatchdog]: Сторож или None, если WATCHDOG_ENABLED не включён
+        """
+        if not env.get("WATCHDOG_ENABLED", False):
+            return None
+        settings = {
+            "threshold": env.get("WATCHDOG_THRESHOLD"),
+            "interval": env.get("WATCHDOG_INTERVAL"),
+            "stack_limit": env.get("WATCHDOG_STACK_LIMIT"),
+        }
+        settings = {key: value for key, value in settings.items() if value not in (None, "")}
+        settings.update(overrides)
+        return cls(**settings)
+
+    def start(self) -> None:
+        """
+        Запуск отметок в текущем event loop и потока проверки.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._last_beat = time.monotonic()
+        self._expected = self._last_beat + self.interval
+        self._handle = self._loop.call_later(self.interval, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        lag = now - self._expected
+        if lag > self.threshold:
+            self.blocks += 1
+            self._blocks_total.inc()
+            self._block_duration.observe(lag)
+            if self.logger:
+                self.logger.warning(f"Event loop был заблокирован {lag:.3f} сек", extra={"blocked_seconds": round(lag, 3)})
+        self._last_beat = now
+        self._expected = now + self.interval
+        self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            blocked = time.monotonic() - last_beat - self.interval
+            if blocked <= self.threshold or self._reported_beat == last_beat:
+                continue
+            # Отчёт один раз на блокировку: следующая начнётся с новой отметки
+            self._reported_beat = last_beat
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=self.stack_limit))
+            if self.logger:
+                self.logger.warning(
+                    f"Event loop заблокирован дольше {blocked:.3f} сек, стек блокирующего кода:\n{stack}",
+                    extra={"blocked_seconds": round(blocked, 3)}
+                )
+
+    async def stop(self) -> None:
+        """
+        Остановка отметок и потока проверки.
+        """
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
@@ -0,0 +1,185 @@
+import hmac
+import json
+import asyncio
+import secrets
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+from aiohttp import web
+
+from .metrics import MetricsRegistry
+
+
+class WebhookServer:
+    """
+    Приём обновлений Telegram через webhook на встроенном HTTP-сервере aiohttp.
+
+    Запрос проверяется по заголовку X-Telegram-Bot-Api-Secret-Token, тело
+    помещается в ограниченную очередь, и Telegram сразу получает ответ 200.
+    Обновления обрабатываются пулом воркеров через Dispatcher.feed_raw_update.
+    При переполнении очереди возвращается 503 - Telegram повторит доставку позже,
+    поэтому всплеск сообщений не расходует память без ограничений.
+
+    Attributes:
+        host (str): Адрес для прослушивания
+        port (int): Порт для прослушивания
+        path (str): Путь webhook
+        secret_token (str): Секретный токен, передаваемый Telegram в заголовке
+        queue_size (int): Максимальный размер очереди обновлений
+        workers (int): Количество воркеров обработки обновлений
+
+    Examples:
+        >>> server = WebhookServer(dp, bot, port=8443, secret_token="secret")
+        >>> await server.start()
+        >>> await bot.set_webhook("https://example.com/telegram/webhook", secret_token=server.secret_token)
+        >>> await server.stop()
+    """
+
+    SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+    def __init__(
+        self,
+        dispatcher: Any,
+        bot: Any,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        path: str = "/telegram/webhook",
+        secret_token: Optional[str] = None,
+        queue_size: int = 1000,
+        workers: int = 4,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Any = None
+    ) -> None:
+        """
+        Инициализация webhook-сервера.
+
+        Args:
+            dispatcher (Any): Dispatcher aiogram
+            bot (Any): Экземпляр Bot
+            host (str): Адрес для прослушивания. По умолчанию "0.0.0.0".
+            port (int): Порт для прослушивания. По умолчанию 8080.
+            path (str): Путь webhook. По умолчанию "/telegram/webhook".
+            secret_token (Optional[str]): Секретный токен (если не задан - генерируется случайный)
+            queue_size (int): Максимальный размер очереди обновлений. По умолчанию 1000.
+            workers (int): Количество воркеров обработки. По умолчанию 4.
+            metrics (Optional[MetricsRegistry]): Реестр метрик
+            logger (Any): Логгер для записи ошибок
+        """
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.host = host
+        self.port = int(port)
+        self.path = path
+        self.secret_token = secret_token or secrets.token_urlsafe(32)
+        self.queue_size = max(1, int(queue_size))
+        self.workers = max(1, int(workers))
+        self.logger = logger
+        self._queue: Optional[asyncio.Queue] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._init_metrics(metrics or MetricsRegistry())
+
+    @classmethod
+    def from_env(cls, env: Any, dispatcher: Any, bot: Any, **overrides: Any) -> "WebhookServer":
+        """
+        Создание сервера по переменным окружения TELEGRAM_WEBHOOK_*.
+
+        Args:
+            env (Any): Экземпляр EnvReader
+            dispatcher (Any): Dispatcher aiogram
+            bot (Any): Экземпляр Bot
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+
+        Returns:
+            WebhookServer: Настроенный сервер
+        """
+        settings = {
+            "host": env.get("TELEGRAM_WEBHOOK_HOST"),
+            "port": env.get("TELEGRAM_WEBHOOK_PORT"),
+            "path": env.get("TELEGRAM_WEBHOOK_PATH"),
+            "secret_token": env.get("TELEGRAM_WEBHOOK_SECRET"),
+            "queue_size": env.get("TELEGRAM_WEBHOOK_QUEUE_SIZE"),
+            "workers": env.get("TELEGRAM_WEBHOOK_WORKERS"),
+        }
+        settings = {key: str(value) if key == "secret_token" else value for key, value in settings.items() if value not in (None, "")}
+        settings.update(overrides)
+        return cls(dispatcher, bot, **settings)
+
+    def _init_metrics(self, metrics: MetricsRegistry) -> None:
+        self._updates_total = metrics.counter("webhook_updates_total", "Количество запросов webhook по результату", ["result"])
+        metrics.gauge("webhook_queue_size", "Количество обновлений в очереди webhook").set_function(
+            lambda: [((), self._queue.qsize() if self._queue is not None else 0)]
+        )
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        token = request.headers.get(self.SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode("utf-8"), self.secret_token.encode("utf-8")):
+            self._updates_total.labels("unauthorized").inc()
+            return web.Response(status=401)
+        try:
+            update = json.loads(await request.read())
+        except ValueError:
+            self._updates_total.labels("invalid").inc()
+            return web.Response(status=400)
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self._updates_total.labels("dropped").inc()
+            if self.logger:
+                self.logger.warning("Очередь обновлений webhook переполнена, Telegram повторит доставку")
+            return web.Response(status=503)
+        self._updates_total.labels("accepted").inc()
+        return web.Response()
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            update: Dict[str, Any] = await queue.get()
+            try:
+                await self.dispatcher.feed_raw_update(self.bot, update)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Ошибка при обработке обновления {update.get('update_id')}: {e}")
+            finally:
+                queue.task_done()
+
+    async def start(self) -> None:
+        """
+        Запуск HTTP-сервера и воркеров обработки обновлений.
+        """
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """
+        Остановка приёма запросов, обработка оставшихся обновлений и остановка воркеров.
+
+        Args:
+            drain_timeout (float): Максимальное время обработки оставшихся обновлений в секундах
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._queue is not None and self._worker_tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                if self.logger:
+                    self.logger.warning(f"Не обработано {self._queue.qsize()} обновлений webhook при остановке")
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
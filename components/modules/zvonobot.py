@@ -1,6 +1,11 @@
-import requests
+import asyncio
+import random
 from typing import Dict, Any, Optional, List
 
+import aiohttp
+
+from .httppool import HttpSession
+
 
 class ZvonoBot:
     """
@@ -19,50 +24,57 @@ class ZvonoBot:
         >>> result = zvonobot.make_call("79123456789", "Это тестовое сообщение")
     """
     
-    def __init__(self, api_key: str, base_url: str = "https://lk.zvonobot.ru") -> None:
+    def __init__(
+        self, 
+        api_key: str, 
+        base_url: str = "https://lk.zvonobot.ru",
+        connect_timeout: float = 5,
+        read_timeout: float = 15
+    ) -> None:
         """
         Инициализация клиента Звонобота.
         
         Args:
             api_key (str): API-ключ для доступа к сервису Звонобот
             base_url (str): Базовый URL API Звонобота (по умолчанию "https://lk.zvonobot.ru")
+            connect_timeout (float): Таймаут установки соединения в секундах
+            read_timeout (float): Таймаут чтения ответа в секундах
         """
         self.api_key = api_key
         self.base_url = base_url
-    
-    def make_call(
-        self, 
-        phone: str, 
-        message: str, 
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        
+    def _build_payload(
+        self,
+        recipients: Dict[str, Any],
+        message: str,
         outgoing_phone: Optional[str] = None,
         gender: int = 0,
         duty_phone: int = 0
     ) -> Dict[str, Any]:
         """
-        Совершить простой звонок с текстовым сообщением.
+        Формирование тела запроса на создание звонка.
         
         Args:
-            phone (str): Номер телефона получателя в формате 79XXXXXXXXX
-            message (str): Текстовое сообщение, которое будет преобразовано в речь
-            outgoing_phone (Optional[str]): Номер телефона, с которого будет совершен звонок
-            gender (int): Пол голоса для генерации речи (0 - женский, 1 - мужской)
+            recipients (Dict[str, Any]): {"phone": ...} или {"phones": [...]}
+            message (str): Текстовое сообщение
+            outgoing_phone (Optional[str]): Номер, с которого совершается звонок
+            gender (int): Пол голоса (0 - женский, 1 - мужской)
             duty_phone (int): Использовать дежурный номер (0 - нет, 1 - да)
             
         Returns:
-            Dict[str, Any]: Ответ от API Звонобота
+            Dict[str, Any]: Тело запроса
             
         Raises:
             ValueError: Если не указан ни outgoing_phone, ни duty_phone
-            Exception: При ошибке во время выполнения запроса
         """
         if not outgoing_phone and duty_phone != 1:
             raise ValueError("Необходимо указать либо исходящий номер (outgoing_phone), либо использовать дежурный номер (duty_phone=1)")
         
-        endpoint = f"{self.base_url}/apiCalls/create"
-        
         payload = {
             "apiKey": self.api_key,
-            "phone": phone,
+            **recipients,
             "record": {
                 "text": message,
                 "gender": gender
@@ -73,14 +85,47 @@ class ZvonoBot:
             payload["outgoingPhone"] = outgoing_phone
         else:
             payload["dutyPhone"] = duty_phone
+        return payload
         
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        import requests
+
+        endpoint = f"{self.base_url}/apiCalls/create"
         try:
-            response = requests.post(endpoint, json=payload)
+            response = requests.post(endpoint, json=payload, timeout=(self.connect_timeout, self.read_timeout))
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             raise Exception(f"Ошибка при отправке запроса к Звоноботу: {str(e)}")
     
+    def make_call(
+        self, 
+        phone: str, 
+        message: str, 
+        outgoing_phone: Optional[str] = None,
+        gender: int = 0,
+        duty_phone: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Совершить простой звонок с текстовым сообщением.
+        
+        Args:
+            phone (str): Номер телефона получателя в формате 79XXXXXXXXX
+            message (str): Текстовое сообщение, которое будет преобразовано в речь
+            outgoing_phone (Optional[str]): Номер телефона, с которого будет совершен звонок
+            gender (int): Пол голоса для генерации речи (0 - женский, 1 - мужской)
+            duty_phone (int): Использовать дежурный номер (0 - нет, 1 - да)
+            
+        Returns:
+            Dict[str, Any]: Ответ от API Звонобота
+            
+        Raises:
+            ValueError: Если не указан ни outgoing_phone, ни duty_phone
+            Exception: При ошибке во время выполнения запроса
+        """
+        payload = self._build_payload({"phone": phone}, message, outgoing_phone, gender, duty_phone)
+        return self._post(payload)
+    
     def make_bulk_call(
         self, 
         phones: List[str], 
@@ -106,28 +151,195 @@ class ZvonoBot:
             ValueError: Если не указан ни outgoing_phone, ни duty_phone
             Exception: При ошибке во время выполнения запроса
         """
-        if not outgoing_phone and duty_phone != 1:
-            raise ValueError("Необходимо указать либо исходящий номер (outgoing_phone), либо использовать дежурный номер (duty_phone=1)")
+        payload = self._build_payload({"phones": phones}, message, outgoing_phone, gender, duty_phone)
+        return self._post(payload)
+
+
+class AsyncZvonoBot(ZvonoBot):
+    """
+    Асинхронный клиент API Звонобота.
+    
+    Не блокирует event loop: запросы выполняются через общую долгоживущую
+    aiohttp-сессию с явными таймаутами на соединение и чтение. Заказ звонка
+    не идемпотентен, поэтому с экспоненциальной задержкой и случайным разбросом
+    (full jitter) повторяются только запросы, которые точно не были приняты:
+    ошибки и таймаут соединения, ответы 429 и 503. Таймаут чтения ответа,
+    разрыв соединения и остальные ошибки 5xx не повторяются - звонок мог быть
+    уже заказан, и повтор разбудил бы дежурного несколько раз.
+    
+    Attributes:
+        retries (int): Количество повторных попыток после первой неудачной
+        backoff_base (float): Базовая задержка перед повтором в секундах
+        backoff_max (float): Максимальная задержка перед повтором в секундах
+    
+    Examples:
+        >>> zvonobot = AsyncZvonoBot(api_key=env.ZVONOBOT_API_KEY)
+        >>> result = await zvonobot.make_call("79123456789", "Это тестовое сообщение")
+        >>> await zvonobot.close()
+    """
+    
+    RETRY_STATUSES = frozenset({429, 503})
+    
+    def __init__(
+        self, 
+        api_key: str, 
+        base_url: str = "https://lk.zvonobot.ru",
+        connect_timeout: float = 5,
+        read_timeout: float = 15,
+        retries: int = 3,
+        backoff_base: float = 1,
+        backoff_max: float = 30,
+        http: Optional[HttpSession] = None
+    ) -> None:
+        """
+        Инициализация асинхронного клиента Звонобота.
         
-        endpoint = f"{self.base_url}/apiCalls/create"
+        Args:
+            api_key (str): API-ключ для доступа к сервису Звонобот
+            base_url (str): Базовый URL API Звонобота
+            connect_timeout (float): Таймаут установки соединения в секундах
+            read_timeout (float): Таймаут чтения ответа в секундах
+            retries (int): Количество повторных попыток
+            backoff_base (float): Базовая задержка перед повтором в секундах
+            backoff_max (float): Максимальная задержка перед повтором в секундах
+            http (Optional[HttpSession]): Общий пул соединений (по умолчанию создаётся свой)
+        """
+        super().__init__(api_key, base_url, connect_timeout, read_timeout)
+        self.retries = max(0, int(retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.http = http or HttpSession(limit=10, limit_per_host=4)
         
-        payload = {
-            "apiKey": self.api_key,
-            "phones": phones,
-            "record": {
-                "text": message,
-                "gender": gender
-            }
+    @classmethod
+    def from_env(cls, env: Any, **overrides: Any) -> "AsyncZvonoBot":
+        """
+        Создание клиента по переменным окружения ZVONOBOT_*.
+        
+        Args:
+            env (Any): Экземпляр EnvReader
+            **overrides (Any): Явно заданные параметры, имеющие приоритет
+            
+        Returns:
+            AsyncZvonoBot: Настроенный клиент
+        """
+        settings = {
+            "api_key": env.get("ZVONOBOT_API_KEY"),
+            "base_url": env.get("ZVONOBOT_BASE_URL"),
+            "connect_timeout": env.get("ZVONOBOT_CONNECT_TIMEOUT"),
+            "read_timeout": env.get("ZVONOBOT_READ_TIMEOUT"),
+            "retries": env.get("ZVONOBOT_RETRIES"),
+            "backoff_base": env.get("ZVONOBOT_BACKOFF_BASE"),
+            "backoff_max": env.get("ZVONOBOT_BACKOFF_MAX"),
         }
+        settings = {key: value for key, value in settings.items() if value not in (None, "")}
+        settings.update(overrides)
+        settings.setdefault("api_key", "")
+        return cls(**settings)
         
-        if outgoing_phone:
-            payload["outgoingPhone"] = outgoing_phone
-        else:
-            payload["dutyPhone"] = duty_phone
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Задержка перед повтором: случайное значение в [0, min(max, base * 2^attempt)].
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
         
-        try:
-            response = requests.post(endpoint, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Ошибка при отправке запроса к Звоноботу: {str(e)}") 
\ No newline at end of file
+    @staticmethod
+    def _not_sent(error: Exception) -> bool:
+        """
+        Признак ошибки, при которой запрос не был отправлен: соединение не установлено.
+        """
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True
+        # Таймаут соединения и таймаут чтения - один тип ServerTimeoutError (ConnectionTimeoutError в aiohttp 3.10+)
+        return isinstance(error, aiohttp.ServerTimeoutError) and str(error).startswith("Connection timeout")
+        
+    async def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        endpoint = f"{self.base_url}/apiCalls/create"
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=self.connect_timeout,
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout
+        )
+        last_error: Optional[str] = None
+        
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff_delay(attempt - 1))
+            try:
+                session = await self.http.get()
+                async with session.post(endpoint, json=payload, timeout=timeout) as response:
+                    if response.status in self.RETRY_STATUSES:
+                        last_error = f"HTTP {response.status}"
+                        continue
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except aiohttp.ClientResponseError as e:
+                raise Exception(f"Ошибка при отправке запроса к Звоноботу: {str(e)}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = str(e) or type(e).__name__
+                if not self._not_sent(e):
+                    raise Exception(f"Звонобот не ответил, звонок мог быть заказан, повтор не выполняется: {last_error}")
+                
+        raise Exception(f"Ошибка при отправке запроса к Звоноботу после {self.retries + 1} попыток: {last_error}")
+    
+    async def make_call(
+        self, 
+        phone: str, 
+        message: str, 
+        outgoing_phone: Optional[str] = None,
+        gender: int = 0,
+        duty_phone: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Асинхронно совершить простой звонок с текстовым сообщением.
+        
+        Args:
+            phone (str): Номер телефона получателя в формате 79XXXXXXXXX
+            message (str): Текстовое сообщение, которое будет преобразовано в речь
+            outgoing_phone (Optional[str]): Номер телефона, с которого будет совершен звонок
+            gender (int): Пол голоса для генерации речи (0 - женский, 1 - мужской)
+            duty_phone (int): Использовать дежурный номер (0 - нет, 1 - да)
+            
+        Returns:
+            Dict[str, Any]: Ответ от API Звонобота
+            
+        Raises:
+            ValueError: Если не указан ни outgoing_phone, ни duty_phone
+            Exception: Если запрос не удался после всех повторов
+        """
+        payload = self._build_payload({"phone": phone}, message, outgoing_phone, gender, duty_phone)
+        return await self._post(payload)
+    
+    async def make_bulk_call(
+        self, 
+        phones: List[str], 
+        message: str, 
+        outgoing_phone: Optional[str] = None,
+        gender: int = 0,
+        duty_phone: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Асинхронно совершить массовый звонок с текстовым сообщением.
+        
+        Args:
+            phones (List[str]): Список номеров телефонов получателей
+            message (str): Текстовое сообщение, которое будет преобразовано в речь
+            outgoing_phone (Optional[str]): Номер телефона, с которого будет совершен звонок
+            gender (int): Пол голоса для генерации речи (0 - женский, 1 - мужской)
+            duty_phone (int): Использовать дежурный номер (0 - нет, 1 - да)
+            
+        Returns:
+            Dict[str, Any]: Ответ от API Звонобота
+            
+        Raises:
+            ValueError: Если не указан ни outgoing_phone, ни duty_phone
+            Exception: Если запрос не удался после всех повторов
+        """
+        payload = self._build_payload({"phones": phones}, message, outgoing_phone, gender, duty_phone)
+        return await self._post(payload)
+        
+    async def close(self) -> None:
+        """
+        Закрытие HTTP-сессии клиента.
+        """
+        await self.http.close()
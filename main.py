@@ -1,31 +1,65 @@
 from components.modules import (
+    AppConfig,
+    ClusterCoordinator,
     EnvReader,
-    Logger
+    Logger,
+    LoopWatchdog,
+    MetricsRegistry,
+    MetricsServer,
+    NotificationDispatcher,
+    ProbeHistory,
+    Scheduler,
+    StateStore,
+    WebhookServer
 )
 
 import asyncio
 import importlib
 import os
-import inspect
+from typing import TYPE_CHECKING
 
-from aiogram import (
-    Bot, 
-    Dispatcher
+from components.handlers.base import ROUTERS, BaseRouter
+
+if TYPE_CHECKING:
+    from aiogram import (
+        Bot,
+        Dispatcher
+    )
+
+# Модули aiogram, которые загружаются в отдельном потоке уже после запуска мониторинга:
+# их импорт занимает большую часть времени старта
+AIOGRAM_MODULES = (
+    "aiogram",
+    "aiogram.enums",
+    "aiogram.filters",
+    "aiogram.types",
+    "aiogram.client.default",
+    "aiogram.client.session.aiohttp",
+    "aiogram.client.telegram",
 )
-from aiogram.enums import ParseMode
-from aiogram.client.default import DefaultBotProperties
-from components.handlers.base import BaseRouter
 
 
 class App:
     def __init__(
         self
     ) -> None:
-        self.env: EnvReader = EnvReader()
+        self.env: EnvReader = EnvReader(env_file=os.environ.get("ENV_FILE") or None)
         self.logger: Logger = self._logger_init()
-        self.bot: Bot = None
-        self.dp: Dispatcher = None
+        self.config: AppConfig = AppConfig.from_env(self.env)
+        self.logger.context["monitor_mode"] = self.config.monitor_mode
+        self.bot: "Bot" = None
+        self.dp: "Dispatcher" = None
         self.des = None
+        self.routers: list[BaseRouter] = []
+        self.metrics: MetricsRegistry = MetricsRegistry()
+        self.metrics_server: MetricsServer = None
+        self.store: StateStore = None
+        self.scheduler: Scheduler = None
+        self.webhook_server: WebhookServer = None
+        self.notifier: NotificationDispatcher = None
+        self.watchdog: LoopWatchdog = None
+        self.cluster: ClusterCoordinator = None
+        self.history: ProbeHistory = None
         
     def _logger_init(self):
         logger_settings = {
@@ -45,69 +79,271 @@ class App:
             return
 
         # Определяем нужный монитор по ALARM_MONITOR_MODE
-        monitor_mode = str(getattr(self.env, 'ALARM_MONITOR_MODE', 'api')).lower()
+        monitor_mode = self.config.monitor_mode
         monitor_map = {
             'api': 'api_monitor.py',
             'channel': 'channel_monitor.py',
         }
         monitor_filename = monitor_map.get(monitor_mode)
-        # Сначала динамически загружаем все, кроме api_monitor и channel_monitor
-        for filename in os.listdir(full_handlers_path):
-            if filename.endswith('.py') and not filename.startswith('__') and filename not in monitor_map.values():
-                module_path = handlers_path.replace('/', '.')
-                module_name = f"{module_path}.{filename[:-3]}"
-                try:
-                    module = importlib.import_module(module_name)
-                    for name, obj in inspect.getmembers(module):
-                        if (inspect.isclass(obj) and 
-                            issubclass(obj, BaseRouter) and 
-                            obj != BaseRouter):
-                            router_instance = obj(self.env, self.logger)
-                            self.dp.include_router(router_instance.router)
-                            self.logger.info(f"Загружен роутер: {name}")
-                except Exception as e:
-                    self.logger.error(f"Ошибка при загрузке роутера {module_name}: {e}")
-        # Теперь загружаем только нужный монитор
+        # Сначала загружаем все модули, кроме api_monitor и channel_monitor, затем только нужный монитор
+        filenames = [
+            filename for filename in sorted(os.listdir(full_handlers_path))
+            if filename.endswith('.py') and not filename.startswith('__') and filename not in monitor_map.values()
+        ]
         if monitor_filename:
-            module_path = handlers_path.replace('/', '.')
-            module_name = f"{module_path}.{monitor_filename[:-3]}"
+            filenames.append(monitor_filename)
+        module_path = handlers_path.replace('/', '.')
+        for filename in filenames:
+            self._load_routers(f"{module_path}.{filename[:-3]}")
+            
+    def _load_routers(self, module_name: str):
+        """
+        Импорт модуля обработчиков и создание роутеров, объявленных в нём
+        (классы регистрируются в ROUTERS при импорте, без обхода модуля).
+        """
+        try:
+            importlib.import_module(module_name)
+            for router_class in ROUTERS.get(module_name, []):
+                router_instance = router_class(self.env, self.logger, metrics=self.metrics, bot=self.bot, store=self.store, scheduler=self.scheduler, notifier=self.notifier, config=self.config, cluster=self.cluster, history=self.history)
+                self.routers.append(router_instance)
+                self.logger.info(f"Загружен роутер: {router_class.__name__}")
+        except Exception as e:
+            self.logger.error(f"Ошибка при загрузке роутера {module_name}: {e}")
+        
+    async def _on_env_change(self, changed: set):
+        old = self.config
+        if not self.reload_config():
+            return
+        fields = old.diff(self.config) | {key for key in changed if key.startswith("file:")}
+        if not fields:
+            return
+        self.logger.info(f"Настройки перезагружены, изменено: {', '.join(sorted(fields))}")
+        for router_instance in self.routers:
             try:
-                module = importlib.import_module(module_name)
-                for name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and 
-                        issubclass(obj, BaseRouter) and 
-                        obj != BaseRouter):
-                        router_instance = obj(self.env, self.logger)
-                        self.dp.include_router(router_instance.router)
-                        self.logger.info(f"Загружен роутер: {name}")
+                await router_instance.apply_config(old, fields)
             except Exception as e:
-                self.logger.error(f"Ошибка при загрузке роутера {module_name}: {e}")
+                self.logger.error(f"Ошибка при применении настроек в роутере {type(router_instance).__name__}: {e}")
+                
+    def _start_config_watch(self):
+        interval = self.env.get("CONFIG_WATCH_INTERVAL")
+        if not self.env.env_file or not interval:
+            return
+        self.env.subscribe(self._on_env_change)
+        self.env.watch(float(interval), self.logger)
+        self.logger.info(f"Отслеживание изменений {self.env.env_file} (каждые {interval} сек)")
         
-    async def _init_bot(self):
-        if not self.env.TELEGRAM_BOT_TOKEN:
+    def reload_config(self) -> bool:
+        """
+        Пересборка снимка настроек из окружения и атомарная замена во всех роутерах.
+        При ошибке проверки остаётся предыдущий снимок.
+        """
+        try:
+            config = AppConfig.from_env(self.env)
+        except ValueError as e:
+            self.logger.error(f"Настройки не применены: {e}")
+            return False
+        self.config = config
+        for router_instance in self.routers:
+            router_instance.config = config
+        return True
+        
+    def _init_components(self):
+        if not self.env.get("TELEGRAM_BOT_TOKEN"):
             raise ValueError("TELEGRAM_BOT_TOKEN не установлен в .env")
+        self._init_scheduler()
+        self._init_store()
+        self._init_history()
+        self._init_notifier()
+        self._init_cluster()
+        self._init_routers()
+        
+    @staticmethod
+    def _import_aiogram():
+        for module_name in AIOGRAM_MODULES:
+            importlib.import_module(module_name)
+        
+    async def _init_bot(self):
+        """
+        Создание бота и Dispatcher. aiogram импортируется в отдельном потоке,
+        пока мониторинг уже работает; уведомления до этого момента ждут бота.
+        """
+        await asyncio.to_thread(self._import_aiogram)
+        from aiogram import Bot, Dispatcher
+        from aiogram.enums import ParseMode
+        from aiogram.client.default import DefaultBotProperties
+        from aiogram.client.session.aiohttp import AiohttpSession
+        from aiogram.client.telegram import TelegramAPIServer
+        
+        session = None
+        api_server = self.env.get("TELEGRAM_API_SERVER")
+        if api_server:
+            session = AiohttpSession(api=TelegramAPIServer.from_base(str(api_server)))
             
         self.bot = Bot(
             token=self.env.TELEGRAM_BOT_TOKEN,
+            session=session,
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
         self.dp = Dispatcher()
-        self._init_routers()
+        for router_instance in self.routers:
+            try:
+                router_instance.bot = self.bot
+                router_instance.attach(self.dp)
+            except Exception as e:
+                self.logger.error(f"Ошибка при подключении роутера {type(router_instance).__name__}: {e}")
+        self.notifier.bot = self.bot
+        
+    def _init_scheduler(self):
+        start_jitter = self.env.get("ALARM_SCHEDULER_JITTER")
+        self.scheduler = Scheduler(start_jitter=1.0 if start_jitter in (None, "") else float(start_jitter))
+        self.scheduler.set_logger(self.logger)
+        
+    def _init_notifier(self):
+        self.notifier = NotificationDispatcher.from_env(
+            self.env,
+            bot=self.bot,
+            metrics=self.metrics,
+            logger=self.logger,
+            store=self.store,
+            await_bot=True
+        )
+        
+    def _init_store(self):
+        self.store = StateStore.from_env(self.env)
+        if self.store is None:
+            return
+        try:
+            self.store.open()
+        except Exception as e:
+            self.logger.error(f"Не удалось открыть хранилище состояния {self.store.path}: {e}")
+            self.store = None
+            
+    def _init_cluster(self):
+        self.cluster = ClusterCoordinator.from_env(self.env, metrics=self.metrics, logger=self.logger)
+        if self.cluster is None:
+            return
+        self.logger.context["instance_id"] = self.cluster.instance_id
+        if self.config.monitor_mode != "api":
+            self.logger.warning("Кластерный режим поддерживается только мониторингом API, остальные мониторы работают на каждом экземпляре")
+            
+    async def _start_cluster(self):
+        if self.cluster is None:
+            return
+        await self.cluster.start()
+        self.logger.info(
+            f"Кластерный режим {self.cluster.mode}: экземпляр {self.cluster.instance_id}, "
+            f"аренда {self.cluster.ttl:g} сек, продление каждые {self.cluster.renew_interval:g} сек"
+        )
+            
+    def _init_history(self):
+        self.history = ProbeHistory.from_env(self.env, logger=self.logger)
+        if self.history is None:
+            return
+        try:
+            self.history.open()
+        except Exception as e:
+            self.logger.error(f"Не удалось открыть историю проверок {self.history.path}: {e}")
+            self.history = None
+            
+    async def _resume_routers(self):
+        if self.store is not None:
+            self.store.start(self.logger)
+        for router_instance in self.routers:
+            try:
+                await router_instance.resume()
+            except Exception as e:
+                self.logger.error(f"Ошибка при восстановлении роутера {type(router_instance).__name__}: {e}")
+        
+    async def _start_metrics_server(self):
+        if not self.env.get("METRICS_ENABLED", False):
+            return
+        self.metrics_server = MetricsServer(
+            self.metrics,
+            host=str(self.env.get("METRICS_HOST", "0.0.0.0")),
+            port=int(self.env.get("METRICS_PORT", 9108)),
+            lag_interval=float(self.env.get("METRICS_LOOP_LAG_INTERVAL", 1))
+        )
+        await self.metrics_server.start()
+        self.logger.info(f"Метрики доступны на http://{self.metrics_server.host}:{self.metrics_server.port}{self.metrics_server.path}")
+        
+    def _start_watchdog(self):
+        self.watchdog = LoopWatchdog.from_env(self.env, metrics=self.metrics, logger=self.logger)
+        if self.watchdog is None:
+            return
+        self.watchdog.start()
+        self.logger.info(f"Сторож event loop запущен (порог {self.watchdog.threshold} сек)")
         
     async def start(self):
         try:
+            self._start_watchdog()
+            self._init_components()
+            await self._start_metrics_server()
+            await self._start_cluster()
+            await self._resume_routers()
+            self._start_config_watch()
             await self._init_bot()
             self.logger.info("Бот успешно инициализирован")
-            self.logger.info("Начинаем polling...")
-            await self.dp.start_polling(self.bot)
+            if str(self.env.get("TELEGRAM_UPDATE_MODE", "polling")).lower() == "webhook":
+                await self._run_webhook()
+            else:
+                self.logger.info("Начинаем polling...")
+                await self.bot.delete_webhook()
+                await self.dp.start_polling(self.bot)
         except Exception as e:
             self.logger.error(f"Ошибка при запуске бота: {e}")
             raise
         finally:
-            await self.bot.session.close()
+            await self.env.stop_watch()
+            if self.webhook_server:
+                await self.webhook_server.stop()
+            await self._close_routers()
+            if self.cluster:
+                await self.cluster.stop()
+            if self.scheduler:
+                await self.scheduler.close()
+            if self.metrics_server:
+                await self.metrics_server.stop()
+            if self.store:
+                await self.store.close()
+            if self.history:
+                self.history.close()
+            if self.bot:
+                await self.bot.session.close()
+            if self.watchdog:
+                await self.watchdog.stop()
+                
+    async def _run_webhook(self):
+        url = self.env.get("TELEGRAM_WEBHOOK_URL")
+        if not url:
+            raise ValueError("TELEGRAM_WEBHOOK_URL не установлен в .env")
+        self.webhook_server = WebhookServer.from_env(
+            self.env,
+            self.dp,
+            self.bot,
+            metrics=self.metrics,
+            logger=self.logger
+        )
+        await self.webhook_server.start()
+        await self.bot.set_webhook(
+            url=str(url),
+            secret_token=self.webhook_server.secret_token,
+            allowed_updates=self.dp.resolve_used_update_types()
+        )
+        self.logger.info(f"Webhook установлен на {url}, сервер слушает {self.webhook_server.host}:{self.webhook_server.port}{self.webhook_server.path}")
+        await asyncio.get_running_loop().create_future()
+                
+    async def _close_routers(self):
+        for router_instance in self.routers:
+            try:
+                await router_instance.close()
+            except Exception as e:
+                self.logger.error(f"Ошибка при остановке роутера {type(router_instance).__name__}: {e}")
             
     def run(self):
-        asyncio.run(self.start())
+        try:
+            asyncio.run(self.start())
+        finally:
+            self.logger.close()
         
 def main():
     app = App()